@@ -0,0 +1,43 @@
+"""
+Relatório de precisão e latência da triagem local (kNN sobre embeddings).
+Compara o classificador local com os rótulos dos exemplos e do LLM.
+"""
+from src.chains import TriagemChain, criar_triagem
+from src.config.settings import GOOGLE_API_KEY
+from src.test_data import CASOS_TESTE_TRIAGEM
+
+
+def exibir(titulo: str, relatorio: dict) -> None:
+    """Exibe um relatório de precisão (sem casos avaliados, não há medição)."""
+    if not relatorio['casos']:
+        print(f"\n⚠️ {titulo}: nenhum caso avaliado, sem medição")
+        return
+    print(f"\n📊 {titulo} ({relatorio['casos']} casos)")
+    print(f"   Acurácia da decisão: {relatorio['acuracia_decisao']:.0%}")
+    print(f"   Acurácia da urgência: {relatorio['acuracia_urgencia']:.0%}")
+    print(f"   Latência: média {relatorio['latencia_media_ms']:.1f} ms / p95 {relatorio['latencia_p95_ms']:.1f} ms")
+
+
+def main():
+    """Avalia a triagem local por leave-one-out e contra o LLM."""
+    print("🚀 Avaliando triagem local...")
+
+    triagem = criar_triagem("local")
+    print(f"📚 {len(triagem.exemplos)} exemplos rotulados")
+
+    try:
+        exibir("Leave-one-out nos exemplos", triagem.relatorio_precisao())
+    except ValueError as e:
+        print(f"⚠️ Leave-one-out ignorado: {e}")
+
+    if GOOGLE_API_KEY:
+        exibir(
+            "Concordância com o LLM",
+            triagem.relatorio_precisao(TriagemChain(usar_pre_classificador=False), CASOS_TESTE_TRIAGEM),
+        )
+    else:
+        print("⚠️ GOOGLE_API_KEY não configurada: comparação com o LLM ignorada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Tempo de importação dos pontos de entrada, medido com ``python -X importtime``.
+
+Cada módulo é importado em um interpretador novo. O relatório mostra o tempo
+cumulativo de cada um (sem a inicialização do interpretador) e os pacotes de
+terceiros mais pesados carregados no caminho. Com ``--saida``, o resultado é
+gravado em JSON para acompanhar a evolução entre versões.
+
+Uso:
+    python benchmark_importacao.py [--repeticoes 5] [--saida importacao.json]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Set, Tuple
+
+# Pontos de entrada acompanhados entre versões
+MODULOS = [
+    "src.config.settings",
+    "src.main",
+    "cli",
+    "run",
+    "src.agents.service_desk_agent",
+]
+
+# Pacotes do próprio projeto (não entram na lista de terceiros)
+PROJETO = {"src", "cli", "run"}
+
+# import time:       self [us] |  cumulative | imported package
+_LINHA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importar(codigo: str) -> Tuple[List[Tuple[int, int, str]], subprocess.CompletedProcess]:
+    """Executa o código em um interpretador novo e retorna (cumulativo us, nível, módulo)."""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True,
+    )
+    linhas = []
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA.match(linha)
+        if encontrado:
+            linhas.append((int(encontrado.group(2)), len(encontrado.group(3)), encontrado.group(4)))
+    return linhas, processo
+
+
+def medir(modulo: str, inicializacao: Set[str]) -> Dict:
+    """
+    Importa um módulo em um processo novo e lê a saída do ``-X importtime``.
+
+    Args:
+        modulo: Nome do módulo a importar
+        inicializacao: Módulos que o interpretador importa antes do ``-c``
+
+    Returns:
+        Dict com o tempo total (ms), os pacotes de terceiros com seu tempo
+        cumulativo (ms), o número de módulos carregados e o erro de
+        importação, se houver
+    """
+    linhas, processo = _importar(f"import {modulo}")
+    linhas = [linha for linha in linhas if linha[2] not in inicializacao]
+
+    # Nível 1: importado diretamente pelo -c (os demais estão contidos nele)
+    total_us = sum(cumulativo for cumulativo, nivel, _ in linhas if nivel == 1)
+    pacotes: Dict[str, float] = {}
+    for cumulativo, _, nome in linhas:
+        raiz = nome.split(".")[0]
+        if raiz in PROJETO or raiz in sys.stdlib_module_names:
+            continue
+        # A primeira importação do pacote inclui todas as demais
+        pacotes[raiz] = max(pacotes.get(raiz, 0.0), cumulativo / 1000)
+
+    erro = processo.stderr.strip().splitlines()[-1] if processo.returncode else None
+    return {"total_ms": total_us / 1000, "modulos": len(linhas), "pacotes": pacotes, "erro": erro}
+
+
+def medir_repetido(modulo: str, repeticoes: int, inicializacao: Set[str]) -> Dict:
+    """
+    Mede várias vezes e fica com a mediana do total (descarta o cache frio).
+
+    Args:
+        modulo: Nome do módulo a importar
+        repeticoes: Número de medições
+        inicializacao: Módulos importados na inicialização do interpretador
+
+    Returns:
+        Medição com o total mediano
+    """
+    medicoes = [medir(modulo, inicializacao) for _ in range(repeticoes)]
+    totais = [m["total_ms"] for m in medicoes]
+    mediana = sorted(medicoes, key=lambda m: m["total_ms"])[len(medicoes) // 2]
+    return {**mediana, "total_ms": median(totais)}
+
+
+def main():
+    """Mede e exibe o tempo de importação dos pontos de entrada."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5, help="medições por módulo")
+    parser.add_argument("--top", type=int, default=5, help="pacotes mais pesados exibidos")
+    parser.add_argument("--saida", help="arquivo JSON para registrar o resultado")
+    args = parser.parse_args()
+
+    print("⏱️ Medindo tempo de importação...")
+    inicializacao = {nome for _, _, nome in _importar("pass")[0]}
+    resultados: Dict[str, Dict] = {}
+    for modulo in MODULOS:
+        resultados[modulo] = medir_repetido(modulo, args.repeticoes, inicializacao)
+
+    print("\n" + "=" * 60)
+    print(f"{'Módulo':<35} {'ms':>10}")
+    print("=" * 60)
+    for modulo, resultado in resultados.items():
+        print(f"{modulo:<35} {resultado['total_ms']:>10.1f}   ({resultado['modulos']} módulos)")
+        if resultado["erro"]:
+            print(f"   ⚠️ {resultado['erro']}")
+        pesados: List = sorted(resultado["pacotes"].items(), key=lambda item: -item[1])
+        for pacote, ms in pesados[:args.top]:
+            print(f"   • {pacote:<30} {ms:>10.1f}")
+
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Resultado salvo em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Relatório de recall vs. latência dos tipos de índice FAISS.
+Compara HNSW e IVF-PQ com a busca exata (flat) sobre os chunks indexados.
+"""
+from src.tools.rag_local import RAGSystemLocal
+from src.tools.indices_ann import parametros_configurados
+from src.config.settings import GOOGLE_API_KEY
+
+
+def main():
+    """Gera a tabela de recall@k e latência para algumas configurações."""
+    print("🚀 Iniciando comparação de índices...")
+
+    if not GOOGLE_API_KEY:
+        print("❌ Erro: GOOGLE_API_KEY não configurada no .env")
+        return
+
+    rag = RAGSystemLocal()
+    rag.inicializar()
+
+    base = parametros_configurados()
+    configuracoes = [
+        {**base, "tipo": "hnsw", "ef_search": ef} for ef in (16, 64, 128)
+    ] + [
+        {**base, "tipo": "ivfpq", "nprobe": nprobe} for nprobe in (1, 8, 32)
+    ]
+    perguntas = [
+        "Qual é a política de home office da empresa?",
+        "Como funciona o reembolso de despesas de viagem?",
+        "Quais são as regras de uso de e-mail corporativo?",
+    ]
+
+    relatorio = rag.relatorio_indices(configuracoes, k=10, perguntas=perguntas)
+
+    print("\n" + "="*60)
+    print(f"{'Índice':<45} {'Recall@10':>9} {'ms/consulta':>12}")
+    print("="*60)
+    for linha in relatorio:
+        if "erro" in linha:
+            print(f"{linha['indice']:<45} ⚠️ {linha['erro']}")
+        else:
+            print(f"{linha['indice']:<45} {linha['recall']:>9.3f} {linha['latencia_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,9 @@ Sistema integrado de triagem e RAG para consulta de políticas.
 """
 import os
 import sys
-from typing import Optional
-from src.config.settings import GOOGLE_API_KEY
-from src.chains import TriagemChain
-from src.tools.rag_local import RAGSystemLocal
+from typing import Dict, Optional
+from src.config.settings import GOOGLE_API_KEY, TRIAGEM_BACKEND
+from src.tools.recursos import obter_rag, obter_triagem
 
 
 class ServiceDeskCLI:
@@ -38,14 +37,13 @@ class ServiceDeskCLI:
         print("🚀 Inicializando sistemas...")
         
         try:
-            # Inicializa sistema de triagem
-            print("🔧 Carregando sistema de triagem...")
-            self.triagem_chain = TriagemChain()
-            
             # Inicializa sistema RAG
             print("📚 Carregando sistema RAG...")
-            self.rag_system = RAGSystemLocal()
-            self.rag_system.inicializar()
+            self.rag_system = obter_rag()
+            
+            # Inicializa sistema de triagem (o backend local reaproveita os embeddings do RAG)
+            print("🔧 Carregando sistema de triagem...")
+            self.triagem_chain = obter_triagem(TRIAGEM_BACKEND)
             
             self.initialized = True
             print("✅ Sistemas inicializados com sucesso!\n")
@@ -67,6 +65,25 @@ class ServiceDeskCLI:
         print("0. 🚪 Sair")
         print("=" * 60)
     
+    def _exibir_resposta_stream(self, pergunta: str) -> Dict:
+        """
+        Imprime a resposta do RAG conforme o LLM a gera.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            
+        Returns:
+            Resultado completo da consulta (resposta e documentos)
+        """
+        resultado = {}
+        for evento in self.rag_system.consultar_stream(pergunta):
+            if evento['tipo'] == 'token':
+                print(evento['conteudo'], end="", flush=True)
+            elif evento['tipo'] == 'fim':
+                resultado = evento['resultado']
+        print()
+        return resultado
+    
     def processar_pergunta_completa(self) -> None:
         """Processa uma pergunta usando triagem + RAG."""
         print("\n📝 MODO: Triagem + RAG")
@@ -91,8 +108,8 @@ class ServiceDeskCLI:
             # 2. RAG (se for AUTO_RESOLVER ou PEDIR_INFO)
             if resultado_triagem['decisão'] in ['AUTO_RESOLVER', 'PEDIR_INFO']:
                 print(f"\n📚 CONSULTA RAG:")
-                resultado_rag = self.rag_system.consultar(pergunta)
-                print(f"   Resposta: {resultado_rag['resposta']}")
+                print("   Resposta: ", end="")
+                resultado_rag = self._exibir_resposta_stream(pergunta)
                 
                 if resultado_rag['documentos_relevantes']:
                     print(f"\n📄 Documentos consultados:")
@@ -157,10 +174,9 @@ class ServiceDeskCLI:
         print("\n🔍 Buscando nas políticas...")
         
         try:
-            resultado = self.rag_system.consultar(pergunta)
-            
             print(f"\n💡 RESPOSTA:")
-            print(f"   {resultado['resposta']}")
+            print("   ", end="")
+            resultado = self._exibir_resposta_stream(pergunta)
             
             if resultado['documentos_relevantes']:
                 print(f"\n📄 DOCUMENTOS CONSULTADOS:")
@@ -215,18 +231,55 @@ class ServiceDeskCLI:
         """Exibe informações sobre o sistema."""
         print("\nℹ️  INFORMAÇÕES DO SISTEMA")
         print("=" * 40)
-        print(f"📊 Documentos carregados: {len(self.rag_system.docs)}")
+        fontes = self.rag_system.listar_fontes()
+        print(f"📊 Arquivos indexados: {len(fontes)}")
         print(f"🔧 Sistema de triagem: ✅ Ativo")
         print(f"📚 Sistema RAG: ✅ Ativo")
         print(f"🤖 Modelo LLM: Gemini 1.5 Flash")
         print(f"🔍 Embeddings: HuggingFace (local)")
         print(f"📁 Pasta de PDFs: {self.rag_system.pdf_folder}")
         
-        if self.rag_system.docs:
+        caches = self.rag_system.estatisticas_cache()
+        for nome, stats in (("consultas", caches["consultas"]), ("respostas", caches["respostas"])):
+            print(
+                f"🧠 Cache de {nome}: {stats['acertos']} acertos, "
+                f"{stats['faltas']} faltas ({stats['taxa_acerto']:.0%})"
+            )
+        
+        triagem = self.triagem_chain.estatisticas()
+        print(
+            f"⚡ Triagem por regras: {triagem['atalhos']} de {triagem['total']} mensagens "
+            f"sem chamar o LLM ({triagem['taxa_atalho']:.0%})"
+        )
+        if "cache" in triagem:
+            print(
+                f"🧠 Cache de triagem: {triagem['cache']['acertos']} acertos, "
+                f"{triagem['cache']['faltas']} faltas ({triagem['cache']['taxa_acerto']:.0%})"
+            )
+        
+        latencia = self.rag_system.estatisticas_latencia()
+        for etapa, stats in latencia["etapas"].items():
+            print(f"⏱️ {etapa}: p50 {stats['p50']:.0f} / p95 {stats['p95']:.0f} ({stats['n']} consultas)")
+        if "rerank" in latencia:
+            rerank = latencia["rerank"]
+            print(
+                f"🔀 Re-ranking: {rerank['aplicados']} aplicados, "
+                f"{rerank['estouros']} acima do orçamento de {rerank['orcamento_ms']:.0f} ms, "
+                f"{rerank['ocupados']} com o modelo ocupado"
+            )
+        
+        if fontes:
             print(f"\n📄 Documentos disponíveis:")
-            for doc in self.rag_system.docs:
-                fonte = doc.metadata.get('source', 'Desconhecida')
-                print(f"   • {os.path.basename(fonte)}")
+            for fonte in fontes:
+                entrada = self.rag_system.catalogo.get(os.path.basename(fonte))
+                if entrada:
+                    print(
+                        f"   • {os.path.basename(fonte)} "
+                        f"({entrada['paginas']} páginas, {entrada['chunks']} chunks, "
+                        f"{entrada['bytes'] / 1024:.0f} KB)"
+                    )
+                else:
+                    print(f"   • {os.path.basename(fonte)}")
     
     def executar(self) -> None:
         """Executa o sistema CLI principal."""
@@ -15,10 +15,12 @@ Funcionalidades:
     - Interface amigável no terminal
 
 """
-from typing import Dict, Any
-from src.agents import ServiceDeskAgent
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List
 from src.config.settings import GOOGLE_API_KEY, validar_configuracao
 
+if TYPE_CHECKING:
+    from src.agents import ServiceDeskAgent
+
 
 def exibir_cabecalho() -> None:
     """Exibe o cabeçalho do sistema."""
@@ -43,6 +45,46 @@ def verificar_configuracao() -> bool:
     return True
 
 
+def exibir_triagem(triagem: Dict[str, Any]) -> None:
+    """
+    Exibe o resultado da triagem.
+    
+    Args:
+        triagem: Decisão, urgência e campos faltantes
+    """
+    print(f"\n📊 TRIAGEM:")
+    print(f"   Decisão: {triagem['decisão']}")
+    print(f"   Urgência: {triagem['urgencia']}")
+    
+    if triagem['campos_faltantes']:
+        print(f"   Campos faltantes: {', '.join(triagem['campos_faltantes'])}")
+
+
+def exibir_documentos(documentos: List[Dict[str, Any]]) -> None:
+    """
+    Exibe os documentos consultados pelo RAG.
+    
+    Args:
+        documentos: Documentos relevantes (fonte e trecho)
+    """
+    if documentos:
+        print(f"\n📄 Documentos consultados:")
+        for doc in documentos:
+            print(f"   • {doc['fonte'].split('/')[-1]}")
+
+
+def exibir_recomendacao(resultado: Dict[str, Any]) -> None:
+    """
+    Exibe a recomendação e a ação sugerida.
+    
+    Args:
+        resultado: Resultado do processamento da solicitação
+    """
+    print(f"\n🎯 RECOMENDAÇÃO:")
+    print(f"   {resultado['recomendacao']}")
+    print(f"\n⚡ AÇÃO SUGERIDA: {resultado['acao_sugerida']}")
+
+
 def exibir_resultado(resultado: Dict[str, Any]) -> None:
     """
     Exibe o resultado do processamento de forma organizada.
@@ -51,12 +93,7 @@ def exibir_resultado(resultado: Dict[str, Any]) -> None:
         resultado: Resultado do processamento da solicitação
     """
     # Informações de triagem
-    print(f"\n📊 TRIAGEM:")
-    print(f"   Decisão: {resultado['triagem']['decisão']}")
-    print(f"   Urgência: {resultado['triagem']['urgencia']}")
-    
-    if resultado['triagem']['campos_faltantes']:
-        print(f"   Campos faltantes: {', '.join(resultado['triagem']['campos_faltantes'])}")
+    exibir_triagem(resultado['triagem'])
     
     # Resposta do RAG (se disponível)
     if resultado['resposta_rag']:
@@ -64,18 +101,43 @@ def exibir_resultado(resultado: Dict[str, Any]) -> None:
         print(f"   {resultado['resposta_rag']}")
     
     # Recomendação e ação sugerida
-    print(f"\n🎯 RECOMENDAÇÃO:")
-    print(f"   {resultado['recomendacao']}")
-    print(f"\n⚡ AÇÃO SUGERIDA: {resultado['acao_sugerida']}")
+    exibir_recomendacao(resultado)
     
     # Documentos consultados
-    if resultado['documentos_relevantes']:
-        print(f"\n📄 Documentos consultados:")
-        for doc in resultado['documentos_relevantes']:
-            print(f"   • {doc['fonte'].split('/')[-1]}")
+    exibir_documentos(resultado['documentos_relevantes'])
 
 
-def processar_entrada_usuario(agent: ServiceDeskAgent) -> None:
+def exibir_resultado_stream(eventos: Iterator[Dict[str, Any]]) -> None:
+    """
+    Exibe o processamento conforme os eventos chegam.
+    
+    A resposta do RAG é impressa trecho a trecho, assim o usuário começa a
+    ler antes de o LLM terminar de gerá-la.
+    
+    Args:
+        eventos: Eventos de ``ServiceDeskAgent.processar_solicitacao_stream``
+    """
+    respondendo = False
+    for evento in eventos:
+        if evento['tipo'] == 'triagem':
+            exibir_triagem(evento['triagem'])
+        elif evento['tipo'] == 'documentos':
+            exibir_documentos(evento['documentos'])
+        elif evento['tipo'] == 'token':
+            if not respondendo:
+                print(f"\n💡 RESPOSTA:")
+                print("   ", end="")
+                respondendo = True
+            print(evento['conteudo'], end="", flush=True)
+        elif evento['tipo'] == 'fim':
+            if respondendo:
+                print()
+            exibir_recomendacao(evento['resultado'])
+        elif evento['tipo'] == 'erro':
+            print(f"❌ Erro: {evento['erro']}")
+
+
+def processar_entrada_usuario(agent: "ServiceDeskAgent") -> None:
     """
     Processa as entradas do usuário em loop contínuo.
     
@@ -94,12 +156,9 @@ def processar_entrada_usuario(agent: ServiceDeskAgent) -> None:
                 print("👋 Obrigado por usar o sistema! Até logo!")
                 break
             
-            # Processa a solicitação
+            # Processa a solicitação, exibindo a resposta conforme é gerada
             print("\n🤖 Processando...")
-            resultado = agent.processar_solicitacao(pergunta)
-            
-            # Exibe o resultado
-            exibir_resultado(resultado)
+            exibir_resultado_stream(agent.processar_solicitacao_stream(pergunta))
             print("\n" + "-" * 60 + "\n")
             
         except KeyboardInterrupt:
@@ -127,6 +186,8 @@ def main() -> None:
     try:
         # Inicializa o agente
         print("🤖 Inicializando agente...")
+        # Importado só aqui: LangChain e LangGraph não atrasam o cabeçalho nem a validação
+        from src.agents import ServiceDeskAgent
         agent = ServiceDeskAgent()
         agent.inicializar()
         
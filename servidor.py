@@ -0,0 +1,38 @@
+"""
+Serviço HTTP do sistema de Service Desk.
+
+Expõe o agente para o portal por meio de uma aplicação ASGI
+(``src.api.app:app``) servida pelo uvicorn.
+
+Uso:
+    python servidor.py
+
+Rotas:
+    POST /solicitacoes  {"mensagem": "..."}   Triagem, RAG e recomendação
+    POST /triagem       {"mensagem": "..."}   Apenas a triagem
+    POST /politicas     {"pergunta": "..."}   Apenas a consulta às políticas
+    GET  /saude                               Processo no ar
+    GET  /prontidao                           Índice e triagem carregados
+"""
+from src.config.settings import API_HOST, API_PORTA, validar_configuracao
+
+
+def main() -> None:
+    """Inicia o servidor ASGI."""
+    if not validar_configuracao():
+        print("❌ Erro: GOOGLE_API_KEY não configurada no .env")
+        return
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn não instalado. Execute: pip install uvicorn")
+        return
+
+    print(f"🌐 Iniciando serviço HTTP em http://{API_HOST}:{API_PORTA}")
+    # Um único processo: o índice, os modelos e a fila são compartilhados pelos workers
+    uvicorn.run("src.api.app:app", host=API_HOST, port=API_PORTA, workers=1)
+
+
+if __name__ == "__main__":
+    main()
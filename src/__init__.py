@@ -0,0 +1,31 @@
+"""
+Pacote do sistema de Service Desk com IA.
+
+Os subpacotes exportam suas classes sob demanda: importar ``src.chains`` ou
+``src.graph`` não carrega LangChain, LangGraph, FAISS nem os SDKs do Google;
+eles só são carregados quando a classe é usada pela primeira vez.
+"""
+from importlib import import_module
+from typing import Callable, Dict
+
+
+def importacao_tardia(pacote: str, exportacoes: Dict[str, str]) -> Callable[[str], object]:
+    """
+    Cria o ``__getattr__`` de um pacote que importa seus nomes no primeiro acesso.
+
+    Args:
+        pacote: Nome do pacote (``__name__``)
+        exportacoes: Nome exportado -> submódulo relativo que o define
+
+    Returns:
+        Função ``__getattr__`` para o módulo do pacote (PEP 562)
+    """
+    def __getattr__(nome: str):
+        if nome not in exportacoes:
+            raise AttributeError(f"module {pacote!r} has no attribute {nome!r}")
+        valor = getattr(import_module(exportacoes[nome], pacote), nome)
+        # Acessos seguintes não passam mais por aqui
+        setattr(import_module(pacote), nome, valor)
+        return valor
+
+    return __getattr__
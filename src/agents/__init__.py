@@ -1,6 +1,14 @@
 """
 Módulo de agentes do sistema.
 """
-from .service_desk_agent import ServiceDeskAgent
+from typing import TYPE_CHECKING
+
+from src import importacao_tardia
+
+if TYPE_CHECKING:
+    from .service_desk_agent import ServiceDeskAgent
+
+_EXPORTACOES = {"ServiceDeskAgent": ".service_desk_agent"}
 
 __all__ = ["ServiceDeskAgent"]
+__getattr__ = importacao_tardia(__name__, _EXPORTACOES)
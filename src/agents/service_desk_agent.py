@@ -4,9 +4,15 @@ Agente inteligente de Service Desk com LangGraph.
 Este agente usa LangGraph para orquestrar o fluxo de processamento,
 permitindo fluxos condicionais e reutilização de componentes.
 """
-from typing import Dict, Optional
+import asyncio
+import queue
+import threading
+import warnings
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+from src.config.settings import AGENTE_AQUECIMENTO, GRAFO_MAX_WORKERS, TRIAGEM_BACKEND
 from src.graph import ServiceDeskGraph
 from src.graph.state import ServiceDeskState
+from src.tools import recursos
 
 
 class ServiceDeskAgent:
@@ -22,14 +28,46 @@ class ServiceDeskAgent:
         self.graph = ServiceDeskGraph()
         self.initialized = False
     
-    def inicializar(self) -> None:
-        """Inicializa o agente e seus sistemas."""
+    def inicializar(self, aquecer: bool = AGENTE_AQUECIMENTO) -> None:
+        """
+        Inicializa o agente e seus sistemas.
+        
+        Args:
+            aquecer: Se o RAG e a triagem devem começar a carregar em segundo
+                plano; sem aquecimento, carregam na primeira requisição
+        """
         if not self.initialized:
             print("🤖 Inicializando agente de Service Desk com LangGraph...")
-            # O grafo é inicializado sob demanda quando necessário
+            if aquecer:
+                self.aquecer()
             self.initialized = True
             print("✅ Agente inicializado com sucesso!")
     
+    def aquecer(self) -> None:
+        """
+        Começa a carregar o RAG e a triagem em segundo plano.
+        
+        Recursos já carregados ou em carregamento não são refeitos; um
+        carregamento que falhou é tentado de novo.
+        """
+        # Requisições que chegarem antes do fim esperam o mesmo carregamento
+        recursos.aquecer(TRIAGEM_BACKEND)
+    
+    def prontidao(self) -> Dict:
+        """
+        Informa se o RAG e a triagem já estão carregados.
+        
+        Returns:
+            Dict com ``pronto`` e a situação de cada recurso
+            ("pendente", "carregando", "pronto" ou "erro")
+        """
+        return recursos.prontidao(TRIAGEM_BACKEND)
+    
+    def encerrar(self) -> None:
+        """Libera as threads da recuperação especulativa ao encerrar o processo."""
+        recursos.encerrar()
+        self.initialized = False
+    
     def processar_solicitacao(self, mensagem: str) -> Dict:
         """
         Processa uma solicitação usando o grafo LangGraph.
@@ -49,6 +87,118 @@ class ServiceDeskAgent:
         # Converte o estado para o formato esperado
         return self._converter_estado_para_dict(estado_final)
     
+    def processar_concorrente(self, mensagens: List[str], max_workers: int = GRAFO_MAX_WORKERS) -> List[Dict]:
+        """
+        Processa várias mensagens em paralelo em um pool de threads.
+        
+        Args:
+            mensagens: Mensagens dos usuários
+            max_workers: Número máximo de mensagens processadas ao mesmo tempo
+            
+        Returns:
+            Resultados na mesma ordem da entrada, no formato de
+            ``processar_solicitacao``
+        """
+        if not self.initialized:
+            self.inicializar()
+        
+        estados = self.graph.processar_concorrente(mensagens, max_workers)
+        return [self._converter_estado_para_dict(estado) for estado in estados]
+    
+    async def aprocessar_solicitacao(self, mensagem: str) -> Dict:
+        """
+        Versão assíncrona de ``processar_solicitacao``.
+        
+        Um único event loop pode atender várias solicitações concorrentes,
+        pois as chamadas ao LLM não bloqueiam.
+        
+        Args:
+            mensagem: Mensagem do usuário
+            
+        Returns:
+            Dict com resultado completo da análise
+        """
+        if not self.initialized:
+            self.inicializar()
+        
+        estado_final = await self.graph.aprocessar(mensagem)
+        return self._converter_estado_para_dict(estado_final)
+    
+    def processar_solicitacao_stream(self, mensagem: str) -> Iterator[Dict]:
+        """
+        Processa uma solicitação emitindo o progresso conforme acontece.
+        
+        Eventos emitidos:
+        
+        - ``{"tipo": "triagem", "triagem": {...}}``
+        - ``{"tipo": "documentos", "documentos": [...]}`` (se houver RAG)
+        - ``{"tipo": "token", "conteudo": "..."}`` (trechos da resposta do RAG)
+        - ``{"tipo": "fim", "resultado": {...}}``: mesmo resultado de ``processar_solicitacao``
+        - ``{"tipo": "erro", "erro": "..."}`` se o processamento falhar
+        
+        Args:
+            mensagem: Mensagem do usuário
+            
+        Yields:
+            Eventos do processamento
+        """
+        if not self.initialized:
+            self.inicializar()
+        
+        # O grafo roda em uma thread e entrega os eventos por uma fila
+        fila: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        
+        def executar() -> None:
+            try:
+                estado_final = self.graph.processar(mensagem, emitir_evento=fila.put)
+                fila.put({"tipo": "fim", "resultado": self._converter_estado_para_dict(estado_final)})
+            except Exception as e:
+                fila.put({"tipo": "erro", "erro": str(e)})
+            finally:
+                fila.put(None)
+        
+        threading.Thread(target=executar, daemon=True).start()
+        while True:
+            evento = fila.get()
+            if evento is None:
+                break
+            yield evento
+    
+    async def aprocessar_solicitacao_stream(self, mensagem: str) -> AsyncIterator[Dict]:
+        """
+        Versão assíncrona de ``processar_solicitacao_stream``, com os mesmos eventos.
+        
+        Args:
+            mensagem: Mensagem do usuário
+            
+        Yields:
+            Eventos do processamento
+        """
+        if not self.initialized:
+            self.inicializar()
+        
+        fila: "asyncio.Queue[Optional[Dict]]" = asyncio.Queue()
+        
+        async def executar() -> None:
+            try:
+                estado_final = await self.graph.aprocessar(mensagem, emitir_evento=fila.put_nowait)
+                fila.put_nowait({"tipo": "fim", "resultado": self._converter_estado_para_dict(estado_final)})
+            except Exception as e:
+                fila.put_nowait({"tipo": "erro", "erro": str(e)})
+            finally:
+                fila.put_nowait(None)
+        
+        tarefa = asyncio.create_task(executar())
+        try:
+            while True:
+                evento = await fila.get()
+                if evento is None:
+                    break
+                yield evento
+        finally:
+            if not tarefa.done():
+                tarefa.cancel()
+    
     def _converter_estado_para_dict(self, estado) -> Dict:
         """
         Converte o estado do grafo para o formato de dicionário esperado.
@@ -59,32 +209,20 @@ class ServiceDeskAgent:
         Returns:
             Dict com resultado no formato compatível
         """
-        # Se o estado já é um dicionário, retorna diretamente
-        if isinstance(estado, dict):
-            return {
-                'mensagem_original': estado.get('mensagem_original', ''),
-                'triagem': estado.get('triagem'),
-                'resposta_rag': estado.get('resposta_rag'),
-                'documentos_relevantes': estado.get('documentos_relevantes', []),
-                'recomendacao': estado.get('recomendacao'),
-                'acao_sugerida': estado.get('acao_sugerida'),
-                'erro': estado.get('erro'),
-                'finalizado': estado.get('finalizado', False),
-                'tentativas': estado.get('tentativas', 0),
-                'estatisticas': self.graph.obter_estatisticas(estado)
-            }
-        
-        # Se é um objeto ServiceDeskState, converte
+        if not isinstance(estado, dict):
+            estado = estado.model_dump()
+        
         return {
-            'mensagem_original': estado.mensagem_original,
-            'triagem': estado.triagem,
-            'resposta_rag': estado.resposta_rag,
-            'documentos_relevantes': estado.documentos_relevantes,
-            'recomendacao': estado.recomendacao,
-            'acao_sugerida': estado.acao_sugerida,
-            'erro': estado.erro,
-            'finalizado': estado.finalizado,
-            'tentativas': estado.tentativas,
+            'mensagem_original': estado.get('mensagem_original', ''),
+            'triagem': estado.get('triagem'),
+            'resposta_rag': estado.get('resposta_rag'),
+            'documentos_relevantes': estado.get('documentos_relevantes', []),
+            'recomendacao': estado.get('recomendacao'),
+            'acao_sugerida': estado.get('acao_sugerida'),
+            'erro': estado.get('erro'),
+            'finalizado': estado.get('finalizado', False),
+            'tentativas': estado.get('tentativas', 0),
+            'rastro': estado.get('rastro', []),
             'estatisticas': self.graph.obter_estatisticas(estado)
         }
     
@@ -108,21 +246,35 @@ class ServiceDeskAgent:
         # Converte o estado para o formato esperado
         return self._converter_estado_para_dict(estado_final)
     
-    def obter_estatisticas(self, mensagem: str) -> Dict:
+    def obter_estatisticas(self, resultado: Union[Dict, str]) -> Dict:
         """
         Obtém estatísticas do processamento de uma mensagem.
         
+        As estatísticas vêm do rastro registrado pelos nós durante a execução
+        que produziu o resultado, sem processar a mensagem de novo.
+        
+        Passar o texto da mensagem ainda é aceito, mas está obsoleto: a
+        mensagem é processada outra vez (com LLM e RAG) só para obter as
+        estatísticas. Passe o resultado de ``processar_solicitacao``.
+        
         Args:
-            mensagem: Mensagem para processar
+            resultado: Resultado de ``processar_solicitacao`` (ou das
+                variantes assíncrona, concorrente e com histórico); uma
+                mensagem em texto é aceita por compatibilidade
             
         Returns:
-            Dict com estatísticas do processamento
+            Dict com estatísticas do processamento (fluxo executado e
+            latência por nó inclusive)
         """
-        if not self.initialized:
-            self.inicializar()
-        
-        estado_final = self.graph.processar(mensagem)
-        return self.graph.obter_estatisticas(estado_final)
+        if isinstance(resultado, str):
+            warnings.warn(
+                "obter_estatisticas(mensagem) processa a mensagem novamente e está obsoleto; "
+                "passe o resultado de processar_solicitacao.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            resultado = self.processar_solicitacao(resultado)
+        return resultado['estatisticas']
     
     def consultar_politicas(self, pergunta: str) -> Dict:
         """
@@ -156,3 +308,18 @@ class ServiceDeskAgent:
         
         # Usa a chain de triagem diretamente do grafo
         return self.graph.nodes.triagem_chain.processar(mensagem)
+    
+    def classificar_lote(self, mensagens: List[str]) -> List[Dict]:
+        """
+        Classifica várias mensagens (triagem) em lote, sem RAG.
+        
+        Args:
+            mensagens: Mensagens para classificar
+            
+        Returns:
+            Lista de resultados na ordem da entrada (itens com falha têm a chave ``erro``)
+        """
+        if not self.initialized:
+            self.inicializar()
+        
+        return self.graph.nodes.triagem_chain.processar_lote(mensagens)
@@ -0,0 +1,14 @@
+"""
+Módulo do serviço HTTP (ASGI) do sistema.
+"""
+from typing import TYPE_CHECKING
+
+from src import importacao_tardia
+
+if TYPE_CHECKING:
+    from .app import ServicoServiceDesk, criar_app
+
+_EXPORTACOES = {"ServicoServiceDesk": ".app", "criar_app": ".app"}
+
+__all__ = ["ServicoServiceDesk", "criar_app"]
+__getattr__ = importacao_tardia(__name__, _EXPORTACOES)
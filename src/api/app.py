@@ -0,0 +1,279 @@
+"""
+Serviço HTTP (ASGI) do agente de Service Desk.
+
+Aplicação ASGI sem framework, servida por qualquer servidor ASGI (ex.:
+``uvicorn``). As requisições entram em uma fila limitada e são atendidas por
+um número configurável de workers, cada um executando o agente em uma
+thread. Com a fila cheia, a resposta é ``429`` com ``Retry-After``, em vez de
+acumular requisições indefinidamente.
+
+Rotas:
+
+- ``POST /solicitacoes`` ``{"mensagem": ...}``: triagem, RAG e recomendação
+- ``POST /triagem`` ``{"mensagem": ...}``: apenas a triagem
+- ``POST /politicas`` ``{"pergunta": ...}``: apenas a consulta às políticas
+- ``GET /saude``: o processo está no ar (liveness)
+- ``GET /prontidao``: índice e triagem carregados (readiness; 503 até lá,
+  reiniciando o carregamento que tiver falhado)
+"""
+import asyncio
+import json
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import (
+    API_CONCORRENCIA,
+    API_CORPO_MAXIMO,
+    API_FILA_MAXIMA,
+    API_TEMPO_LIMITE,
+)
+
+
+class ErroHTTP(Exception):
+    """Erro que vira uma resposta HTTP com o status e a mensagem informados."""
+
+    def __init__(self, status: int, mensagem: str, cabecalhos: Optional[Dict[str, str]] = None):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+        self.cabecalhos = cabecalhos or {}
+
+
+# Rota -> (método do agente, campo obrigatório do corpo JSON)
+ROTAS_AGENTE: Dict[str, Tuple[str, str]] = {
+    "/solicitacoes": ("processar_solicitacao", "mensagem"),
+    "/triagem": ("classificar_mensagem", "mensagem"),
+    "/politicas": ("consultar_politicas", "pergunta"),
+}
+
+
+class ServicoServiceDesk:
+    """
+    Aplicação ASGI com fila limitada de requisições e pool de workers.
+    """
+
+    def __init__(
+        self,
+        concorrencia: int = API_CONCORRENCIA,
+        fila_maxima: int = API_FILA_MAXIMA,
+        tempo_limite: float = API_TEMPO_LIMITE,
+        agente=None,
+    ):
+        """
+        Configura o serviço; o agente e os workers são criados no startup.
+
+        Args:
+            concorrencia: Requisições atendidas ao mesmo tempo
+            fila_maxima: Requisições aguardando um worker (além disso, 429)
+            tempo_limite: Tempo máximo (s) de espera por uma resposta
+            agente: ServiceDeskAgent já criado (padrão: criado no startup)
+        """
+        self.concorrencia = concorrencia
+        self.fila_maxima = fila_maxima
+        self.tempo_limite = tempo_limite
+        self.agente = agente
+        self._fila: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.em_atendimento = 0
+        self.rejeitadas = 0
+
+    async def iniciar(self) -> None:
+        """Cria o agente (iniciando o aquecimento do índice) e os workers."""
+        if self.agente is None:
+            from src.agents import ServiceDeskAgent
+            self.agente = ServiceDeskAgent()
+        # O serviço sempre aquece: sem isso /prontidao nunca ficaria pronto
+        self.agente.inicializar(aquecer=True)
+
+        self._fila = asyncio.Queue(maxsize=self.concorrencia + self.fila_maxima)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"worker-{i}")
+            for i in range(self.concorrencia)
+        ]
+        print(f"🌐 Serviço pronto para receber requisições ({self.concorrencia} workers, fila de {self.fila_maxima})")
+
+    async def encerrar(self) -> None:
+        """Cancela os workers e encerra o agente; requisições ainda na fila recebem 503."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while self._fila is not None and not self._fila.empty():
+            _, _, futuro = self._fila.get_nowait()
+            if not futuro.done():
+                futuro.set_exception(ErroHTTP(503, "Serviço encerrando"))
+
+        if self.agente is not None:
+            self.agente.encerrar()
+
+    async def _worker(self) -> None:
+        """Atende as requisições da fila, uma de cada vez, em uma thread."""
+        while True:
+            funcao, argumento, futuro = await self._fila.get()
+            self.em_atendimento += 1
+            try:
+                if not futuro.cancelled():
+                    resultado = await asyncio.to_thread(funcao, argumento)
+                    if not futuro.done():
+                        futuro.set_result(resultado)
+            except asyncio.CancelledError:
+                if not futuro.done():
+                    futuro.set_exception(ErroHTTP(503, "Serviço encerrando"))
+                raise
+            except Exception as e:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            finally:
+                self.em_atendimento -= 1
+                self._fila.task_done()
+
+    async def _enfileirar(self, funcao: Callable[[str], Any], argumento: str) -> Any:
+        """Coloca a chamada na fila e espera o resultado (429 se a fila estiver cheia)."""
+        # Capacidade: uma requisição por worker mais as que aguardam na fila
+        if self.em_atendimento + self._fila.qsize() >= self.concorrencia + self.fila_maxima:
+            self.rejeitadas += 1
+            raise ErroHTTP(429, "Serviço saturado, tente novamente em instantes", {"retry-after": "1"})
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._fila.put_nowait((funcao, argumento, futuro))
+
+        try:
+            return await asyncio.wait_for(futuro, self.tempo_limite)
+        except asyncio.TimeoutError:
+            raise ErroHTTP(504, "Tempo limite excedido")
+
+    def estatisticas(self) -> Dict:
+        """
+        Ocupação atual do serviço.
+
+        Returns:
+            Dict com workers, requisições em atendimento, na fila e rejeitadas
+        """
+        return {
+            "workers": self.concorrencia,
+            "em_atendimento": self.em_atendimento,
+            "na_fila": self._fila.qsize() if self._fila is not None else 0,
+            "fila_maxima": self.fila_maxima,
+            "rejeitadas": self.rejeitadas,
+        }
+
+    async def __call__(self, scope: Dict, receive: Callable[[], Awaitable[Dict]], send: Callable[[Dict], Awaitable[None]]) -> None:
+        """Ponto de entrada ASGI (eventos de lifespan e requisições HTTP)."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            status, corpo = await self._rotear(scope, receive)
+            cabecalhos: Dict[str, str] = {}
+        except ErroHTTP as e:
+            status, corpo, cabecalhos = e.status, {"erro": e.mensagem}, e.cabecalhos
+        except Exception:
+            # O detalhe fica no log; o cliente recebe apenas uma mensagem genérica
+            print(f"❌ Erro ao atender {scope.get('path')}:\n{traceback.format_exc()}")
+            status, corpo, cabecalhos = 500, {"erro": "Erro interno do servidor"}, {}
+
+        await self._responder(send, status, corpo, cabecalhos)
+
+    async def _lifespan(self, receive, send) -> None:
+        """Trata os eventos de startup e shutdown do servidor."""
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "lifespan.startup":
+                try:
+                    await self.iniciar()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif mensagem["type"] == "lifespan.shutdown":
+                await self.encerrar()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _rotear(self, scope: Dict, receive) -> Tuple[int, Any]:
+        """Executa a rota da requisição e retorna status e corpo da resposta."""
+        metodo, caminho = scope["method"], scope["path"].rstrip("/") or "/"
+
+        # Liveness responde mesmo antes do startup: o processo está no ar
+        if caminho == "/saude":
+            self._exigir_metodo(metodo, "GET")
+            return 200, {"status": "ok", "servico": self.estatisticas()}
+
+        if self._fila is None:
+            raise ErroHTTP(503, "Serviço ainda não iniciado")
+
+        if caminho == "/prontidao":
+            self._exigir_metodo(metodo, "GET")
+            prontidao = self.agente.prontidao()
+            if "erro" in prontidao["recursos"].values():
+                # Um carregamento falhou: tenta de novo em vez de ficar indisponível
+                self.agente.aquecer()
+            return (200 if prontidao["pronto"] else 503), prontidao
+
+        if caminho in ROTAS_AGENTE:
+            self._exigir_metodo(metodo, "POST")
+            nome_metodo, campo = ROTAS_AGENTE[caminho]
+            texto = await self._ler_campo(receive, campo)
+            return 200, await self._enfileirar(getattr(self.agente, nome_metodo), texto)
+
+        raise ErroHTTP(404, f"Rota não encontrada: {caminho}")
+
+    @staticmethod
+    def _exigir_metodo(metodo: str, esperado: str) -> None:
+        """Rejeita métodos diferentes do esperado com 405."""
+        if metodo != esperado:
+            raise ErroHTTP(405, f"Método {metodo} não permitido", {"allow": esperado})
+
+    @staticmethod
+    async def _ler_campo(receive, campo: str) -> str:
+        """Lê o corpo JSON (limitado a API_CORPO_MAXIMO bytes) e extrai o campo de texto."""
+        corpo = bytearray()
+        while True:
+            mensagem = await receive()
+            corpo.extend(mensagem.get("body", b""))
+            if len(corpo) > API_CORPO_MAXIMO:
+                raise ErroHTTP(413, f"Corpo maior que {API_CORPO_MAXIMO} bytes")
+            if not mensagem.get("more_body"):
+                break
+
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroHTTP(400, "Corpo da requisição não é um JSON válido")
+
+        texto = dados.get(campo) if isinstance(dados, dict) else None
+        if not isinstance(texto, str) or not texto.strip():
+            raise ErroHTTP(400, f"Campo '{campo}' obrigatório")
+        return texto
+
+    @staticmethod
+    async def _responder(send, status: int, corpo: Any, cabecalhos: Dict[str, str]) -> None:
+        """Envia a resposta em JSON."""
+        dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"content-length", str(len(dados)).encode()),
+        ] + [(nome.encode(), valor.encode()) for nome, valor in cabecalhos.items()]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": dados})
+
+
+def criar_app(**kwargs) -> ServicoServiceDesk:
+    """
+    Cria a aplicação ASGI.
+
+    Args:
+        **kwargs: Parâmetros de ``ServicoServiceDesk``
+
+    Returns:
+        Aplicação ASGI
+    """
+    return ServicoServiceDesk(**kwargs)
+
+
+# Aplicação padrão para servidores ASGI: ``uvicorn src.api.app:app``
+app = criar_app()
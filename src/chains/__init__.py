@@ -1,6 +1,19 @@
 """
 Módulo de chains para processamento de mensagens.
 """
-from .triagem import TriagemChain
+from typing import TYPE_CHECKING
 
-__all__ = ["TriagemChain"]
+from src import importacao_tardia
+
+if TYPE_CHECKING:
+    from .triagem import TriagemChain
+    from .triagem_local import TriagemLocal, criar_triagem
+
+_EXPORTACOES = {
+    "TriagemChain": ".triagem",
+    "TriagemLocal": ".triagem_local",
+    "criar_triagem": ".triagem_local",
+}
+
+__all__ = ["TriagemChain", "TriagemLocal", "criar_triagem"]
+__getattr__ = importacao_tardia(__name__, _EXPORTACOES)
@@ -1,12 +1,32 @@
 """
 Chain de triagem para classificação de mensagens do Service Desk.
 """
-from typing import Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 
-from src.config.settings import GOOGLE_API_KEY
+from src.config.settings import (
+    TRIAGEM_LOTE_CONCORRENCIA,
+    TRIAGEM_LOTE_TENTATIVAS,
+    TRIAGEM_LOTE_ESPERA_INICIAL,
+    TRIAGEM_LOTE_ESPERA_MAXIMA,
+    TRIAGEM_PRE_CLASSIFICADOR,
+    TRIAGEM_LIMIAR_CONFIANCA,
+    TRIAGEM_HISTORICO_PATH,
+    TRIAGEM_CACHE_TAMANHO,
+    TRIAGEM_CACHE_TTL,
+    TRIAGEM_CACHE_SQLITE,
+)
 from src.models import TriagemOut
+from src.tools.cache_triagem import CacheTriagem
+from src.tools.recursos import obter_llm
 
 
 # Prompt de triagem: instruções para classificar mensagens de Service Desk
@@ -26,19 +46,255 @@ TRIAGEM_PROMPT = (
 )
 
 
+# Modelo usado na triagem
+MODELO_TRIAGEM = "gemini-1.5-flash"
+TEMPERATURA_TRIAGEM = 0.3
+
+# Versão da triagem: muda sempre que o prompt, o modelo ou o esquema de saída
+# mudam, invalidando os resultados em cache
+VERSAO_TRIAGEM = hashlib.sha256(
+    "|".join([
+        TRIAGEM_PROMPT,
+        MODELO_TRIAGEM,
+        str(TEMPERATURA_TRIAGEM),
+        json.dumps(TriagemOut.model_json_schema(), sort_keys=True),
+    ]).encode("utf-8")
+).hexdigest()[:16]
+
+
+# Regras do pré-classificador: (padrão sobre o texto normalizado, decisão, confiança).
+# Seguem as regras do TRIAGEM_PROMPT; só as de alta confiança dispensam o LLM.
+# Palavras-chave isoladas ou "aprovação" ficam abaixo do limiar padrão (0.9):
+# sozinhas, não distinguem um pedido de uma pergunta sobre o procedimento.
+REGRAS_TRIAGEM = [
+    # Pedido explícito de abertura de chamado
+    (re.compile(r"\b(?:por favor,?\s+)?abra(?:m)?\s+(?:um\s+|o\s+)?chamado\b"), "ABRIR_CHAMADO", 0.97),
+    (re.compile(r"\b(?:quero|gostaria de|preciso|favor)\s+abrir\s+(?:um\s+)?chamado\b"), "ABRIR_CHAMADO", 0.95),
+    # Pedidos de exceção, liberação, aprovação ou acesso especial
+    (re.compile(r"\b(?:solicit\w*|pe[cç]o|quero|preciso de)\s+(?:uma?\s+)?(?:excecao|liberacao)\b"), "ABRIR_CHAMADO", 0.95),
+    (re.compile(r"\b(?:solicit\w*|pe[cç]o|quero|preciso de)\s+(?:uma?\s+)?aprovac(?:ao|oes)\b"), "ABRIR_CHAMADO", 0.8),
+    (re.compile(r"\b(?:excecao|liberacao|acesso especial)\b"), "ABRIR_CHAMADO", 0.75),
+    (re.compile(r"\baprovac(?:ao|oes)\b"), "ABRIR_CHAMADO", 0.7),
+    # Mensagens vagas, sem tema identificável
+    (re.compile(
+        r"^(?:ola,?\s+|oi,?\s+)?(?:preciso de ajuda|tenho uma duvida|estou com uma duvida|uma duvida|ajuda)"
+        r"(?:\s+(?:geral|com|sobre)(?:\s+(?:uma?|o|a|os|as))?(?:\s+(?:politica|procedimento|processo|regra)s?)?)?\W*$"
+    ), "PEDIR_INFO", 0.93),
+    # Perguntas sobre temas cobertos pelas políticas
+    (re.compile(
+        r"^(?:qual|quais|como funciona|como e|posso|pode|onde|quando|quanto)\b.*\b"
+        r"(?:home office|reembolso|reembols\w+|viage(?:m|ns)|alimentacao|e-?mail|ferias|politica de)\b"
+    ), "AUTO_RESOLVER", 0.92),
+]
+
+# Perguntas ("?", interrogativos, "quero saber") costumam ser dúvidas sobre o
+# procedimento, não o pedido em si
+_PERGUNTA = re.compile(
+    r"\?|^(?:como|qual|quais|o que|onde|quando|quanto|posso|pode|devo|existe|e possivel)\b|"
+    r"\b(?:quero|gostaria de|queria) saber\b"
+)
+
+# Negação do pedido: "não quero abrir um chamado", "nunca solicitei exceção"
+_NEGACAO = re.compile(
+    r"\b(?:nao|nunca)\s+(?:\w+\s+){0,2}?(?:quero|queria|preciso|gostaria|solicit\w*|pe[cç]o|abr\w*)\b"
+)
+
+# Penalidade dos pedidos de chamado em forma de pergunta ou negados
+_PENALIDADE_PERGUNTA = 0.3
+_PENALIDADE_NEGACAO = 0.5
+
+# Indícios de que a solicitação impede o trabalho ou tem prazo imediato
+_URGENCIA_ALTA = re.compile(
+    r"\b(?:urgente|urgencia|hoje|agora|imediat\w*|quebr\w*|parou|travad\w*|bloquead\w*|"
+    r"expir\w*|nao consigo (?:acessar|trabalhar|entrar|logar))\b"
+)
+
+# Penalidade quando regras de decisões diferentes se aplicam à mesma mensagem
+_PENALIDADE_CONFLITO = 0.3
+
+
+def _normalizar_mensagem(mensagem: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados."""
+    texto = unicodedata.normalize("NFKD", mensagem.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.split())
+
+
+def pre_classificar(mensagem: str) -> Optional[Tuple[TriagemOut, float]]:
+    """
+    Classifica a mensagem por regras, sem chamar o LLM.
+    
+    Args:
+        mensagem: Texto da mensagem do usuário
+        
+    Returns:
+        Tupla (classificação, confiança entre 0 e 1) ou None se nenhuma regra se aplica
+    """
+    texto = _normalizar_mensagem(mensagem)
+    
+    melhores: Dict[str, float] = {}
+    for padrao, decisao, confianca in REGRAS_TRIAGEM:
+        if padrao.search(texto) and confianca > melhores.get(decisao, 0.0):
+            melhores[decisao] = confianca
+    if not melhores:
+        return None
+    
+    decisao = max(melhores, key=melhores.get)
+    confianca = melhores[decisao]
+    if len(melhores) > 1:
+        confianca -= _PENALIDADE_CONFLITO
+    if decisao == "ABRIR_CHAMADO":
+        if _NEGACAO.search(texto):
+            confianca -= _PENALIDADE_NEGACAO
+        elif _PERGUNTA.search(texto):
+            confianca -= _PENALIDADE_PERGUNTA
+    
+    if _URGENCIA_ALTA.search(texto):
+        urgencia = "ALTA"
+    elif decisao == "AUTO_RESOLVER":
+        urgencia = "BAIXA"
+    else:
+        urgencia = "MEDIA"
+    
+    campos_faltantes = ["tema ou política específica"] if decisao == "PEDIR_INFO" else []
+    saida = TriagemOut(decisão=decisao, urgencia=urgencia, campos_faltantes=campos_faltantes)
+    return saida, confianca
+
+
+_lock_historico = threading.Lock()
+
+
+def registrar_historico(caminho: str, mensagem: str, resultado: Dict) -> None:
+    """
+    Acrescenta uma classificação do LLM ao histórico em JSONL.
+    
+    O formato das linhas é o mesmo de ``CASOS_VALIDACAO``, para que o
+    histórico sirva de exemplos rotulados ao backend local.
+    
+    Args:
+        caminho: Arquivo do histórico
+        mensagem: Texto da mensagem do usuário
+        resultado: Classificação retornada pelo LLM
+    """
+    linha = json.dumps({
+        "mensagem": mensagem,
+        "decisao_esperada": resultado["decisão"],
+        "urgencia_esperada": resultado["urgencia"],
+    }, ensure_ascii=False)
+    with _lock_historico:
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+def _eh_limite_taxa(erro: BaseException) -> bool:
+    """
+    Indica se o erro é um limite de taxa/quota da API (HTTP 429).
+
+    Args:
+        erro: Exceção retornada pelo LLM
+
+    Returns:
+        True se vale a pena tentar novamente após uma espera
+    """
+    if type(erro).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError"):
+        return True
+    texto = str(erro).lower()
+    return "429" in texto or "rate limit" in texto or "quota" in texto
+
+
+def _espera_backoff(tentativa: int) -> float:
+    """Espera exponencial com jitter antes da próxima tentativa."""
+    espera = min(TRIAGEM_LOTE_ESPERA_MAXIMA, TRIAGEM_LOTE_ESPERA_INICIAL * 2 ** tentativa)
+    return espera * random.uniform(0.5, 1.0)
+
+
 class TriagemChain:
     """
     Chain responsável pela triagem e classificação de mensagens do Service Desk.
     """
     
-    def __init__(self):
-        """Inicializa a chain de triagem com o modelo Gemini."""
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            temperature=0.3,
-            google_api_key=GOOGLE_API_KEY,
-        )
+    def __init__(
+        self,
+        usar_pre_classificador: bool = TRIAGEM_PRE_CLASSIFICADOR,
+        limiar_confianca: float = TRIAGEM_LIMIAR_CONFIANCA,
+        cache: Optional[CacheTriagem] = None,
+    ):
+        """
+        Inicializa a chain de triagem com o modelo Gemini.
+        
+        Args:
+            usar_pre_classificador: Se as regras devem ser aplicadas antes do LLM
+            limiar_confianca: Confiança mínima das regras para dispensar o LLM
+            cache: Cache de resultados (padrão: conforme as configurações;
+                qualquer objeto com ``buscar``/``armazenar``/``estatisticas``)
+        """
+        self.llm = obter_llm(MODELO_TRIAGEM, TEMPERATURA_TRIAGEM)
         self.chain = self.llm.with_structured_output(TriagemOut)
+        self.usar_pre_classificador = usar_pre_classificador
+        self.limiar_confianca = limiar_confianca
+        self._lock = threading.Lock()
+        self.total = 0
+        self.atalhos = 0
+        if cache is None and TRIAGEM_CACHE_TAMANHO > 0:
+            cache = CacheTriagem(TRIAGEM_CACHE_TAMANHO, TRIAGEM_CACHE_TTL, TRIAGEM_CACHE_SQLITE)
+        self.cache = cache
+    
+    def _concluir(self, mensagem: str, saida: TriagemOut) -> Dict:
+        """Converte a saída do LLM, guarda no cache e registra no histórico, se ativo."""
+        resultado = saida.model_dump()
+        if self.cache is not None:
+            self.cache.armazenar(CacheTriagem.chave(mensagem, VERSAO_TRIAGEM), resultado)
+        if TRIAGEM_HISTORICO_PATH:
+            registrar_historico(TRIAGEM_HISTORICO_PATH, mensagem, resultado)
+        return resultado
+    
+    def _sem_llm(self, mensagem: str) -> Optional[Dict]:
+        """Classifica pelas regras ou pelo cache, quando possível."""
+        resultado = self._atalho(mensagem)
+        if resultado is None and self.cache is not None:
+            resultado = self.cache.buscar(CacheTriagem.chave(mensagem, VERSAO_TRIAGEM))
+        return resultado
+    
+    def _atalho(self, mensagem: str) -> Optional[Dict]:
+        """
+        Retorna a classificação por regras se a confiança atinge o limiar.
+        
+        Também contabiliza a mensagem na métrica de atalhos.
+        """
+        resultado = None
+        if self.usar_pre_classificador:
+            pre = pre_classificar(mensagem)
+            if pre is not None and pre[1] >= self.limiar_confianca:
+                resultado = pre[0].model_dump()
+        with self._lock:
+            self.total += 1
+            if resultado is not None:
+                self.atalhos += 1
+        return resultado
+    
+    def estatisticas(self) -> Dict:
+        """
+        Retorna quantas mensagens foram classificadas sem chamar o LLM.
+        
+        Returns:
+            Dict com total, atalhos, a fração de atalhos e, se ativo, o uso do cache
+        """
+        with self._lock:
+            estatisticas = {
+                "total": self.total,
+                "atalhos": self.atalhos,
+                "taxa_atalho": self.atalhos / self.total if self.total else 0.0,
+            }
+        if self.cache is not None:
+            estatisticas["cache"] = self.cache.estatisticas()
+        return estatisticas
+    
+    def _mensagens(self, mensagem: str) -> List[BaseMessage]:
+        """Monta as mensagens enviadas ao modelo para uma mensagem do usuário."""
+        return [
+            SystemMessage(content=TRIAGEM_PROMPT),
+            HumanMessage(content=mensagem)
+        ]
     
     def processar(self, mensagem: str) -> Dict:
         """
@@ -50,8 +306,147 @@ class TriagemChain:
         Returns:
             Dict com decisão, urgência e campos faltantes
         """
-        saida: TriagemOut = self.chain.invoke([
-            SystemMessage(content=TRIAGEM_PROMPT),
-            HumanMessage(content=mensagem)
-        ])
-        return saida.model_dump()
+        resultado = self._sem_llm(mensagem)
+        if resultado is not None:
+            return resultado
+        saida: TriagemOut = self.chain.invoke(self._mensagens(mensagem))
+        return self._concluir(mensagem, saida)
+    
+    async def aprocessar(self, mensagem: str) -> Dict:
+        """
+        Versão assíncrona de ``processar``, sem bloquear o event loop.
+        
+        Args:
+            mensagem: Texto da mensagem do usuário
+            
+        Returns:
+            Dict com decisão, urgência e campos faltantes
+        """
+        resultado = self._sem_llm(mensagem)
+        if resultado is not None:
+            return resultado
+        saida: TriagemOut = await self.chain.ainvoke(self._mensagens(mensagem))
+        return self._concluir(mensagem, saida)
+    
+    def _preparar_lote(self, mensagens: Sequence[str], resultados: List[Optional[Dict]]) -> List[int]:
+        """
+        Marca como erro as mensagens inválidas do lote e resolve as que as
+        regras classificam com confiança suficiente ou que estão no cache.
+        
+        Returns:
+            Índices das mensagens restantes, a enviar ao LLM
+        """
+        pendentes = []
+        for i, mensagem in enumerate(mensagens):
+            if not isinstance(mensagem, str) or not mensagem.strip():
+                resultados[i] = {"erro": "Mensagem vazia ou inválida"}
+                continue
+            resultados[i] = self._sem_llm(mensagem)
+            if resultados[i] is None:
+                pendentes.append(i)
+        return pendentes
+    
+    def _registrar_saidas(
+        self,
+        mensagens: Sequence[str],
+        pendentes: List[int],
+        saidas: List,
+        resultados: List[Optional[Dict]],
+        ultima_tentativa: bool,
+    ) -> List[int]:
+        """
+        Guarda as saídas de uma rodada do lote na posição de cada mensagem.
+        
+        Returns:
+            Índices que falharam por limite de taxa e devem ser repetidos
+        """
+        repetir = []
+        for i, saida in zip(pendentes, saidas):
+            if isinstance(saida, BaseException):
+                if _eh_limite_taxa(saida) and not ultima_tentativa:
+                    repetir.append(i)
+                else:
+                    resultados[i] = {"erro": f"Erro na triagem: {saida}"}
+            elif saida is None:
+                resultados[i] = {"erro": "Resposta inválida do modelo"}
+            else:
+                resultados[i] = self._concluir(mensagens[i], saida)
+        return repetir
+    
+    def processar_lote(
+        self,
+        mensagens: Sequence[str],
+        max_concorrencia: int = TRIAGEM_LOTE_CONCORRENCIA,
+    ) -> List[Dict]:
+        """
+        Classifica várias mensagens com ``chain.batch``.
+        
+        Erros são isolados por mensagem: uma falha não interrompe o lote.
+        Mensagens recusadas por limite de taxa são repetidas com backoff
+        exponencial.
+        
+        Args:
+            mensagens: Textos das mensagens dos usuários
+            max_concorrencia: Número máximo de chamadas simultâneas ao LLM
+            
+        Returns:
+            Lista na mesma ordem da entrada; cada item é o resultado da
+            triagem ou um dict com a chave ``erro``
+        """
+        resultados: List[Optional[Dict]] = [None] * len(mensagens)
+        pendentes = self._preparar_lote(mensagens, resultados)
+        
+        for tentativa in range(TRIAGEM_LOTE_TENTATIVAS):
+            if not pendentes:
+                break
+            if tentativa:
+                espera = _espera_backoff(tentativa - 1)
+                print(f"⏳ Limite de taxa atingido: repetindo {len(pendentes)} mensagens em {espera:.1f}s...")
+                time.sleep(espera)
+            saidas = self.chain.batch(
+                [self._mensagens(mensagens[i]) for i in pendentes],
+                config={"max_concurrency": max_concorrencia},
+                return_exceptions=True,
+            )
+            pendentes = self._registrar_saidas(
+                mensagens, pendentes, saidas, resultados, tentativa == TRIAGEM_LOTE_TENTATIVAS - 1
+            )
+        
+        return resultados
+    
+    async def aprocessar_lote(
+        self,
+        mensagens: Sequence[str],
+        max_concorrencia: int = TRIAGEM_LOTE_CONCORRENCIA,
+    ) -> List[Dict]:
+        """
+        Versão assíncrona de ``processar_lote``, usando ``chain.abatch``.
+        
+        Args:
+            mensagens: Textos das mensagens dos usuários
+            max_concorrencia: Número máximo de chamadas simultâneas ao LLM
+            
+        Returns:
+            Lista na mesma ordem da entrada; cada item é o resultado da
+            triagem ou um dict com a chave ``erro``
+        """
+        resultados: List[Optional[Dict]] = [None] * len(mensagens)
+        pendentes = self._preparar_lote(mensagens, resultados)
+        
+        for tentativa in range(TRIAGEM_LOTE_TENTATIVAS):
+            if not pendentes:
+                break
+            if tentativa:
+                espera = _espera_backoff(tentativa - 1)
+                print(f"⏳ Limite de taxa atingido: repetindo {len(pendentes)} mensagens em {espera:.1f}s...")
+                await asyncio.sleep(espera)
+            saidas = await self.chain.abatch(
+                [self._mensagens(mensagens[i]) for i in pendentes],
+                config={"max_concurrency": max_concorrencia},
+                return_exceptions=True,
+            )
+            pendentes = self._registrar_saidas(
+                mensagens, pendentes, saidas, resultados, tentativa == TRIAGEM_LOTE_TENTATIVAS - 1
+            )
+        
+        return resultados
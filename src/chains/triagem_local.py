@@ -0,0 +1,287 @@
+"""
+Triagem local com embeddings, sem chamadas de rede.
+
+Alternativa ao TriagemChain: as mensagens são classificadas por vizinhos
+mais próximos (kNN com voto ponderado pela similaridade de cosseno) entre
+exemplos rotulados, usando o mesmo modelo MiniLM do RAG local. Os exemplos
+vêm de ``CASOS_VALIDACAO``, de ``EXEMPLOS_TRIAGEM`` e do histórico de
+classificações do LLM.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.config.settings import (
+    TRIAGEM_BACKEND,
+    TRIAGEM_KNN_VIZINHOS,
+    TRIAGEM_HISTORICO_PATH,
+)
+from src.models import TriagemOut
+from src.test_data import CASOS_VALIDACAO, EXEMPLOS_TRIAGEM
+from src.tools.cache_embeddings import CachedEmbeddings
+from src.tools.latencias import percentil
+from src.tools.recursos import obter_embeddings
+
+
+def carregar_exemplos(caminho_historico: str = TRIAGEM_HISTORICO_PATH) -> List[Dict[str, str]]:
+    """
+    Reúne os exemplos rotulados para o classificador local.
+
+    Args:
+        caminho_historico: Histórico JSONL de classificações do LLM (opcional)
+
+    Returns:
+        Lista de exemplos no formato de ``CASOS_VALIDACAO``; mensagens
+        repetidas ficam com o rótulo mais recente
+    """
+    exemplos = {caso["mensagem"]: caso for caso in CASOS_VALIDACAO + EXEMPLOS_TRIAGEM}
+
+    if caminho_historico and Path(caminho_historico).exists():
+        with open(caminho_historico, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    caso = json.loads(linha)
+                except ValueError:
+                    continue  # linha truncada por uma escrita interrompida
+                exemplos[caso["mensagem"]] = caso
+
+    return list(exemplos.values())
+
+
+class TriagemLocal:
+    """
+    Classificador de triagem por kNN sobre embeddings, executado em CPU.
+
+    Expõe a mesma interface do TriagemChain (``processar``, ``aprocessar``,
+    ``processar_lote`` e ``aprocessar_lote``).
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        exemplos: Optional[List[Dict[str, str]]] = None,
+        vizinhos: int = TRIAGEM_KNN_VIZINHOS,
+    ):
+        """
+        Inicializa o classificador e calcula os embeddings dos exemplos.
+
+        Args:
+            embeddings: Modelo de embeddings (o mesmo do RAG local)
+            exemplos: Exemplos rotulados (padrão: ``carregar_exemplos()``)
+            vizinhos: Número de vizinhos considerados no voto (mínimo 1)
+        """
+        if vizinhos < 1:
+            raise ValueError(f"O número de vizinhos deve ser pelo menos 1 (recebido: {vizinhos}).")
+
+        # Mensagens de usuários não vão para o cache persistente de embeddings,
+        # que guarda apenas os chunks do corpus
+        if isinstance(embeddings, CachedEmbeddings):
+            embeddings = embeddings.embeddings
+        self.embeddings = embeddings
+        self.vizinhos = vizinhos
+        self._lock = threading.Lock()
+        self.total = 0
+        self.treinar(exemplos if exemplos is not None else carregar_exemplos())
+
+    @staticmethod
+    def _normalizar(vetores) -> np.ndarray:
+        """Converte para float32 com norma unitária por linha."""
+        matriz = np.atleast_2d(np.asarray(vetores, dtype=np.float32))
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        return matriz / np.where(normas > 0, normas, 1)
+
+    def treinar(self, exemplos: List[Dict[str, str]]) -> None:
+        """
+        Substitui os exemplos rotulados do classificador.
+
+        Args:
+            exemplos: Exemplos no formato de ``CASOS_VALIDACAO``
+        """
+        if not exemplos:
+            raise ValueError("A triagem local precisa de pelo menos um exemplo rotulado.")
+
+        self.exemplos = list(exemplos)
+        self._matriz = self._normalizar(
+            self.embeddings.embed_documents([caso["mensagem"] for caso in self.exemplos])
+        )
+        self._decisoes = np.array([caso["decisao_esperada"] for caso in self.exemplos])
+        self._urgencias = np.array([caso["urgencia_esperada"] for caso in self.exemplos])
+
+    def _votar(self, similaridades: np.ndarray, rotulos: np.ndarray, excluir: Optional[int] = None) -> str:
+        """Rótulo com maior soma de similaridade entre os k vizinhos mais próximos."""
+        if excluir is not None:
+            similaridades = similaridades.copy()
+            similaridades[excluir] = -np.inf
+        k = min(self.vizinhos, len(similaridades) - (excluir is not None))
+        vizinhos = np.argpartition(-similaridades, k - 1)[:k]
+
+        votos: Dict[str, float] = {}
+        for i in vizinhos:
+            votos[rotulos[i]] = votos.get(rotulos[i], 0.0) + max(float(similaridades[i]), 0.0)
+        return str(max(votos, key=votos.get))
+
+    def _classificar_vetores(self, vetores) -> List[Dict]:
+        """Classifica embeddings já calculados."""
+        similaridades = self._normalizar(vetores) @ self._matriz.T
+        resultados = []
+        for linha in similaridades:
+            decisao = self._votar(linha, self._decisoes)
+            saida = TriagemOut(
+                decisão=decisao,
+                urgencia=self._votar(linha, self._urgencias),
+                campos_faltantes=["tema ou política específica"] if decisao == "PEDIR_INFO" else [],
+            )
+            resultados.append(saida.model_dump())
+
+        with self._lock:
+            self.total += len(resultados)
+        return resultados
+
+    def processar(self, mensagem: str) -> Dict:
+        """
+        Classifica uma mensagem.
+
+        Args:
+            mensagem: Texto da mensagem do usuário
+
+        Returns:
+            Dict com decisão, urgência e campos faltantes
+        """
+        return self._classificar_vetores([self.embeddings.embed_query(mensagem)])[0]
+
+    async def aprocessar(self, mensagem: str) -> Dict:
+        """Versão assíncrona de ``processar`` (o cálculo roda em uma thread)."""
+        return await asyncio.to_thread(self.processar, mensagem)
+
+    def processar_lote(self, mensagens: Sequence[str], max_concorrencia: int = 0) -> List[Dict]:
+        """
+        Classifica várias mensagens com um único cálculo de embeddings.
+
+        Args:
+            mensagens: Textos das mensagens dos usuários
+            max_concorrencia: Ignorado; mantido para compatibilidade com o TriagemChain
+
+        Returns:
+            Lista na mesma ordem da entrada; mensagens inválidas retornam
+            um dict com a chave ``erro``
+        """
+        resultados: List[Dict] = [{"erro": "Mensagem vazia ou inválida"} for _ in mensagens]
+        validas = [i for i, m in enumerate(mensagens) if isinstance(m, str) and m.strip()]
+        if validas:
+            vetores = self.embeddings.embed_documents([mensagens[i] for i in validas])
+            for i, resultado in zip(validas, self._classificar_vetores(vetores)):
+                resultados[i] = resultado
+        return resultados
+
+    async def aprocessar_lote(self, mensagens: Sequence[str], max_concorrencia: int = 0) -> List[Dict]:
+        """Versão assíncrona de ``processar_lote`` (o cálculo roda em uma thread)."""
+        return await asyncio.to_thread(self.processar_lote, mensagens)
+
+    def estatisticas(self) -> Dict:
+        """
+        Retorna o número de mensagens classificadas.
+
+        Nenhuma mensagem passa pelo LLM, por isso todas contam como atalho.
+
+        Returns:
+            Dict com total, atalhos e a fração de atalhos
+        """
+        with self._lock:
+            return {
+                "total": self.total,
+                "atalhos": self.total,
+                "taxa_atalho": 1.0 if self.total else 0.0,
+            }
+
+    def relatorio_precisao(self, referencia=None, mensagens: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Mede a concordância do classificador local com os rótulos do LLM.
+
+        Sem ``referencia``, avalia os próprios exemplos por leave-one-out
+        (cada exemplo é classificado pelos demais). Com ``referencia`` (um
+        TriagemChain), compara com a classificação do LLM para ``mensagens``.
+
+        O leave-one-out exige pelo menos dois exemplos de cada decisão e de
+        cada urgência: um exemplo único da sua classe nunca pode ser
+        acertado pelos demais, e a acurácia medida seria artificialmente baixa.
+
+        Args:
+            referencia: Classificador de referência (opcional)
+            mensagens: Mensagens classificadas pela referência
+
+        Returns:
+            Dict com número de casos, acurácia de decisão e de urgência e
+            latência local (média e p95, em ms)
+
+        Raises:
+            ValueError: Se alguma classe tiver menos de dois exemplos no
+                leave-one-out
+        """
+        latencias = []
+        acertos_decisao = acertos_urgencia = 0
+
+        if referencia is None:
+            contagem = Counter(self._decisoes.tolist()) + Counter(self._urgencias.tolist())
+            insuficientes = sorted(rotulo for rotulo, n in contagem.items() if n < 2)
+            if insuficientes:
+                raise ValueError(
+                    "O leave-one-out precisa de pelo menos dois exemplos por classe; "
+                    f"com apenas um: {', '.join(insuficientes)}."
+                )
+            for i, caso in enumerate(self.exemplos):
+                inicio = time.perf_counter()
+                linha = self._normalizar([self.embeddings.embed_query(caso["mensagem"])])[0] @ self._matriz.T
+                decisao = self._votar(linha, self._decisoes, excluir=i)
+                urgencia = self._votar(linha, self._urgencias, excluir=i)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                acertos_decisao += decisao == caso["decisao_esperada"]
+                acertos_urgencia += urgencia == caso["urgencia_esperada"]
+            total = len(self.exemplos)
+        else:
+            mensagens = list(mensagens or [caso["mensagem"] for caso in self.exemplos])
+            esperados = referencia.processar_lote(mensagens)
+            for mensagem, esperado in zip(mensagens, esperados):
+                if "erro" in esperado:
+                    continue
+                inicio = time.perf_counter()
+                obtido = self.processar(mensagem)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                acertos_decisao += obtido["decisão"] == esperado["decisão"]
+                acertos_urgencia += obtido["urgencia"] == esperado["urgencia"]
+            total = len(latencias)
+
+        return {
+            "casos": total,
+            "acuracia_decisao": acertos_decisao / total if total else 0.0,
+            "acuracia_urgencia": acertos_urgencia / total if total else 0.0,
+            "latencia_media_ms": sum(latencias) / total if total else 0.0,
+            "latencia_p95_ms": percentil(latencias, 95),
+        }
+
+
+def criar_triagem(backend: str = TRIAGEM_BACKEND, embeddings: Optional[Embeddings] = None):
+    """
+    Cria o classificador de triagem configurado.
+
+    Args:
+        backend: "llm" (Gemini) ou "local" (kNN sobre embeddings)
+        embeddings: Modelo de embeddings para o backend local (padrão:
+            o modelo compartilhado do processo)
+
+    Returns:
+        TriagemChain ou TriagemLocal
+    """
+    if backend == "local":
+        return TriagemLocal(embeddings if embeddings is not None else obter_embeddings())
+    if backend != "llm":
+        raise ValueError(f"Backend de triagem inválido: {backend}. Use 'llm' ou 'local'.")
+
+    from src.chains.triagem import TriagemChain
+    return TriagemChain()
@@ -61,6 +61,130 @@ GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
 LANGCHAIN_TRACING_V2: bool = os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true"
 LANGCHAIN_API_KEY: str = os.getenv("LANGCHAIN_API_KEY", "")
 
+# =============================================================================
+# CONFIGURAÇÕES DO RAG
+# =============================================================================
+
+# Parâmetros de divisão dos documentos em chunks
+RAG_CHUNK_SIZE: int = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+RAG_CHUNK_OVERLAP: int = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+
+# Diretório onde o índice vetorial é persistido entre execuções
+RAG_INDEX_DIR: str = os.getenv("RAG_INDEX_DIR", ".rag_index")
+
+# Desativa a persistência do índice (força reconstrução a cada execução)
+RAG_INDEX_CACHE: bool = os.getenv("RAG_INDEX_CACHE", "true").lower() == "true"
+
+# Processos usados para ler os PDFs (1 = leitura sequencial)
+RAG_INGESTAO_WORKERS: int = int(os.getenv("RAG_INGESTAO_WORKERS", "1"))
+
+# PDFs com mais páginas que isso são divididos em várias unidades de trabalho
+RAG_PAGINAS_POR_UNIDADE: int = int(os.getenv("RAG_PAGINAS_POR_UNIDADE", "50"))
+
+# Pipeline de embeddings: chunks por lote, threads do torch (0 = padrão do
+# torch) e processos que dividem os lotes entre si (1 = processo atual)
+RAG_EMBEDDING_BATCH: int = int(os.getenv("RAG_EMBEDDING_BATCH", "64"))
+RAG_EMBEDDING_THREADS: int = int(os.getenv("RAG_EMBEDDING_THREADS", "0"))
+RAG_EMBEDDING_WORKERS: int = int(os.getenv("RAG_EMBEDDING_WORKERS", "1"))
+
+# Cache persistente de embeddings de chunks (evita recalcular textos idênticos)
+RAG_EMBEDDING_CACHE: bool = os.getenv("RAG_EMBEDDING_CACHE", "true").lower() == "true"
+RAG_EMBEDDING_CACHE_PATH: str = os.getenv(
+    "RAG_EMBEDDING_CACHE_PATH", str(Path(RAG_INDEX_DIR) / "embeddings.sqlite")
+)
+
+# Cache em memória de embeddings das perguntas (TTL em segundos, 0 = sem expiração)
+RAG_QUERY_CACHE_TAMANHO: int = int(os.getenv("RAG_QUERY_CACHE_TAMANHO", "1024"))
+RAG_QUERY_CACHE_TTL: float = float(os.getenv("RAG_QUERY_CACHE_TTL", "0"))
+
+# Cache semântico de respostas: reaproveita a resposta de perguntas com
+# similaridade de cosseno acima do limiar que recuperam os mesmos chunks
+RAG_RESPOSTA_CACHE_TAMANHO: int = int(os.getenv("RAG_RESPOSTA_CACHE_TAMANHO", "256"))
+RAG_RESPOSTA_CACHE_LIMIAR: float = float(os.getenv("RAG_RESPOSTA_CACHE_LIMIAR", "0.95"))
+
+# Diretório do índice somente leitura compartilhado entre workers via mmap
+# (vazio = desativado; cada processo mantém seu próprio índice em memória).
+# Com RAG_BUSCA_HIBRIDA, o BM25 continua sendo construído por cada worker.
+RAG_INDICE_COMPARTILHADO: str = os.getenv("RAG_INDICE_COMPARTILHADO", "")
+
+# Busca híbrida: BM25 + vetorial combinados por Reciprocal Rank Fusion
+# (desativada por padrão: muda os chunks recuperados; ative com "true")
+RAG_BUSCA_HIBRIDA: bool = os.getenv("RAG_BUSCA_HIBRIDA", "false").lower() == "true"
+RAG_HIBRIDO_CANDIDATOS: int = int(os.getenv("RAG_HIBRIDO_CANDIDATOS", "20"))
+RAG_RRF_K: int = int(os.getenv("RAG_RRF_K", "60"))
+
+# Tipo do índice vetorial: "flat" (exato), "hnsw" ou "ivfpq" (aproximados)
+RAG_TIPO_INDICE: str = os.getenv("RAG_TIPO_INDICE", "flat").lower()
+
+# HNSW: conexões por nó, qualidade da construção e amplitude da busca
+RAG_HNSW_M: int = int(os.getenv("RAG_HNSW_M", "32"))
+RAG_HNSW_EF_CONSTRUCTION: int = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "200"))
+RAG_HNSW_EF_SEARCH: int = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+
+# IVF-PQ: listas invertidas (0 = automático), listas visitadas por busca,
+# subquantizadores do PQ (deve dividir a dimensão), bits por código e
+# número de vetores usados no treino (elevado a max(nlist, 2**bits) se menor)
+RAG_IVF_NLIST: int = int(os.getenv("RAG_IVF_NLIST", "0"))
+RAG_IVF_NPROBE: int = int(os.getenv("RAG_IVF_NPROBE", "8"))
+RAG_PQ_M: int = int(os.getenv("RAG_PQ_M", "48"))
+RAG_PQ_NBITS: int = int(os.getenv("RAG_PQ_NBITS", "8"))
+RAG_IVF_AMOSTRA_TREINO: int = int(os.getenv("RAG_IVF_AMOSTRA_TREINO", "20000"))
+
+# Re-ranking dos candidatos com cross-encoder local (CPU). Se o re-ranking
+# não terminar dentro do orçamento (ms), mantém a ordem original da busca
+RAG_RERANK: bool = os.getenv("RAG_RERANK", "false").lower() == "true"
+RAG_RERANK_MODELO: str = os.getenv("RAG_RERANK_MODELO", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+RAG_RERANK_CANDIDATOS: int = int(os.getenv("RAG_RERANK_CANDIDATOS", "20"))
+RAG_RERANK_ORCAMENTO_MS: float = float(os.getenv("RAG_RERANK_ORCAMENTO_MS", "300"))
+
+# Triagem em lote: chamadas simultâneas ao LLM e novas tentativas com
+# backoff exponencial (segundos) quando a API sinaliza limite de taxa
+TRIAGEM_LOTE_CONCORRENCIA: int = int(os.getenv("TRIAGEM_LOTE_CONCORRENCIA", "8"))
+TRIAGEM_LOTE_TENTATIVAS: int = int(os.getenv("TRIAGEM_LOTE_TENTATIVAS", "5"))
+TRIAGEM_LOTE_ESPERA_INICIAL: float = float(os.getenv("TRIAGEM_LOTE_ESPERA_INICIAL", "1"))
+TRIAGEM_LOTE_ESPERA_MAXIMA: float = float(os.getenv("TRIAGEM_LOTE_ESPERA_MAXIMA", "60"))
+
+# Pré-classificador por regras: mensagens classificadas com confiança acima
+# do limiar não passam pelo LLM. Desativado por padrão até ser medido contra
+# CASOS_VALIDACAO (ver test_pre_classificador.py)
+TRIAGEM_PRE_CLASSIFICADOR: bool = os.getenv("TRIAGEM_PRE_CLASSIFICADOR", "false").lower() == "true"
+TRIAGEM_LIMIAR_CONFIANCA: float = float(os.getenv("TRIAGEM_LIMIAR_CONFIANCA", "0.9"))
+
+# Backend de triagem: "llm" (Gemini) ou "local" (kNN sobre embeddings MiniLM)
+TRIAGEM_BACKEND: str = os.getenv("TRIAGEM_BACKEND", "llm").lower()
+TRIAGEM_KNN_VIZINHOS: int = int(os.getenv("TRIAGEM_KNN_VIZINHOS", "5"))
+
+# Histórico (JSONL) das classificações feitas pelo LLM, usado como exemplos
+# rotulados pelo backend local (vazio = não registra)
+TRIAGEM_HISTORICO_PATH: str = os.getenv("TRIAGEM_HISTORICO_PATH", "")
+
+# Cache de resultados da triagem por texto normalizado (tamanho 0 = desativado);
+# o SQLite opcional mantém os resultados entre reinícios
+TRIAGEM_CACHE_TAMANHO: int = int(os.getenv("TRIAGEM_CACHE_TAMANHO", "1024"))
+TRIAGEM_CACHE_TTL: float = float(os.getenv("TRIAGEM_CACHE_TTL", "0"))
+TRIAGEM_CACHE_SQLITE: str = os.getenv("TRIAGEM_CACHE_SQLITE", "")
+
+# Recuperação especulativa: a busca do RAG começa em paralelo com a triagem
+# e é descartada se a triagem decidir que o RAG não é necessário
+GRAFO_RECUPERACAO_ESPECULATIVA: bool = os.getenv("GRAFO_RECUPERACAO_ESPECULATIVA", "true").lower() == "true"
+
+# Aquecimento: ao inicializar o agente, o índice do RAG e a triagem começam a
+# ser carregados em segundo plano, em vez de na primeira requisição
+AGENTE_AQUECIMENTO: bool = os.getenv("AGENTE_AQUECIMENTO", "true").lower() == "true"
+
+# Execução concorrente do grafo: mensagens processadas ao mesmo tempo
+GRAFO_MAX_WORKERS: int = int(os.getenv("GRAFO_MAX_WORKERS", "8"))
+
+# Serviço HTTP: endereço, requisições atendidas ao mesmo tempo, requisições
+# aguardando na fila (além disso, responde 429), tempo limite de resposta (s)
+# e tamanho máximo do corpo (bytes)
+API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
+API_PORTA: int = int(os.getenv("API_PORTA", "8000"))
+API_CONCORRENCIA: int = int(os.getenv("API_CONCORRENCIA", "4"))
+API_FILA_MAXIMA: int = int(os.getenv("API_FILA_MAXIMA", "32"))
+API_TEMPO_LIMITE: float = float(os.getenv("API_TEMPO_LIMITE", "120"))
+API_CORPO_MAXIMO: int = int(os.getenv("API_CORPO_MAXIMO", "65536"))
+
 # =============================================================================
 # VALIDAÇÕES
 # =============================================================================
@@ -1,6 +1,14 @@
 """
 Módulo de grafos LangGraph para orquestração de agentes.
 """
-from .service_desk_graph import ServiceDeskGraph
+from typing import TYPE_CHECKING
+
+from src import importacao_tardia
+
+if TYPE_CHECKING:
+    from .service_desk_graph import ServiceDeskGraph
+
+_EXPORTACOES = {"ServiceDeskGraph": ".service_desk_graph"}
 
 __all__ = ["ServiceDeskGraph"]
+__getattr__ = importacao_tardia(__name__, _EXPORTACOES)
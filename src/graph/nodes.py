@@ -1,104 +1,310 @@
 """
 Nós do grafo LangGraph para processamento de Service Desk.
 
-Cada nó representa uma etapa específica do processamento e recebe
-o estado atual, processa e retorna o estado atualizado.
+Cada nó representa uma etapa específica do processamento: recebe o estado
+atual, sem alterá-lo, e retorna apenas os campos que mudaram. O LangGraph
+aplica essas atualizações parciais, o que permite executar o mesmo grafo em
+várias threads ao mesmo tempo.
 """
-from typing import Dict, Any
+import asyncio
+import functools
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, Optional
+from langchain_core.runnables import RunnableConfig
+from src.config.settings import GRAFO_RECUPERACAO_ESPECULATIVA, TRIAGEM_BACKEND
 from src.graph.state import ServiceDeskState
-from src.chains import TriagemChain
-from src.tools.rag_local import RAGSystemLocal
+from src.tools.recursos import obter_executor_especulativo, obter_rag, obter_triagem
+
+
+# Decisões da triagem que passam pelo nó de RAG
+DECISOES_COM_RAG = ("AUTO_RESOLVER", "PEDIR_INFO")
+
+
+def _com_etapa(atualizacao: Dict[str, Any], no: str, inicio: float, contador: float) -> Dict[str, Any]:
+    """Acrescenta à atualização do nó o registro da sua execução no rastro."""
+    etapa = {
+        "no": no,
+        "inicio": inicio,
+        "fim": time.time(),
+        "duracao_ms": (time.perf_counter() - contador) * 1000,
+        "resultado": "erro" if atualizacao.get("erro") else "ok",
+    }
+    # O rastro é concatenado pelo redutor do estado
+    return {**atualizacao, "rastro": [etapa]}
+
+
+def rastrear(no: str):
+    """
+    Registra no rastro do estado o nome, início, fim, duração e resultado do nó.
+    
+    Funciona com nós síncronos e assíncronos e preserva a assinatura original
+    (o LangGraph usa a assinatura para decidir se repassa a configuração).
+    
+    Args:
+        no: Nome do nó no grafo
+    """
+    def decorador(metodo):
+        if asyncio.iscoroutinefunction(metodo):
+            @functools.wraps(metodo)
+            async def executar_async(self, state: ServiceDeskState, *args, **kwargs):
+                inicio, contador = time.time(), time.perf_counter()
+                atualizacao = await metodo(self, state, *args, **kwargs)
+                return _com_etapa(atualizacao, no, inicio, contador)
+            return executar_async
+        
+        @functools.wraps(metodo)
+        def executar(self, state: ServiceDeskState, *args, **kwargs):
+            inicio, contador = time.time(), time.perf_counter()
+            atualizacao = metodo(self, state, *args, **kwargs)
+            return _com_etapa(atualizacao, no, inicio, contador)
+        return executar
+    return decorador
+
+
+def _emissor(config: Optional[RunnableConfig]) -> Optional[Callable[[Dict], None]]:
+    """Função que recebe os eventos de streaming da execução, se houver."""
+    return ((config or {}).get("configurable") or {}).get("emitir_evento")
 
 
 class ServiceDeskNodes:
     """
     Classe que contém todos os nós do grafo de Service Desk.
     
-    Cada método representa um nó do grafo e recebe o estado atual,
-    processa a informação e retorna o estado atualizado.
+    Cada método representa um nó do grafo: recebe o estado atual e retorna
+    um dict com os campos atualizados. A instância não guarda estado por
+    requisição e pode ser usada por várias threads ao mesmo tempo.
     """
     
-    def __init__(self):
-        """Inicializa os nós com as dependências necessárias."""
-        self.triagem_chain = TriagemChain()
-        self.rag_system = None  # Será inicializado quando necessário
+    def __init__(self, recuperacao_especulativa: bool = GRAFO_RECUPERACAO_ESPECULATIVA):
+        """
+        Inicializa os nós com as dependências necessárias.
+        
+        Args:
+            recuperacao_especulativa: Se a busca do RAG deve começar em
+                paralelo com a triagem
+        """
+        self.recuperacao_especulativa = recuperacao_especulativa
+    
+    @property
+    def triagem_chain(self):
+        """Classificador de triagem compartilhado (construído no primeiro uso)."""
+        return obter_triagem(TRIAGEM_BACKEND)
+    
+    @property
+    def rag_system(self):
+        """Sistema RAG compartilhado (o índice é carregado no primeiro uso)."""
+        return obter_rag()
     
     def _inicializar_rag(self) -> None:
-        """Inicializa o sistema RAG se ainda não foi inicializado."""
-        if self.rag_system is None:
-            self.rag_system = RAGSystemLocal()
-            self.rag_system.inicializar()
+        """Carrega o sistema RAG compartilhado, se ainda não foi carregado."""
+        # O registro garante uma única construção, mesmo com chamadas concorrentes
+        obter_rag()
     
-    def executar_triagem(self, state: ServiceDeskState) -> ServiceDeskState:
+    def _recuperar_especulativo(self, mensagem: str) -> Optional[Dict]:
+        """Busca os chunks da mensagem antes de a triagem decidir se o RAG será usado."""
+        try:
+            return self.rag_system.recuperar(mensagem)
+        except Exception as e:
+            # O nó de RAG refaz a busca normalmente
+            print(f"⚠️ Recuperação antecipada falhou: {e}")
+            return None
+    
+    def _iniciar_especulacao(self, state: ServiceDeskState) -> Optional[Future]:
+        """Dispara a recuperação especulativa no pool compartilhado, se ativa."""
+        if not self.recuperacao_especulativa:
+            return None
+        try:
+            return obter_executor_especulativo().submit(self._recuperar_especulativo, state.mensagem_original)
+        except RuntimeError:
+            # Pool encerrado: o nó de RAG faz a busca normalmente
+            return None
+    
+    @rastrear("triagem")
+    def executar_triagem(self, state: ServiceDeskState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
         """
         Nó de triagem: classifica a mensagem do usuário.
         
         Args:
             state: Estado atual do grafo
+            config: Configuração da execução (pode trazer o emissor de eventos)
             
         Returns:
-            Estado atualizado com resultado da triagem
+            Campos do estado atualizados com o resultado da triagem
         """
         try:
             print("🔍 Executando triagem...")
             
+            # A busca do RAG roda enquanto a triagem aguarda o LLM
+            especulacao = self._iniciar_especulacao(state)
+            
             # Executa a triagem
             resultado_triagem = self.triagem_chain.processar(state.mensagem_original)
+            atualizacao = self._aplicar_triagem(resultado_triagem, _emissor(config))
             
-            # Atualiza o estado
-            state.triagem = resultado_triagem
-            state.decisao = resultado_triagem['decisão']
-            state.urgencia = resultado_triagem['urgencia']
-            state.campos_faltantes = resultado_triagem['campos_faltantes']
+            if especulacao is not None:
+                if atualizacao["decisao"] in DECISOES_COM_RAG:
+                    if especulacao.cancel():
+                        # A busca ainda esperava uma thread livre: faz aqui mesmo
+                        atualizacao["recuperacao"] = self._recuperar_especulativo(state.mensagem_original)
+                    else:
+                        atualizacao["recuperacao"] = especulacao.result()
+                else:
+                    # ABRIR_CHAMADO: o resultado da busca é descartado
+                    especulacao.cancel()
             
-            # Determina se precisa de mais informações
-            state.precisa_mais_info = state.decisao == "PEDIR_INFO"
+            return atualizacao
+        
+        except Exception as e:
+            print(f"❌ Erro na triagem: {e}")
+            return {"erro": f"Erro na triagem: {e}"}
+    
+    @rastrear("triagem")
+    async def aexecutar_triagem(self, state: ServiceDeskState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """
+        Versão assíncrona do nó de triagem.
+        
+        Args:
+            state: Estado atual do grafo
+            config: Configuração da execução (pode trazer o emissor de eventos)
+            
+        Returns:
+            Campos do estado atualizados com o resultado da triagem
+        """
+        try:
+            print("🔍 Executando triagem...")
+            especulacao = self._iniciar_especulacao(state)
             
-            print(f"✅ Triagem concluída: {state.decisao} - {state.urgencia}")
+            resultado_triagem = await self.triagem_chain.aprocessar(state.mensagem_original)
+            atualizacao = self._aplicar_triagem(resultado_triagem, _emissor(config))
             
+            if especulacao is not None:
+                if atualizacao["decisao"] in DECISOES_COM_RAG:
+                    if especulacao.cancel():
+                        atualizacao["recuperacao"] = await asyncio.to_thread(
+                            self._recuperar_especulativo, state.mensagem_original
+                        )
+                    else:
+                        atualizacao["recuperacao"] = await asyncio.wrap_future(especulacao)
+                else:
+                    especulacao.cancel()
+            
+            return atualizacao
+        
         except Exception as e:
-            state.erro = f"Erro na triagem: {e}"
             print(f"❌ Erro na triagem: {e}")
+            return {"erro": f"Erro na triagem: {e}"}
+    
+    def _aplicar_triagem(
+        self,
+        resultado_triagem: Dict,
+        emitir: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict[str, Any]:
+        """Campos do estado definidos pelo resultado da triagem."""
+        decisao = resultado_triagem['decisão']
+        atualizacao = {
+            "triagem": resultado_triagem,
+            "decisao": decisao,
+            "urgencia": resultado_triagem['urgencia'],
+            "campos_faltantes": resultado_triagem['campos_faltantes'],
+            # Determina se precisa de mais informações
+            "precisa_mais_info": decisao == "PEDIR_INFO",
+        }
         
-        return state
+        print(f"✅ Triagem concluída: {decisao} - {atualizacao['urgencia']}")
+        if emitir:
+            emitir({"tipo": "triagem", "triagem": resultado_triagem})
+        return atualizacao
     
-    def executar_rag(self, state: ServiceDeskState) -> ServiceDeskState:
+    @rastrear("rag")
+    def executar_rag(self, state: ServiceDeskState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
         """
         Nó de RAG: busca informações nas políticas da empresa.
         
+        Com um emissor de eventos na configuração, os documentos e os trechos
+        da resposta são repassados conforme o LLM gera a resposta.
+        
         Args:
             state: Estado atual do grafo
+            config: Configuração da execução (pode trazer o emissor de eventos)
             
         Returns:
-            Estado atualizado com resposta do RAG
+            Campos do estado atualizados com a resposta do RAG
         """
         try:
             # Só executa RAG se for AUTO_RESOLVER ou PEDIR_INFO
-            if state.decisao not in ["AUTO_RESOLVER", "PEDIR_INFO"]:
+            if state.decisao not in DECISOES_COM_RAG:
                 print("⏭️ Pulando RAG - não necessário para esta decisão")
-                return state
+                return {}
             
             print("📚 Executando busca RAG...")
             
-            # Inicializa RAG se necessário
-            self._inicializar_rag()
+            # Obtém o RAG compartilhado (carregado uma única vez)
+            rag_system = self.rag_system
             
-            # Executa a busca
-            resultado_rag = self.rag_system.consultar(state.mensagem_original)
+            # Executa a busca (reaproveitando a recuperação antecipada, se houver)
+            emitir = _emissor(config)
+            if emitir is None:
+                resultado_rag = rag_system.consultar(state.mensagem_original, recuperacao=state.recuperacao)
+            else:
+                for evento in rag_system.consultar_stream(state.mensagem_original, recuperacao=state.recuperacao):
+                    if evento["tipo"] == "fim":
+                        resultado_rag = evento["resultado"]
+                    else:
+                        emitir(evento)
+            return self._aplicar_rag(resultado_rag)
+        
+        except Exception as e:
+            print(f"❌ Erro no RAG: {e}")
+            return {"erro": f"Erro no RAG: {e}"}
+    
+    @rastrear("rag")
+    async def aexecutar_rag(self, state: ServiceDeskState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """
+        Versão assíncrona do nó de RAG.
+        
+        Args:
+            state: Estado atual do grafo
+            config: Configuração da execução (pode trazer o emissor de eventos)
             
-            # Atualiza o estado
-            state.resposta_rag = resultado_rag['resposta']
-            state.documentos_relevantes = resultado_rag['documentos_relevantes']
+        Returns:
+            Campos do estado atualizados com a resposta do RAG
+        """
+        try:
+            if state.decisao not in DECISOES_COM_RAG:
+                print("⏭️ Pulando RAG - não necessário para esta decisão")
+                return {}
             
-            print(f"✅ RAG concluído: {len(state.documentos_relevantes)} documentos consultados")
+            print("📚 Executando busca RAG...")
             
+            # O carregamento do índice é bloqueante: roda fora do event loop
+            rag_system = await asyncio.to_thread(obter_rag)
+            emitir = _emissor(config)
+            if emitir is None:
+                resultado_rag = await rag_system.aconsultar(state.mensagem_original, recuperacao=state.recuperacao)
+            else:
+                async for evento in rag_system.aconsultar_stream(state.mensagem_original, recuperacao=state.recuperacao):
+                    if evento["tipo"] == "fim":
+                        resultado_rag = evento["resultado"]
+                    else:
+                        emitir(evento)
+            return self._aplicar_rag(resultado_rag)
+        
         except Exception as e:
-            state.erro = f"Erro no RAG: {e}"
             print(f"❌ Erro no RAG: {e}")
-        
-        return state
+            return {"erro": f"Erro no RAG: {e}"}
     
-    def gerar_recomendacao(self, state: ServiceDeskState) -> ServiceDeskState:
+    def _aplicar_rag(self, resultado_rag: Dict) -> Dict[str, Any]:
+        """Campos do estado definidos pela resposta do RAG."""
+        print(f"✅ RAG concluído: {len(resultado_rag['documentos_relevantes'])} documentos consultados")
+        return {
+            "resposta_rag": resultado_rag['resposta'],
+            "documentos_relevantes": resultado_rag['documentos_relevantes'],
+            "recuperacao": None,
+        }
+    
+    @rastrear("recomendacao")
+    def gerar_recomendacao(self, state: ServiceDeskState) -> Dict[str, Any]:
         """
         Nó de recomendação: gera recomendação baseada na análise.
         
@@ -106,7 +312,7 @@ class ServiceDeskNodes:
             state: Estado atual do grafo
             
         Returns:
-            Estado atualizado com recomendação
+            Campos do estado atualizados com a recomendação
         """
         try:
             print("💡 Gerando recomendação...")
@@ -114,42 +320,42 @@ class ServiceDeskNodes:
             # Gera recomendação baseada na decisão
             if state.decisao == "AUTO_RESOLVER":
                 if state.resposta_rag:
-                    state.recomendacao = (
+                    recomendacao = (
                         "✅ Esta solicitação pode ser respondida automaticamente. "
                         f"Resposta baseada nas políticas: {state.resposta_rag[:200]}..."
                     )
                 else:
-                    state.recomendacao = (
+                    recomendacao = (
                         "✅ Esta solicitação pode ser respondida automaticamente "
                         "com base nas políticas da empresa."
                     )
-                state.acao_sugerida = "Responder automaticamente"
-                
+                acao_sugerida = "Responder automaticamente"
+            
             elif state.decisao == "PEDIR_INFO":
                 campos = ', '.join(state.campos_faltantes) if state.campos_faltantes else 'informações específicas'
-                state.recomendacao = (
+                recomendacao = (
                     f"❓ Solicite mais informações do usuário: {campos}. "
                     f"{state.resposta_rag[:100] if state.resposta_rag else ''}"
                 )
-                state.acao_sugerida = "Solicitar mais informações"
-                
+                acao_sugerida = "Solicitar mais informações"
+            
             else:  # ABRIR_CHAMADO
-                state.recomendacao = (
+                recomendacao = (
                     f"🎫 Abra um chamado no sistema de Service Desk. "
                     f"Urgência: {state.urgencia}. "
                     "Motivo: Solicitação que requer processamento manual."
                 )
-                state.acao_sugerida = self._determinar_acao_chamado(state.urgencia)
-            
-            print(f"✅ Recomendação gerada: {state.acao_sugerida}")
+                acao_sugerida = self._determinar_acao_chamado(state.urgencia)
             
+            print(f"✅ Recomendação gerada: {acao_sugerida}")
+            return {"recomendacao": recomendacao, "acao_sugerida": acao_sugerida}
+        
         except Exception as e:
-            state.erro = f"Erro ao gerar recomendação: {e}"
             print(f"❌ Erro ao gerar recomendação: {e}")
-        
-        return state
+            return {"erro": f"Erro ao gerar recomendação: {e}"}
     
-    def solicitar_mais_info(self, state: ServiceDeskState) -> ServiceDeskState:
+    @rastrear("solicitar_info")
+    def solicitar_mais_info(self, state: ServiceDeskState) -> Dict[str, Any]:
         """
         Nó para solicitar mais informações do usuário.
         
@@ -157,38 +363,42 @@ class ServiceDeskNodes:
             state: Estado atual do grafo
             
         Returns:
-            Estado atualizado com solicitação de informações
+            Campos do estado atualizados com a solicitação de informações
         """
         try:
             print("❓ Solicitando mais informações...")
             
             # Incrementa tentativas
-            state.tentativas += 1
+            tentativas = state.tentativas + 1
             
             # Gera mensagem de solicitação
             if state.campos_faltantes:
                 campos = ', '.join(state.campos_faltantes)
-                state.recomendacao = f"❓ Para melhor atendê-lo, preciso saber mais sobre: {campos}"
+                recomendacao = f"❓ Para melhor atendê-lo, preciso saber mais sobre: {campos}"
             else:
-                state.recomendacao = "❓ Para melhor atendê-lo, preciso de mais informações específicas sobre sua solicitação."
+                recomendacao = "❓ Para melhor atendê-lo, preciso de mais informações específicas sobre sua solicitação."
             
-            state.acao_sugerida = "Solicitar mais informações"
+            atualizacao = {
+                "tentativas": tentativas,
+                "recomendacao": recomendacao,
+                "acao_sugerida": "Solicitar mais informações",
+            }
             
             # Verifica se excedeu o limite de tentativas
-            if state.tentativas >= state.max_tentativas:
-                state.recomendacao += " (Limite de tentativas atingido. Abrindo chamado.)"
-                state.acao_sugerida = "Abrir chamado após limite de tentativas"
-                state.precisa_mais_info = False
-            
-            print(f"✅ Solicitação de informações gerada (tentativa {state.tentativas})")
+            if tentativas >= state.max_tentativas:
+                atualizacao["recomendacao"] += " (Limite de tentativas atingido. Abrindo chamado.)"
+                atualizacao["acao_sugerida"] = "Abrir chamado após limite de tentativas"
+                atualizacao["precisa_mais_info"] = False
             
+            print(f"✅ Solicitação de informações gerada (tentativa {tentativas})")
+            return atualizacao
+        
         except Exception as e:
-            state.erro = f"Erro ao solicitar informações: {e}"
             print(f"❌ Erro ao solicitar informações: {e}")
-        
-        return state
+            return {"erro": f"Erro ao solicitar informações: {e}"}
     
-    def finalizar_processamento(self, state: ServiceDeskState) -> ServiceDeskState:
+    @rastrear("finalizar")
+    def finalizar_processamento(self, state: ServiceDeskState) -> Dict[str, Any]:
         """
         Nó final: marca o processamento como finalizado.
         
@@ -196,12 +406,11 @@ class ServiceDeskNodes:
             state: Estado atual do grafo
             
         Returns:
-            Estado finalizado
+            Campos do estado que marcam o fim do processamento
         """
         print("🏁 Finalizando processamento...")
-        state.finalizado = True
         print("✅ Processamento finalizado!")
-        return state
+        return {"finalizado": True}
     
     def _determinar_acao_chamado(self, urgencia: str) -> str:
         """
@@ -4,10 +4,13 @@ Grafo LangGraph para orquestração do sistema de Service Desk.
 Este módulo define o fluxo de trabalho do sistema usando LangGraph,
 permitindo fluxos condicionais e reutilização de componentes.
 """
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Literal, Optional, Sequence
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 
+from src.config.settings import GRAFO_MAX_WORKERS
 from .state import ServiceDeskState
 from .nodes import ServiceDeskNodes
 
@@ -36,8 +39,9 @@ class ServiceDeskGraph:
         graph = StateGraph(ServiceDeskState)
         
         # Adiciona os nós ao grafo
-        graph.add_node("triagem", self.nodes.executar_triagem)
-        graph.add_node("rag", self.nodes.executar_rag)
+        # Triagem e RAG têm versões assíncronas, usadas por ainvoke()
+        graph.add_node("triagem", RunnableLambda(self.nodes.executar_triagem, afunc=self.nodes.aexecutar_triagem))
+        graph.add_node("rag", RunnableLambda(self.nodes.executar_rag, afunc=self.nodes.aexecutar_rag))
         graph.add_node("recomendacao", self.nodes.gerar_recomendacao)
         graph.add_node("solicitar_info", self.nodes.solicitar_mais_info)
         graph.add_node("finalizar", self.nodes.finalizar_processamento)
@@ -123,12 +127,20 @@ class ServiceDeskGraph:
         
         return "finalizar"
     
-    def processar(self, mensagem: str) -> ServiceDeskState:
+    def _configuracao(self, emitir_evento: Optional[Callable[[Dict], None]]) -> Optional[Dict]:
+        """Configuração da execução que repassa o emissor de eventos aos nós."""
+        if emitir_evento is None:
+            return None
+        return {"configurable": {"emitir_evento": emitir_evento}}
+    
+    def processar(self, mensagem: str, emitir_evento: Optional[Callable[[Dict], None]] = None) -> ServiceDeskState:
         """
         Processa uma mensagem através do grafo.
         
         Args:
             mensagem: Mensagem do usuário para processar
+            emitir_evento: Recebe os eventos de streaming (triagem, documentos
+                e trechos da resposta) durante a execução
             
         Returns:
             Estado final com resultado do processamento
@@ -141,10 +153,55 @@ class ServiceDeskGraph:
         )
         
         # Executa o grafo
-        resultado = self.graph.invoke(estado_inicial)
+        resultado = self.graph.invoke(estado_inicial, config=self._configuracao(emitir_evento))
         
         return resultado
     
+    async def aprocessar(
+        self, mensagem: str, emitir_evento: Optional[Callable[[Dict], None]] = None
+    ) -> ServiceDeskState:
+        """
+        Processa uma mensagem através do grafo sem bloquear o event loop.
+        
+        Args:
+            mensagem: Mensagem do usuário para processar
+            emitir_evento: Recebe os eventos de streaming durante a execução
+            
+        Returns:
+            Estado final com resultado do processamento
+        """
+        estado_inicial = ServiceDeskState(
+            mensagem_original=mensagem,
+            tentativas=0,
+            max_tentativas=3
+        )
+        
+        return await self.graph.ainvoke(estado_inicial, config=self._configuracao(emitir_evento))
+    
+    def processar_concorrente(self, mensagens: Sequence[str], max_workers: int = GRAFO_MAX_WORKERS) -> List:
+        """
+        Processa várias mensagens em paralelo, cada uma em uma thread.
+        
+        O grafo compilado e os nós não guardam estado por requisição, então
+        a mesma instância atende todas as threads.
+        
+        Args:
+            mensagens: Mensagens dos usuários
+            max_workers: Número máximo de mensagens processadas ao mesmo tempo
+            
+        Returns:
+            Estados finais na mesma ordem da entrada; mensagens cuja execução
+            falhou retornam um dict com a chave ``erro``
+        """
+        def executar(mensagem: str):
+            try:
+                return self.processar(mensagem)
+            except Exception as e:
+                return {"mensagem_original": mensagem, "erro": f"Erro no processamento: {e}"}
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grafo") as executor:
+            return list(executor.map(executar, mensagens))
+    
     def processar_com_historico(self, mensagem: str, historico: list = None) -> ServiceDeskState:
         """
         Processa uma mensagem considerando histórico de conversas.
@@ -160,43 +217,31 @@ class ServiceDeskGraph:
         # Futuramente pode usar o histórico para melhorar o contexto
         return self.processar(mensagem)
     
+    @staticmethod
+    def _rastro(estado) -> List[Dict]:
+        """Rastro de execução do estado final (dict ou ServiceDeskState)."""
+        if isinstance(estado, dict):
+            return estado.get('rastro', [])
+        return estado.rastro
+    
     def obter_fluxo_executado(self, estado) -> list:
         """
-        Retorna o fluxo de nós que foram executados.
+        Retorna o fluxo de nós que foram executados, conforme o rastro.
         
         Args:
             estado: Estado final do processamento (dict ou ServiceDeskState)
             
         Returns:
-            Lista com os nós executados
+            Lista com os nós executados, na ordem
         """
-        fluxo = ["triagem"]
-        
-        # Acessa decisão e tentativas dependendo do tipo
-        if isinstance(estado, dict):
-            decisao = estado.get('decisao')
-            tentativas = estado.get('tentativas', 0)
-            max_tentativas = estado.get('max_tentativas', 3)
-        else:
-            decisao = estado.decisao
-            tentativas = estado.tentativas
-            max_tentativas = estado.max_tentativas
-        
-        if decisao == "AUTO_RESOLVER":
-            fluxo.extend(["rag", "recomendacao"])
-        elif decisao == "PEDIR_INFO":
-            fluxo.append("solicitar_info")
-            if tentativas < max_tentativas:
-                fluxo.extend(["rag", "recomendacao"])
-        elif decisao == "ABRIR_CHAMADO":
-            fluxo.append("recomendacao")
-        
-        fluxo.append("finalizar")
-        return fluxo
+        return [etapa["no"] for etapa in self._rastro(estado)]
     
     def obter_estatisticas(self, estado) -> dict:
         """
-        Retorna estatísticas do processamento.
+        Retorna estatísticas do processamento a partir do estado final.
+        
+        Nada é executado novamente: o fluxo e as latências vêm do rastro
+        registrado pelos nós.
         
         Args:
             estado: Estado final do processamento (dict ou ServiceDeskState)
@@ -204,23 +249,22 @@ class ServiceDeskGraph:
         Returns:
             Dicionário com estatísticas
         """
-        # Se é um dicionário, acessa via get
-        if isinstance(estado, dict):
-            return {
-                "decisao": estado.get('decisao'),
-                "urgencia": estado.get('urgencia'),
-                "tentativas": estado.get('tentativas', 0),
-                "documentos_consultados": len(estado.get('documentos_relevantes', [])),
-                "tem_erro": bool(estado.get('erro')),
-                "fluxo_executado": self.obter_fluxo_executado(estado)
-            }
+        if not isinstance(estado, dict):
+            estado = estado.model_dump()
+        
+        rastro = self._rastro(estado)
+        latencia_por_no: Dict[str, float] = {}
+        for etapa in rastro:
+            latencia_por_no[etapa["no"]] = latencia_por_no.get(etapa["no"], 0.0) + etapa["duracao_ms"]
         
-        # Se é um objeto ServiceDeskState, acessa diretamente
         return {
-            "decisao": estado.decisao,
-            "urgencia": estado.urgencia,
-            "tentativas": estado.tentativas,
-            "documentos_consultados": len(estado.documentos_relevantes),
-            "tem_erro": bool(estado.erro),
-            "fluxo_executado": self.obter_fluxo_executado(estado)
+            "decisao": estado.get('decisao'),
+            "urgencia": estado.get('urgencia'),
+            "tentativas": estado.get('tentativas', 0),
+            "documentos_consultados": len(estado.get('documentos_relevantes', [])),
+            "tem_erro": bool(estado.get('erro')),
+            "fluxo_executado": self.obter_fluxo_executado(estado),
+            "nos_com_erro": [etapa["no"] for etapa in rastro if etapa["resultado"] == "erro"],
+            "latencia_por_no_ms": latencia_por_no,
+            "duracao_total_ms": (rastro[-1]["fim"] - rastro[0]["inicio"]) * 1000 if rastro else 0.0,
         }
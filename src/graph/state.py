@@ -4,7 +4,8 @@ Modelo de estado para o grafo de Service Desk.
 Define a estrutura de dados que é compartilhada entre todos os nós
 do grafo LangGraph durante a execução.
 """
-from typing import Dict, List, Optional, Literal
+import operator
+from typing import Annotated, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 
 
@@ -13,7 +14,8 @@ class ServiceDeskState(BaseModel):
     Estado compartilhado do grafo de Service Desk.
     
     Este estado é passado entre todos os nós do grafo e contém
-    todas as informações necessárias para o processamento.
+    todas as informações necessárias para o processamento. Os nós não o
+    alteram: retornam os campos atualizados e o LangGraph os aplica.
     """
     
     # Entrada do usuário
@@ -36,6 +38,9 @@ class ServiceDeskState(BaseModel):
     documentos_relevantes: List[Dict] = Field(
         default_factory=list, description="Documentos consultados pelo RAG"
     )
+    recuperacao: Optional[Dict] = Field(
+        default=None, description="Busca do RAG antecipada durante a triagem (modo especulativo)"
+    )
     
     # Recomendações e ações
     recomendacao: Optional[str] = Field(default=None, description="Recomendação final")
@@ -48,6 +53,11 @@ class ServiceDeskState(BaseModel):
     
     # Metadados
     erro: Optional[str] = Field(default=None, description="Mensagem de erro se houver")
+    # Cada nó retorna só a própria etapa; o redutor concatena ao rastro
+    rastro: Annotated[List[Dict], operator.add] = Field(
+        default_factory=list,
+        description="Nós executados, na ordem, com início, fim, duração e resultado"
+    )
     finalizado: bool = Field(default=False, description="Se o processamento foi finalizado")
     
     class Config:
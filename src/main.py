@@ -2,7 +2,6 @@
 Ponto de entrada principal do sistema de triagem de Service Desk.
 """
 from src.config.settings import GOOGLE_API_KEY
-from src.chains import TriagemChain
 
 def main() -> None:
     """
@@ -12,7 +11,8 @@ def main() -> None:
     if not GOOGLE_API_KEY:
         raise RuntimeError("Defina GOOGLE_API_KEY no seu .env antes de executar.")
     
-    # Inicializa a chain de triagem
+    # Inicializa a chain de triagem (o LangChain só é importado aqui)
+    from src.chains import TriagemChain
     triagem_chain = TriagemChain()
     
     # Casos de teste para validação do sistema
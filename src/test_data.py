@@ -44,3 +44,65 @@ CASOS_VALIDACAO: List[Dict[str, str]] = [
         "urgencia_esperada": "ALTA"
     }
 ]
+
+# Exemplos rotulados da triagem local (kNN), somados a CASOS_VALIDACAO. Cada
+# decisão e cada urgência tem vários exemplos, para que o leave-one-out sempre
+# encontre outro da mesma classe; nenhum repete CASOS_TESTE_TRIAGEM, usado
+# para medir a concordância com o LLM
+EXEMPLOS_TRIAGEM: List[Dict[str, str]] = [
+    {
+        "mensagem": "Qual é o prazo para pedir reembolso de uma despesa?",
+        "decisao_esperada": "AUTO_RESOLVER",
+        "urgencia_esperada": "BAIXA"
+    },
+    {
+        "mensagem": "Quantos dias de férias posso vender por ano?",
+        "decisao_esperada": "AUTO_RESOLVER",
+        "urgencia_esperada": "BAIXA"
+    },
+    {
+        "mensagem": "Qual o valor do auxílio para equipamento de home office?",
+        "decisao_esperada": "AUTO_RESOLVER",
+        "urgencia_esperada": "BAIXA"
+    },
+    {
+        "mensagem": "Viajo amanhã cedo, qual o limite da diária de hospedagem?",
+        "decisao_esperada": "AUTO_RESOLVER",
+        "urgencia_esperada": "MEDIA"
+    },
+    {
+        "mensagem": "Queria tirar uma dúvida",
+        "decisao_esperada": "PEDIR_INFO",
+        "urgencia_esperada": "BAIXA"
+    },
+    {
+        "mensagem": "Tenho um problema com uma regra da empresa",
+        "decisao_esperada": "PEDIR_INFO",
+        "urgencia_esperada": "MEDIA"
+    },
+    {
+        "mensagem": "Preciso de uma orientação sobre um processo interno",
+        "decisao_esperada": "PEDIR_INFO",
+        "urgencia_esperada": "MEDIA"
+    },
+    {
+        "mensagem": "Quero solicitar exceção à política de viagens para um voo em classe executiva",
+        "decisao_esperada": "ABRIR_CHAMADO",
+        "urgencia_esperada": "MEDIA"
+    },
+    {
+        "mensagem": "Preciso de acesso especial à pasta de contratos do jurídico",
+        "decisao_esperada": "ABRIR_CHAMADO",
+        "urgencia_esperada": "MEDIA"
+    },
+    {
+        "mensagem": "Meu notebook não liga e tenho uma apresentação para o cliente em uma hora",
+        "decisao_esperada": "ABRIR_CHAMADO",
+        "urgencia_esperada": "ALTA"
+    },
+    {
+        "mensagem": "Meu salário veio com desconto errado, abram um chamado para a folha",
+        "decisao_esperada": "ABRIR_CHAMADO",
+        "urgencia_esperada": "ALTA"
+    }
+]
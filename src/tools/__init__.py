@@ -1,6 +1,14 @@
 """
 Módulo de ferramentas do sistema.
 """
-from .rag import RAGSystem, criar_sistema_rag
+from typing import TYPE_CHECKING
+
+from src import importacao_tardia
+
+if TYPE_CHECKING:
+    from .rag import RAGSystem, criar_sistema_rag
+
+_EXPORTACOES = {"RAGSystem": ".rag", "criar_sistema_rag": ".rag"}
 
 __all__ = ["RAGSystem", "criar_sistema_rag"]
+__getattr__ = importacao_tardia(__name__, _EXPORTACOES)
@@ -0,0 +1,150 @@
+"""
+Índice BM25 em memória e fusão de rankings por Reciprocal Rank Fusion.
+
+A busca densa (MiniLM) perde termos exatos como valores, siglas e nomes de
+políticas. O BM25 cobre esses casos e, combinado com a busca vetorial via
+RRF, melhora a precisão com poucos chunks no contexto do LLM.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+_TOKEN = re.compile(r"\w+")
+
+# Palavras muito frequentes em português que não ajudam a diferenciar chunks
+STOPWORDS = frozenset(
+    "a o as os um uma uns umas de do da dos das em no na nos nas por para "
+    "com sem e ou que se ao aos à às é ser são foi como mais mas seu sua "
+    "seus suas meu minha eu me nao não ja já este esta isso esse essa qual".split()
+)
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Divide um texto em termos normalizados para o BM25.
+
+    Converte para minúsculas, remove acentos e descarta stopwords, de modo
+    que "Política" e "politica" correspondam ao mesmo termo.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Lista de termos
+    """
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return [termo for termo in _TOKEN.findall(texto) if termo not in STOPWORDS]
+
+
+class IndiceBM25:
+    """
+    Índice invertido com pontuação BM25 (Okapi).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Inicializa um índice vazio.
+
+        Args:
+            k1: Saturação da frequência do termo
+            b: Peso da normalização pelo tamanho do documento
+        """
+        self.k1 = k1
+        self.b = b
+        # termo -> {posição do documento: frequência}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._tamanhos: List[int] = []
+        self._chaves: List[str] = []
+        self._total_termos = 0
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def adicionar(self, chave: str, texto: str) -> None:
+        """
+        Adiciona um documento ao índice.
+
+        Args:
+            chave: Identificador do documento devolvido nas buscas
+            texto: Conteúdo do documento
+        """
+        posicao = len(self._chaves)
+        termos = tokenizar(texto)
+        for termo, frequencia in Counter(termos).items():
+            self._postings.setdefault(termo, {})[posicao] = frequencia
+        self._chaves.append(chave)
+        self._tamanhos.append(len(termos))
+        self._total_termos += len(termos)
+
+    def construir(self, documentos: Iterable[Tuple[str, str]]) -> "IndiceBM25":
+        """
+        Adiciona vários documentos ao índice.
+
+        Args:
+            documentos: Pares (chave, texto)
+
+        Returns:
+            O próprio índice, para encadeamento
+        """
+        for chave, texto in documentos:
+            self.adicionar(chave, texto)
+        return self
+
+    def buscar(self, consulta: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Retorna os documentos mais relevantes para a consulta.
+
+        Args:
+            consulta: Texto da consulta
+            k: Número máximo de resultados
+
+        Returns:
+            Lista de pares (chave, pontuação), em ordem decrescente de pontuação
+        """
+        total_docs = len(self._chaves)
+        if not total_docs:
+            return []
+
+        media_tamanho = self._total_termos / total_docs
+        pontuacoes: Dict[int, float] = {}
+
+        for termo in set(tokenizar(consulta)):
+            postings = self._postings.get(termo)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for posicao, frequencia in postings.items():
+                norma = self.k1 * (1 - self.b + self.b * self._tamanhos[posicao] / media_tamanho)
+                pontuacoes[posicao] = pontuacoes.get(posicao, 0.0) + (
+                    idf * frequencia * (self.k1 + 1) / (frequencia + norma)
+                )
+
+        melhores = sorted(pontuacoes.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(self._chaves[posicao], pontuacao) for posicao, pontuacao in melhores]
+
+
+def fundir_rrf(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    Combina rankings pelo método Reciprocal Rank Fusion.
+
+    Cada item recebe a soma de ``1 / (k + posição)`` em cada ranking em que
+    aparece; empates mantêm a ordem do primeiro ranking.
+
+    Args:
+        rankings: Listas de chaves, cada uma em ordem de relevância
+        k: Constante de suavização do RRF
+
+    Returns:
+        Chaves ordenadas pela pontuação combinada
+    """
+    pontuacoes: Dict[str, float] = {}
+    ordem: Dict[str, int] = {}
+    for ranking in rankings:
+        for posicao, chave in enumerate(ranking, start=1):
+            pontuacoes[chave] = pontuacoes.get(chave, 0.0) + 1.0 / (k + posicao)
+            ordem.setdefault(chave, len(ordem))
+    return sorted(pontuacoes, key=lambda chave: (-pontuacoes[chave], ordem[chave]))
@@ -0,0 +1,179 @@
+"""
+Cache persistente de embeddings de chunks.
+
+Os vetores são guardados em SQLite, indexados por (nome do modelo,
+sha256 do texto do chunk). Como a maior parte dos chunks é idêntica entre
+uma reconstrução do índice e outra, só os textos novos precisam passar pelo
+modelo — o que, no RAGSystem com Gemini, também economiza quota da API.
+"""
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def hash_texto(texto: str) -> str:
+    """
+    Calcula o hash SHA-256 de um texto.
+
+    Args:
+        texto: Texto do chunk
+
+    Returns:
+        Hash hexadecimal do texto em UTF-8
+    """
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Armazenamento SQLite de vetores indexados por modelo e hash do texto.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Abre (ou cria) o banco de dados do cache.
+
+        Args:
+            caminho: Caminho do arquivo SQLite
+        """
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " modelo TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " vetor BLOB NOT NULL,"
+            " PRIMARY KEY (modelo, hash))"
+        )
+        self._conexao.commit()
+
+    def buscar(self, modelo: str, textos: List[str]) -> List[Optional[List[float]]]:
+        """
+        Busca os vetores de uma lista de textos.
+
+        Args:
+            modelo: Nome do modelo de embeddings
+            textos: Textos a serem buscados
+
+        Returns:
+            Lista alinhada com ``textos``, com None para os textos ausentes
+        """
+        hashes = [hash_texto(texto) for texto in textos]
+        encontrados = {}
+
+        with self._lock:
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+            for inicio in range(0, len(hashes), 500):
+                bloco = hashes[inicio:inicio + 500]
+                marcadores = ",".join("?" * len(bloco))
+                linhas = self._conexao.execute(
+                    f"SELECT hash, vetor FROM embeddings WHERE modelo = ? AND hash IN ({marcadores})",
+                    [modelo, *bloco],
+                ).fetchall()
+                encontrados.update(linhas)
+
+        resultado = []
+        for h in hashes:
+            blob = encontrados.get(h)
+            if blob is None:
+                resultado.append(None)
+            else:
+                vetor = array("f")
+                vetor.frombytes(blob)
+                resultado.append(vetor.tolist())
+        return resultado
+
+    def armazenar(self, modelo: str, textos: List[str], vetores: List[List[float]]) -> None:
+        """
+        Armazena os vetores de uma lista de textos.
+
+        Args:
+            modelo: Nome do modelo de embeddings
+            textos: Textos embutidos
+            vetores: Vetores correspondentes
+        """
+        linhas = [
+            (modelo, hash_texto(texto), array("f", vetor).tobytes())
+            for texto, vetor in zip(textos, vetores)
+        ]
+        with self._lock:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO embeddings (modelo, hash, vetor) VALUES (?, ?, ?)",
+                linhas,
+            )
+            self._conexao.commit()
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco de dados."""
+        with self._lock:
+            self._conexao.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings que consultam o cache persistente antes de chamar o modelo.
+
+    Apenas ``embed_documents`` usa o cache; consultas passam direto para o
+    modelo subjacente.
+    """
+
+    def __init__(self, embeddings: Embeddings, nome_modelo: str, cache: EmbeddingCache):
+        """
+        Inicializa o wrapper.
+
+        Args:
+            embeddings: Modelo de embeddings subjacente
+            nome_modelo: Nome do modelo, usado como parte da chave do cache
+            cache: Cache persistente de vetores
+        """
+        self.embeddings = embeddings
+        self.nome_modelo = nome_modelo
+        self.cache = cache
+        self.acertos = 0
+        self.faltas = 0
+
+    def buscar(self, textos: List[str]) -> List[Optional[List[float]]]:
+        """Busca os vetores dos textos no cache (None para os ausentes)."""
+        vetores = self.cache.buscar(self.nome_modelo, textos)
+        faltas = sum(1 for vetor in vetores if vetor is None)
+        self.faltas += faltas
+        self.acertos += len(vetores) - faltas
+        return vetores
+
+    def armazenar(self, textos: List[str], vetores: List[List[float]]) -> None:
+        """Armazena no cache os vetores recém-calculados."""
+        self.cache.armazenar(self.nome_modelo, textos, vetores)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings para os textos, reaproveitando os que já estão no cache.
+
+        Args:
+            texts: Textos dos chunks
+
+        Returns:
+            Lista de vetores alinhada com ``texts``
+        """
+        vetores = self.buscar(texts)
+        faltantes = [i for i, vetor in enumerate(vetores) if vetor is None]
+
+        if faltantes:
+            textos_faltantes = [texts[i] for i in faltantes]
+            novos = self.embeddings.embed_documents(textos_faltantes)
+            self.armazenar(textos_faltantes, novos)
+            for i, vetor in zip(faltantes, novos):
+                vetores[i] = vetor
+
+        return vetores
+
+    def embed_query(self, text: str) -> List[float]:
+        """Gera o embedding de uma consulta diretamente no modelo subjacente."""
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,116 @@
+"""
+Cache semântico de respostas do RAG.
+
+Uma resposta gerada pelo LLM é reaproveitada quando uma nova pergunta tem
+embedding suficientemente próximo (similaridade de cosseno acima de um
+limiar) de uma pergunta já respondida e recupera exatamente os mesmos
+chunks. Exigir os mesmos chunks garante que o contexto enviado ao LLM
+seria idêntico, evitando reaproveitar respostas para perguntas parecidas
+porém sobre trechos diferentes das políticas.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CacheSemantico:
+    """
+    Cache de respostas indexado por embedding da pergunta e chunks recuperados.
+    """
+
+    def __init__(self, capacidade: int, limiar: float):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade: Número máximo de respostas armazenadas (LRU)
+            limiar: Similaridade de cosseno mínima para reaproveitar uma resposta
+        """
+        self.capacidade = capacidade
+        self.limiar = limiar
+        self._entradas: "OrderedDict[int, Tuple[np.ndarray, Tuple[str, ...], Dict]]" = OrderedDict()
+        self._proximo_id = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    @staticmethod
+    def _normalizar(vetor: Sequence[float]) -> np.ndarray:
+        """Converte o vetor para float32 com norma unitária."""
+        v = np.asarray(vetor, dtype=np.float32)
+        norma = np.linalg.norm(v)
+        return v / norma if norma > 0 else v
+
+    def buscar(self, vetor: Sequence[float], chunk_ids: Sequence[str]) -> Optional[Dict]:
+        """
+        Busca uma resposta para uma pergunta semelhante com os mesmos chunks.
+
+        Args:
+            vetor: Embedding da pergunta
+            chunk_ids: Ids dos chunks recuperados para a pergunta
+
+        Returns:
+            Cópia da resposta armazenada ou None se não houver correspondência
+        """
+        v = self._normalizar(vetor)
+        chunk_ids = tuple(chunk_ids)
+
+        with self._lock:
+            melhor_id, melhor_sim = None, self.limiar
+            for id_entrada, (vetor_entrada, ids_entrada, _) in self._entradas.items():
+                if ids_entrada != chunk_ids:
+                    continue
+                sim = float(np.dot(vetor_entrada, v))
+                if sim >= melhor_sim:
+                    melhor_id, melhor_sim = id_entrada, sim
+
+            if melhor_id is None:
+                self.faltas += 1
+                return None
+
+            self._entradas.move_to_end(melhor_id)
+            self.acertos += 1
+            return copy.deepcopy(self._entradas[melhor_id][2])
+
+    def armazenar(self, vetor: Sequence[float], chunk_ids: Sequence[str], resposta: Dict) -> None:
+        """
+        Armazena a resposta gerada para uma pergunta.
+
+        Args:
+            vetor: Embedding da pergunta
+            chunk_ids: Ids dos chunks usados como contexto
+            resposta: Resultado retornado por ``consultar``
+        """
+        if self.capacidade <= 0:
+            return
+        v = self._normalizar(vetor)
+        with self._lock:
+            self._entradas[self._proximo_id] = (v, tuple(chunk_ids), copy.deepcopy(resposta))
+            self._proximo_id += 1
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+    def limpar(self) -> None:
+        """Remove todas as respostas (usado quando o índice é reconstruído)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict:
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            Dict com acertos, faltas, taxa de acerto, tamanho e capacidade
+        """
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "tamanho": len(self._entradas),
+                "capacidade": self.capacidade,
+            }
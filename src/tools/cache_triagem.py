@@ -0,0 +1,141 @@
+"""
+Cache de resultados da triagem.
+
+A mesma mensagem costuma ser triada várias vezes (menu de testes, scripts,
+usuários colando o mesmo texto). Os resultados ficam em um LRU em memória e,
+opcionalmente, em SQLite para sobreviver a reinícios. A chave combina o
+texto normalizado com a versão da triagem (prompt, modelo e esquema), de modo
+que qualquer mudança no prompt ou no modelo invalida as entradas antigas.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.tools.lru import CacheLRU, normalizar_texto
+
+
+class CacheTriagem:
+    """
+    Cache de triagem em dois níveis: LRU em memória e SQLite opcional.
+    """
+
+    def __init__(self, capacidade: int, ttl: float = 0.0, caminho_sqlite: str = ""):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade: Número máximo de entradas em memória
+            ttl: Tempo de vida das entradas em memória, em segundos (0 = sem expiração)
+            caminho_sqlite: Arquivo SQLite para persistência (vazio = só memória)
+        """
+        self.memoria = CacheLRU(capacidade, ttl)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self._conexao = None
+        if caminho_sqlite:
+            Path(caminho_sqlite).parent.mkdir(parents=True, exist_ok=True)
+            self._conexao = sqlite3.connect(caminho_sqlite, check_same_thread=False)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS triagem ("
+                " chave TEXT PRIMARY KEY,"
+                " resultado TEXT NOT NULL)"
+            )
+            self._conexao.commit()
+
+    @staticmethod
+    def chave(mensagem: str, versao: str) -> str:
+        """
+        Calcula a chave de uma mensagem para uma versão da triagem.
+
+        Args:
+            mensagem: Texto da mensagem do usuário
+            versao: Identificador do prompt/modelo usados na triagem
+
+        Returns:
+            Hash SHA-256 da versão e do texto normalizado
+        """
+        return hashlib.sha256(f"{versao}|{normalizar_texto(mensagem)}".encode("utf-8")).hexdigest()
+
+    def buscar(self, chave: str) -> Optional[Dict]:
+        """
+        Busca um resultado, primeiro em memória e depois no SQLite.
+
+        Args:
+            chave: Chave calculada por ``chave()``
+
+        Returns:
+            Cópia do resultado armazenado ou None
+        """
+        serializado = self.memoria.obter(chave)
+        if serializado is None and self._conexao is not None:
+            with self._lock:
+                linha = self._conexao.execute(
+                    "SELECT resultado FROM triagem WHERE chave = ?", (chave,)
+                ).fetchone()
+            if linha is not None:
+                serializado = linha[0]
+                self.memoria.definir(chave, serializado)
+
+        with self._lock:
+            if serializado is None:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+        # Guardado como JSON: cada acerto devolve uma cópia independente
+        return json.loads(serializado)
+
+    def armazenar(self, chave: str, resultado: Dict) -> None:
+        """
+        Armazena o resultado da triagem de uma mensagem.
+
+        Args:
+            chave: Chave calculada por ``chave()``
+            resultado: Classificação retornada pelo LLM
+        """
+        serializado = json.dumps(resultado, ensure_ascii=False)
+        self.memoria.definir(chave, serializado)
+        if self._conexao is not None:
+            with self._lock:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO triagem (chave, resultado) VALUES (?, ?)",
+                    (chave, serializado),
+                )
+                self._conexao.commit()
+
+    def limpar(self) -> None:
+        """Remove todas as entradas, em memória e no SQLite."""
+        self.memoria.limpar()
+        if self._conexao is not None:
+            with self._lock:
+                self._conexao.execute("DELETE FROM triagem")
+                self._conexao.commit()
+
+    def estatisticas(self) -> Dict:
+        """
+        Retorna as estatísticas do cache (acertos em memória ou no SQLite).
+
+        Returns:
+            Dict com acertos, faltas, taxa de acerto, tamanho e capacidade em memória
+        """
+        memoria = self.memoria.estatisticas()
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "tamanho": memoria["tamanho"],
+                "capacidade": memoria["capacidade"],
+            }
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o SQLite, se houver."""
+        if self._conexao is not None:
+            with self._lock:
+                self._conexao.close()
+                self._conexao = None
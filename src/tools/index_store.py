@@ -0,0 +1,185 @@
+"""
+Persistência em disco do índice vetorial FAISS.
+
+O índice é salvo junto com um arquivo de metadados que guarda uma chave
+calculada a partir do conteúdo dos PDFs, dos parâmetros de chunking e do
+modelo de embeddings. Enquanto a chave não muda, o índice salvo é
+reaproveitado e nenhum PDF precisa ser processado novamente.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+
+
+# Versão do formato salvo em disco; incrementar invalida índices antigos
+VERSAO_FORMATO = 1
+
+ARQUIVO_METADADOS = "metadados.json"
+
+
+class IndexStore:
+    """
+    Armazena e recupera o índice FAISS de um sistema RAG.
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        nome_modelo: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        descricao_indice: str = "flat",
+    ):
+        """
+        Inicializa o armazenamento do índice.
+
+        Args:
+            diretorio: Diretório raiz onde os índices são salvos
+            nome_modelo: Nome do modelo de embeddings usado no índice
+            chunk_size: Tamanho dos chunks usados na divisão dos documentos
+            chunk_overlap: Sobreposição entre chunks
+            descricao_indice: Tipo e parâmetros de construção do índice FAISS
+        """
+        self.nome_modelo = nome_modelo
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.descricao_indice = descricao_indice
+        # Um subdiretório por modelo evita que sistemas diferentes sobrescrevam o mesmo índice
+        self.diretorio = Path(diretorio) / nome_modelo.replace("/", "_")
+
+    def calcular_chave(self, pdf_files: List[Path]) -> str:
+        """
+        Calcula a chave que identifica o conteúdo do índice.
+
+        Args:
+            pdf_files: Lista de PDFs que compõem o corpus
+
+        Returns:
+            Hash SHA-256 do corpus, dos parâmetros de chunking e do modelo
+        """
+        h = hashlib.sha256()
+        h.update(
+            f"v{VERSAO_FORMATO}|{self.nome_modelo}|{self.chunk_size}|{self.chunk_overlap}|"
+            f"{self.descricao_indice}".encode()
+        )
+
+        for pdf_file in sorted(pdf_files):
+            h.update(pdf_file.name.encode())
+            h.update(calcular_hash_arquivo(pdf_file).encode())
+
+        return h.hexdigest()
+
+    def carregar(self, chave: Optional[str], embeddings) -> Optional[FAISS]:
+        """
+        Carrega o índice salvo se ele corresponder à chave informada.
+
+        Args:
+            chave: Chave esperada do índice. Se None, aceita qualquer índice
+                gerado com o mesmo modelo e parâmetros de chunking (usado na
+                reindexação incremental, que atualiza um índice desatualizado)
+            embeddings: Modelo de embeddings usado nas consultas
+
+        Returns:
+            Índice FAISS carregado ou None se não houver índice válido
+        """
+        metadados = self.ler_metadados()
+        if chave is None:
+            if not self.parametros_compativeis(metadados):
+                return None
+        elif metadados.get("chave") != chave:
+            return None
+
+        try:
+            return FAISS.load_local(
+                str(self.diretorio),
+                embeddings,
+                allow_dangerous_deserialization=True,
+            )
+        except Exception as e:
+            print(f"⚠️ Não foi possível carregar o índice salvo: {e}")
+            return None
+
+    def salvar(self, vectorstore: FAISS, chave: str, extras: Optional[Dict] = None) -> None:
+        """
+        Salva o índice em disco junto com seus metadados.
+
+        Args:
+            vectorstore: Índice FAISS a ser salvo
+            chave: Chave que identifica o conteúdo do índice
+            extras: Metadados adicionais a serem gravados
+        """
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        # Remove os metadados antes de gravar o índice: se a gravação for
+        # interrompida, o índice parcial nunca será considerado válido
+        caminho_metadados = self.diretorio / ARQUIVO_METADADOS
+        caminho_metadados.unlink(missing_ok=True)
+
+        vectorstore.save_local(str(self.diretorio))
+
+        metadados = {
+            "versao": VERSAO_FORMATO,
+            "chave": chave,
+            "modelo": self.nome_modelo,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "indice": self.descricao_indice,
+            **(extras or {}),
+        }
+        tmp = caminho_metadados.with_suffix(".tmp")
+        tmp.write_text(json.dumps(metadados, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(caminho_metadados)
+
+    def parametros_compativeis(self, metadados: Dict) -> bool:
+        """
+        Verifica se um índice salvo foi gerado com os mesmos parâmetros.
+
+        Args:
+            metadados: Metadados do índice salvo
+
+        Returns:
+            True se versão, modelo, parâmetros de chunking e tipo de índice coincidem
+        """
+        return (
+            metadados.get("versao") == VERSAO_FORMATO
+            and metadados.get("modelo") == self.nome_modelo
+            and metadados.get("chunk_size") == self.chunk_size
+            and metadados.get("chunk_overlap") == self.chunk_overlap
+            and metadados.get("indice", "flat") == self.descricao_indice
+        )
+
+    def ler_metadados(self) -> Dict:
+        """
+        Lê os metadados do índice salvo.
+
+        Returns:
+            Dict com os metadados ou dict vazio se não houver índice salvo
+        """
+        caminho_metadados = self.diretorio / ARQUIVO_METADADOS
+        if not caminho_metadados.exists():
+            return {}
+
+        try:
+            return json.loads(caminho_metadados.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+
+def calcular_hash_arquivo(caminho: Path) -> str:
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo.
+
+    Args:
+        caminho: Caminho do arquivo
+
+    Returns:
+        Hash hexadecimal do conteúdo
+    """
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
@@ -0,0 +1,468 @@
+"""
+Funções de indexação compartilhadas pelos sistemas RAG.
+
+Inclui o carregamento (sequencial ou paralelo) e a divisão dos PDFs em
+chunks com identificadores estáveis e a reindexação incremental baseada em
+um manifesto por arquivo (mtime, tamanho, hash do conteúdo e ids dos chunks).
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.config.settings import (
+    RAG_CHUNK_SIZE,
+    RAG_CHUNK_OVERLAP,
+    RAG_EMBEDDING_BATCH,
+    RAG_INGESTAO_WORKERS,
+    RAG_PAGINAS_POR_UNIDADE,
+)
+from src.tools.index_store import calcular_hash_arquivo
+from src.tools.pipeline_embeddings import indexar_em_lotes
+
+
+def carregar_pdf(pdf_file: Path) -> List[Document]:
+    """
+    Carrega todas as páginas de um PDF.
+
+    Args:
+        pdf_file: Caminho do PDF
+
+    Returns:
+        Lista de documentos, um por página
+    """
+    loader = PyMuPDFLoader(str(pdf_file))
+    return loader.load()
+
+
+def carregar_paginas(pdf_file: Path, inicio: int, fim: int) -> List[Document]:
+    """
+    Carrega um intervalo de páginas de um PDF.
+
+    Produz os mesmos metadados que o PyMuPDFLoader, para que os documentos
+    sejam indistinguíveis dos carregados com o arquivo inteiro.
+
+    Args:
+        pdf_file: Caminho do PDF
+        inicio: Índice da primeira página (inclusivo)
+        fim: Índice da última página (exclusivo)
+
+    Returns:
+        Lista de documentos, um por página do intervalo
+    """
+    import fitz
+
+    docs = []
+    with fitz.open(str(pdf_file)) as pdf:
+        metadados_pdf = {
+            k: pdf.metadata[k]
+            for k in pdf.metadata
+            if isinstance(pdf.metadata[k], (str, int))
+        }
+        for numero in range(inicio, min(fim, pdf.page_count)):
+            docs.append(Document(
+                page_content=pdf[numero].get_text(),
+                metadata={
+                    "source": str(pdf_file),
+                    "file_path": str(pdf_file),
+                    "page": numero,
+                    "total_pages": pdf.page_count,
+                    **metadados_pdf,
+                },
+            ))
+    return docs
+
+
+def _contar_paginas(pdf_file: Path) -> int:
+    """Conta as páginas de um PDF, retornando 0 se o arquivo não puder ser aberto."""
+    try:
+        import fitz
+
+        with fitz.open(str(pdf_file)) as pdf:
+            return pdf.page_count
+    except Exception:
+        return 0
+
+
+def _planejar_unidades(pdf_files: List[Path], paginas_por_unidade: int) -> List[Tuple[Path, Optional[int], Optional[int]]]:
+    """
+    Divide os PDFs em unidades de trabalho para o carregamento paralelo.
+
+    PDFs pequenos formam uma única unidade; PDFs com mais páginas que o
+    limite são divididos em intervalos de páginas.
+
+    Returns:
+        Lista de tuplas (arquivo, página inicial, página final), em ordem
+    """
+    unidades = []
+    for pdf_file in pdf_files:
+        total = _contar_paginas(pdf_file)
+        if total <= paginas_por_unidade:
+            unidades.append((pdf_file, None, None))
+            continue
+        for inicio in range(0, total, paginas_por_unidade):
+            unidades.append((pdf_file, inicio, inicio + paginas_por_unidade))
+    return unidades
+
+
+def _processar_unidade(unidade: Tuple[Path, Optional[int], Optional[int]]) -> Tuple[List[Document], Optional[str]]:
+    """
+    Carrega uma unidade de trabalho em um processo do pool.
+
+    Erros são devolvidos em vez de propagados, para que uma falha em um
+    arquivo não interrompa o carregamento dos demais.
+
+    Returns:
+        Tupla com os documentos carregados e a mensagem de erro, se houver
+    """
+    pdf_file, inicio, fim = unidade
+    try:
+        if inicio is None:
+            return carregar_pdf(pdf_file), None
+        return carregar_paginas(pdf_file, inicio, fim), None
+    except Exception as e:
+        return [], str(e)
+
+
+def carregar_pdfs_em_fluxo(
+    pdf_files: List[Path],
+    max_workers: int = RAG_INGESTAO_WORKERS,
+    paginas_por_unidade: int = RAG_PAGINAS_POR_UNIDADE,
+) -> Iterator[Tuple[Path, List[Document]]]:
+    """
+    Carrega os PDFs um a um, sequencialmente ou em um pool de processos.
+
+    Os arquivos são entregues sempre na ordem de ``pdf_files``, com as
+    páginas em ordem, independentemente do número de processos. No modo
+    paralelo apenas ``2 * max_workers`` arquivos ficam em andamento, de modo
+    que as páginas de todo o corpus nunca estão na memória ao mesmo tempo.
+    Arquivos com erro são informados e ignorados.
+
+    Args:
+        pdf_files: PDFs a serem carregados
+        max_workers: Número de processos (1 = carregamento sequencial)
+        paginas_por_unidade: Máximo de páginas por unidade de trabalho
+
+    Yields:
+        Tuplas (arquivo, páginas do arquivo)
+    """
+    if max_workers <= 1 or not pdf_files:
+        for pdf_file in pdf_files:
+            try:
+                docs = carregar_pdf(pdf_file)
+            except Exception as e:
+                print(f"❌ Erro ao carregar {pdf_file.name}: {e}")
+                continue
+            print(f"✅ Arquivo carregado: {pdf_file.name}")
+            yield pdf_file, docs
+        return
+
+    def concluir(pdf_file, futuros):
+        docs = []
+        for futuro in futuros:
+            docs_unidade, erro = futuro.result()
+            if erro is not None:
+                print(f"❌ Erro ao carregar {pdf_file.name}: {erro}")
+                return None
+            docs.extend(docs_unidade)
+        print(f"✅ Arquivo carregado: {pdf_file.name}")
+        return docs
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pendentes = deque()
+        for pdf_file in pdf_files:
+            futuros = [
+                executor.submit(_processar_unidade, unidade)
+                for unidade in _planejar_unidades([pdf_file], paginas_por_unidade)
+            ]
+            pendentes.append((pdf_file, futuros))
+            if len(pendentes) >= 2 * max_workers:
+                arquivo, futuros_arquivo = pendentes.popleft()
+                docs = concluir(arquivo, futuros_arquivo)
+                if docs is not None:
+                    yield arquivo, docs
+        while pendentes:
+            arquivo, futuros_arquivo = pendentes.popleft()
+            docs = concluir(arquivo, futuros_arquivo)
+            if docs is not None:
+                yield arquivo, docs
+
+
+def carregar_pdfs(
+    pdf_files: List[Path],
+    max_workers: int = RAG_INGESTAO_WORKERS,
+    paginas_por_unidade: int = RAG_PAGINAS_POR_UNIDADE,
+) -> List[Document]:
+    """
+    Carrega uma lista de PDFs, sequencialmente ou em um pool de processos.
+
+    Args:
+        pdf_files: PDFs a serem carregados
+        max_workers: Número de processos (1 = carregamento sequencial)
+        paginas_por_unidade: Máximo de páginas por unidade de trabalho
+
+    Returns:
+        Lista de documentos, um por página, na ordem dos arquivos
+    """
+    return [
+        doc
+        for _, docs in carregar_pdfs_em_fluxo(pdf_files, max_workers, paginas_por_unidade)
+        for doc in docs
+    ]
+
+
+def criar_entrada_catalogo(pdf_file: Path, paginas: int, chunks: int) -> Dict:
+    """
+    Cria a entrada do catálogo do corpus para um arquivo.
+
+    Args:
+        pdf_file: Caminho do PDF
+        paginas: Número de páginas carregadas
+        chunks: Número de chunks gerados
+
+    Returns:
+        Dict com fonte, páginas, tamanho em bytes e número de chunks
+    """
+    return {
+        "fonte": str(pdf_file),
+        "paginas": paginas,
+        "bytes": pdf_file.stat().st_size,
+        "chunks": chunks,
+    }
+
+
+def criar_catalogo(docs: List[Document], ids_por_arquivo: Dict[str, List[str]]) -> Dict[str, Dict]:
+    """
+    Cria o catálogo do corpus a partir das páginas carregadas.
+
+    O catálogo guarda apenas um resumo por arquivo, permitindo descartar as
+    páginas depois que os chunks foram gerados.
+
+    Args:
+        docs: Páginas carregadas
+        ids_por_arquivo: Mapeamento arquivo -> ids dos chunks no índice
+
+    Returns:
+        Dict com uma entrada por arquivo, indexado pelo nome do arquivo
+    """
+    paginas: Dict[str, int] = {}
+    fontes: Dict[str, Path] = {}
+    for doc in docs:
+        fonte = Path(doc.metadata.get("source", "desconhecido"))
+        paginas[fonte.name] = paginas.get(fonte.name, 0) + 1
+        fontes[fonte.name] = fonte
+
+    return {
+        nome: criar_entrada_catalogo(fontes[nome], paginas[nome], len(ids_por_arquivo.get(nome, [])))
+        for nome in paginas
+    }
+
+
+def dividir_documentos(docs: List[Document]) -> Tuple[List[Document], Dict[str, List[str]]]:
+    """
+    Divide os documentos em chunks e atribui um id estável a cada chunk.
+
+    Os ids têm o formato ``<nome do arquivo>#<posição>``, o que permite
+    remover do índice todos os chunks de um arquivo específico.
+
+    Args:
+        docs: Documentos (páginas) a serem divididos
+
+    Returns:
+        Tupla com a lista de chunks e o mapeamento arquivo -> ids dos chunks
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=RAG_CHUNK_SIZE,
+        chunk_overlap=RAG_CHUNK_OVERLAP,
+        length_function=len,
+    )
+    splits = text_splitter.split_documents(docs)
+
+    ids_por_arquivo: Dict[str, List[str]] = {}
+    for split in splits:
+        nome = Path(split.metadata.get("source", "desconhecido")).name
+        ids = ids_por_arquivo.setdefault(nome, [])
+        split.id = f"{nome}#{len(ids)}"
+        ids.append(split.id)
+
+    return splits, ids_por_arquivo
+
+
+def criar_manifesto(pdf_files: List[Path], ids_por_arquivo: Dict[str, List[str]]) -> Dict[str, Dict]:
+    """
+    Cria o manifesto dos arquivos indexados.
+
+    Arquivos sem nenhum chunk (por exemplo, que falharam ao carregar) ficam
+    de fora, para que sejam tentados novamente na próxima reindexação.
+
+    Args:
+        pdf_files: PDFs do corpus
+        ids_por_arquivo: Mapeamento arquivo -> ids dos chunks no índice
+
+    Returns:
+        Dict com uma entrada por arquivo indexado
+    """
+    manifesto = {}
+    for pdf_file in pdf_files:
+        if pdf_file.name in ids_por_arquivo:
+            manifesto[pdf_file.name] = criar_entrada_manifesto(pdf_file, ids_por_arquivo[pdf_file.name])
+    return manifesto
+
+
+def criar_entrada_manifesto(pdf_file: Path, chunk_ids: List[str]) -> Dict:
+    """
+    Cria a entrada do manifesto para um arquivo.
+
+    Args:
+        pdf_file: Caminho do PDF
+        chunk_ids: Ids dos chunks do arquivo no índice
+
+    Returns:
+        Dict com mtime, tamanho, hash do conteúdo e ids dos chunks
+    """
+    stat = pdf_file.stat()
+    return {
+        "mtime": stat.st_mtime,
+        "tamanho": stat.st_size,
+        "hash": calcular_hash_arquivo(pdf_file),
+        "chunk_ids": chunk_ids,
+    }
+
+
+def arquivo_alterado(pdf_file: Path, entrada: Dict) -> Tuple[bool, Dict]:
+    """
+    Verifica se um arquivo mudou desde que foi indexado.
+
+    Quando mtime e tamanho coincidem o arquivo é considerado inalterado sem
+    precisar ler o conteúdo; caso contrário, o hash decide. A entrada
+    recebida não é alterada.
+
+    Args:
+        pdf_file: Caminho do PDF
+        entrada: Entrada do manifesto para o arquivo
+
+    Returns:
+        Tupla (se o conteúdo mudou, entrada a manter no manifesto). Se só o
+        mtime mudou, a entrada retornada é uma cópia com o novo mtime
+    """
+    stat = pdf_file.stat()
+    if stat.st_mtime == entrada.get("mtime") and stat.st_size == entrada.get("tamanho"):
+        return False, entrada
+
+    if calcular_hash_arquivo(pdf_file) != entrada.get("hash"):
+        return True, entrada
+
+    # Conteúdo igual com mtime diferente (ex.: arquivo copiado novamente)
+    return False, {**entrada, "mtime": stat.st_mtime}
+
+
+def reindexar_incremental(sistema, **opcoes_indexacao) -> Dict[str, List[str]]:
+    """
+    Atualiza o índice de um sistema RAG apenas com os PDFs que mudaram.
+
+    Arquivos alterados ou removidos têm seus chunks removidos do índice;
+    arquivos alterados ou novos são carregados, divididos e adicionados pelo
+    mesmo pipeline em lotes da construção completa (``indexar_em_lotes``,
+    com cache de embeddings e processos). Arquivos inalterados não são tocados.
+
+    Args:
+        sistema: Instância de RAGSystem ou RAGSystemLocal
+        **opcoes_indexacao: Parâmetros de ``indexar_em_lotes`` (tamanho do
+            lote, threads, processos e modelo)
+
+    Returns:
+        Dict com as listas de arquivos adicionados, alterados, removidos e inalterados
+    """
+    pdf_files = sistema._listar_pdfs()
+
+    if sistema.vectorstore is None and sistema.index_store:
+        sistema.vectorstore = sistema.index_store.carregar(None, sistema.embeddings)
+        sistema.manifesto = sistema.index_store.ler_metadados().get("manifesto", {})
+
+    if sistema.vectorstore is None or not sistema.manifesto:
+        # Sem índice ou manifesto anterior não há o que aproveitar
+        print("🔧 Nenhum índice anterior encontrado, construindo índice completo...")
+        sistema.docs = []
+        sistema.carregar_documentos()
+        sistema.processar_documentos()
+        return {
+            "adicionados": sorted(sistema.manifesto),
+            "alterados": [],
+            "removidos": [],
+            "inalterados": [],
+        }
+
+    manifesto = dict(sistema.manifesto)
+    nomes_atuais = {pdf_file.name for pdf_file in pdf_files}
+    resumo = {"adicionados": [], "alterados": [], "removidos": [], "inalterados": []}
+
+    ids_remover: List[str] = []
+    pendentes: List[Path] = []
+
+    for nome in sorted(set(manifesto) - nomes_atuais):
+        ids_remover.extend(manifesto.pop(nome)["chunk_ids"])
+        resumo["removidos"].append(nome)
+
+    for pdf_file in pdf_files:
+        entrada = manifesto.get(pdf_file.name)
+        if entrada is None:
+            resumo["adicionados"].append(pdf_file.name)
+            pendentes.append(pdf_file)
+            continue
+
+        alterado, entrada = arquivo_alterado(pdf_file, entrada)
+        if alterado:
+            ids_remover.extend(manifesto.pop(pdf_file.name)["chunk_ids"])
+            resumo["alterados"].append(pdf_file.name)
+            pendentes.append(pdf_file)
+        else:
+            # Cópia da entrada: sistema.manifesto só muda ao final
+            manifesto[pdf_file.name] = entrada
+            resumo["inalterados"].append(pdf_file.name)
+
+    if ids_remover:
+        sistema.vectorstore.delete(ids_remover)
+        print(f"🗑️ {len(ids_remover)} chunks removidos do índice")
+
+    novos_docs = carregar_pdfs(pendentes)
+
+    catalogo = getattr(sistema, "catalogo", None)
+    if catalogo is not None:
+        for nome in resumo["removidos"] + resumo["alterados"]:
+            catalogo.pop(nome, None)
+
+    if novos_docs:
+        splits, ids_por_arquivo = dividir_documentos(novos_docs)
+        sistema.vectorstore, stats = indexar_em_lotes(
+            splits,
+            sistema.embeddings,
+            **{"tamanho_lote": RAG_EMBEDDING_BATCH, **opcoes_indexacao},
+            vectorstore=sistema.vectorstore,
+        )
+        manifesto.update(criar_manifesto(pendentes, ids_por_arquivo))
+        if catalogo is not None:
+            catalogo.update(criar_catalogo(novos_docs, ids_por_arquivo))
+        print(
+            f"➕ {stats['chunks']} chunks adicionados ao índice "
+            f"em {stats['segundos']:.1f}s ({stats['acertos_cache']} do cache)"
+        )
+
+    sistema.manifesto = manifesto
+
+    if sistema.index_store:
+        chave = sistema.index_store.calcular_chave(pdf_files)
+        extras = {"manifesto": manifesto}
+        if catalogo is not None:
+            extras["catalogo"] = catalogo
+        sistema.index_store.salvar(sistema.vectorstore, chave, extras)
+
+    print(
+        f"🔄 Reindexação concluída: {len(resumo['adicionados'])} novos, "
+        f"{len(resumo['alterados'])} alterados, {len(resumo['removidos'])} removidos, "
+        f"{len(resumo['inalterados'])} inalterados"
+    )
+    return resumo
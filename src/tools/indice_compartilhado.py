@@ -0,0 +1,276 @@
+"""
+Índice somente leitura mapeado em memória para implantações com vários workers.
+
+O índice FAISS e os chunks são serializados uma única vez em arquivos que
+cada processo mapeia com ``mmap``. As páginas ficam no cache do sistema
+operacional e são compartilhadas entre os processos, em vez de cada worker
+manter sua própria cópia do índice e dos textos.
+
+Layout de um diretório exportado:
+
+- ``index.faiss``: índice FAISS (lido com ``IO_FLAG_MMAP_IFC`` ou ``IO_FLAG_MMAP``)
+- ``chunks.bin``: registros JSON (id, texto, metadados) concatenados
+- ``chunks.idx``: offsets ``uint64`` de cada registro em ``chunks.bin``
+- ``metadados.json``: chave do corpus e número de chunks
+
+Limitações:
+
+- Só o faiss 1.9 ou mais recente mapeia os vetores de índices Flat e HNSW
+  (``IO_FLAG_MMAP_IFC``). Em versões anteriores, ``IO_FLAG_MMAP`` mapeia
+  apenas as listas invertidas de índices IVF; os demais tipos são lidos
+  para a memória de cada worker, e um aviso é exibido.
+- O índice BM25 da busca híbrida (``RAG_BUSCA_HIBRIDA``) não é exportado:
+  cada worker o reconstrói em memória própria a partir dos chunks mapeados.
+  Com corpora grandes, mantenha a busca híbrida desativada para usar só o
+  índice compartilhado.
+"""
+import json
+import mmap
+import os
+import shutil
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import faiss
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+
+
+ARQUIVO_INDICE = "index.faiss"
+ARQUIVO_CHUNKS = "chunks.bin"
+ARQUIVO_OFFSETS = "chunks.idx"
+ARQUIVO_METADADOS = "metadados.json"
+
+
+class DocstoreMmap(Docstore):
+    """
+    Docstore somente leitura que lê os chunks de arquivos mapeados em memória.
+
+    As chaves são as posições dos chunks no índice FAISS, em texto.
+    """
+
+    def __init__(self, diretorio: Path):
+        """
+        Mapeia os arquivos de chunks do diretório exportado.
+
+        Args:
+            diretorio: Diretório gerado por ``exportar_indice_compartilhado``
+        """
+        with open(diretorio / ARQUIVO_CHUNKS, "rb") as f:
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(diretorio / ARQUIVO_OFFSETS, "rb") as f:
+            self._mm_offsets = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._mm_offsets).cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def search(self, search: str) -> Union[str, Document]:
+        """
+        Lê um chunk pela sua posição no índice.
+
+        Args:
+            search: Posição do chunk, em texto
+
+        Returns:
+            Documento do chunk ou mensagem de erro, como no InMemoryDocstore
+        """
+        i = int(search)
+        if not 0 <= i < len(self):
+            return f"ID {search} not found."
+        registro = json.loads(self._blob[self._offsets[i]:self._offsets[i + 1]])
+        return Document(
+            id=registro["id"],
+            page_content=registro["page_content"],
+            metadata=registro["metadata"],
+        )
+
+    def add(self, texts) -> None:
+        raise NotImplementedError("O índice compartilhado é somente leitura.")
+
+    def delete(self, ids) -> None:
+        raise NotImplementedError("O índice compartilhado é somente leitura.")
+
+
+class MapeamentoPosicional:
+    """
+    Substitui o dict ``index_to_docstore_id`` do FAISS sem ocupar memória.
+
+    Como o docstore mapeado usa a posição como chave, a posição ``i`` do
+    índice corresponde sempre à chave ``str(i)``.
+    """
+
+    def __init__(self, tamanho: int):
+        self._tamanho = tamanho
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self._tamanho:
+            raise KeyError(i)
+        return str(i)
+
+    def get(self, i: int, padrao=None) -> Optional[str]:
+        return str(i) if 0 <= i < self._tamanho else padrao
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._tamanho))
+
+    def values(self) -> Iterator[str]:
+        return (str(i) for i in range(self._tamanho))
+
+    def items(self) -> Iterator:
+        return ((i, str(i)) for i in range(self._tamanho))
+
+
+def _subdiretorio(diretorio: str, chave: str) -> Path:
+    """Cada versão do corpus é exportada em um subdiretório próprio."""
+    return Path(diretorio) / chave[:16]
+
+
+def _remover_exportacoes_antigas(raiz: Path, atual: Path) -> None:
+    """
+    Remove as exportações de versões anteriores do corpus.
+
+    Workers que ainda mapeiam uma versão antiga continuam lendo os arquivos
+    já abertos; o espaço é liberado quando eles os fecham. Diretórios
+    temporários de exportações em andamento são mantidos.
+    """
+    for subdiretorio in raiz.iterdir():
+        if (
+            subdiretorio == atual
+            or ".tmp-" in subdiretorio.name
+            or not (subdiretorio / ARQUIVO_METADADOS).exists()
+        ):
+            continue
+        shutil.rmtree(subdiretorio, ignore_errors=True)
+        print(f"🗑️ Exportação antiga do índice removida: {subdiretorio}")
+
+
+def exportar_indice_compartilhado(vectorstore: FAISS, diretorio: str, chave: str) -> Path:
+    """
+    Serializa o índice e os chunks no formato mapeável em memória.
+
+    Os arquivos são escritos em um diretório temporário e movidos de uma vez
+    para o destino final, para que nenhum worker mapeie uma exportação parcial.
+    Exportações de outras chaves são removidas em seguida.
+
+    Args:
+        vectorstore: Índice FAISS em memória
+        diretorio: Diretório raiz das exportações
+        chave: Chave do corpus (ver IndexStore.calcular_chave)
+
+    Returns:
+        Caminho do diretório exportado
+    """
+    destino = _subdiretorio(diretorio, chave)
+    if (destino / ARQUIVO_METADADOS).exists():
+        _remover_exportacoes_antigas(destino.parent, destino)
+        return destino
+
+    tmp = destino.with_name(f"{destino.name}.tmp-{os.getpid()}")
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    faiss.write_index(vectorstore.index, str(tmp / ARQUIVO_INDICE))
+
+    offsets = array("Q", [0])
+    with open(tmp / ARQUIVO_CHUNKS, "wb") as f:
+        for i in range(vectorstore.index.ntotal):
+            doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+            registro = json.dumps(
+                {
+                    "id": vectorstore.index_to_docstore_id[i],
+                    "page_content": doc.page_content,
+                    "metadata": doc.metadata,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+            f.write(registro)
+            offsets.append(offsets[-1] + len(registro))
+
+    with open(tmp / ARQUIVO_OFFSETS, "wb") as f:
+        offsets.tofile(f)
+
+    (tmp / ARQUIVO_METADADOS).write_text(
+        json.dumps({"chave": chave, "chunks": vectorstore.index.ntotal}),
+        encoding="utf-8",
+    )
+
+    try:
+        tmp.rename(destino)
+    except OSError:
+        # Outro processo exportou a mesma versão primeiro
+        shutil.rmtree(tmp, ignore_errors=True)
+    _remover_exportacoes_antigas(destino.parent, destino)
+    return destino
+
+
+def _ler_indice_mapeado(caminho: str) -> Tuple[faiss.Index, bool]:
+    """
+    Lê o índice FAISS mapeando seus dados em memória sempre que possível.
+
+    Tenta ``IO_FLAG_MMAP_IFC`` (faiss 1.9+, mapeia os vetores de qualquer
+    tipo de índice) e depois ``IO_FLAG_MMAP`` (apenas listas invertidas de
+    índices IVF). Se nenhum se aplicar, lê o índice para a memória.
+
+    Args:
+        caminho: Arquivo do índice
+
+    Returns:
+        Tupla (índice, se os dados estão mapeados e são compartilhados)
+    """
+    opcoes = []
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        opcoes.append(faiss.IO_FLAG_MMAP_IFC)
+    opcoes.append(faiss.IO_FLAG_MMAP)
+
+    for flag in opcoes:
+        try:
+            index = faiss.read_index(caminho, flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            continue
+        # IO_FLAG_MMAP é ignorado em silêncio por índices sem listas invertidas
+        if flag != faiss.IO_FLAG_MMAP or faiss.try_extract_index_ivf(index) is not None:
+            return index, True
+        return index, False
+
+    return faiss.read_index(caminho), False
+
+
+def carregar_indice_compartilhado(diretorio: str, chave: str, embeddings) -> Optional[FAISS]:
+    """
+    Mapeia em memória um índice exportado para a chave informada.
+
+    Args:
+        diretorio: Diretório raiz das exportações
+        chave: Chave esperada do corpus
+        embeddings: Modelo de embeddings usado nas consultas
+
+    Returns:
+        Índice FAISS somente leitura ou None se não houver exportação válida
+    """
+    origem = _subdiretorio(diretorio, chave)
+    try:
+        metadados = json.loads((origem / ARQUIVO_METADADOS).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if metadados.get("chave") != chave:
+        return None
+
+    index, mapeado = _ler_indice_mapeado(str(origem / ARQUIVO_INDICE))
+    if not mapeado:
+        print(
+            f"⚠️ Índice {type(index).__name__} lido para a memória deste processo: "
+            f"só os chunks são compartilhados (atualize o faiss para 1.9+ ou use um índice IVF)"
+        )
+
+    docstore = DocstoreMmap(origem)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=MapeamentoPosicional(len(docstore)),
+    )
@@ -0,0 +1,216 @@
+"""
+Tipos de índice FAISS para busca vetorial.
+
+- ``flat``: busca exata; custo e memória crescem linearmente com o corpus
+- ``hnsw``: grafo HNSW; busca aproximada rápida, sem etapa de treino
+- ``ivfpq``: lista invertida com product quantization; ocupa bem menos
+  memória, mas exige treino sobre uma amostra dos vetores
+
+Também inclui um relatório de recall vs. latência que compara cada tipo com
+a busca exata sobre um conjunto de consultas separado.
+"""
+import math
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from src.config.settings import (
+    RAG_TIPO_INDICE,
+    RAG_HNSW_M,
+    RAG_HNSW_EF_CONSTRUCTION,
+    RAG_HNSW_EF_SEARCH,
+    RAG_IVF_NLIST,
+    RAG_IVF_NPROBE,
+    RAG_PQ_M,
+    RAG_PQ_NBITS,
+    RAG_IVF_AMOSTRA_TREINO,
+)
+
+
+TIPOS_INDICE = ("flat", "hnsw", "ivfpq")
+
+
+def parametros_configurados() -> Dict:
+    """
+    Retorna o tipo de índice e seus parâmetros conforme as configurações.
+
+    Returns:
+        Dict com o tipo e os parâmetros de construção e busca
+    """
+    return {
+        "tipo": RAG_TIPO_INDICE,
+        "hnsw_m": RAG_HNSW_M,
+        "ef_construction": RAG_HNSW_EF_CONSTRUCTION,
+        "ef_search": RAG_HNSW_EF_SEARCH,
+        "nlist": RAG_IVF_NLIST,
+        "nprobe": RAG_IVF_NPROBE,
+        "pq_m": RAG_PQ_M,
+        "pq_nbits": RAG_PQ_NBITS,
+        "amostra_treino": RAG_IVF_AMOSTRA_TREINO,
+    }
+
+
+def descrever(parametros: Dict) -> str:
+    """
+    Descreve os parâmetros que afetam o conteúdo do índice.
+
+    Parâmetros apenas de busca (efSearch, nprobe) ficam de fora, pois podem
+    mudar sem reconstruir o índice.
+
+    Args:
+        parametros: Parâmetros do índice
+
+    Returns:
+        Texto usado na chave do índice salvo
+    """
+    tipo = parametros["tipo"]
+    if tipo == "hnsw":
+        return f"hnsw(m={parametros['hnsw_m']},efc={parametros['ef_construction']})"
+    if tipo == "ivfpq":
+        return f"ivfpq(nlist={parametros['nlist']},m={parametros['pq_m']},nbits={parametros['pq_nbits']})"
+    return "flat"
+
+
+def requer_treino(parametros: Dict) -> bool:
+    """Indica se o tipo de índice precisa ser treinado antes de receber vetores."""
+    return parametros["tipo"] == "ivfpq"
+
+
+def minimo_treino(parametros: Dict) -> int:
+    """
+    Número mínimo de vetores para treinar um índice IVF-PQ.
+
+    Cada centróide do quantizador grosso e do PQ precisa de pelo menos um
+    ponto de treino.
+    """
+    return max(parametros["nlist"] or 1, 2 ** parametros["pq_nbits"])
+
+
+def criar_indice(parametros: Dict, dimensao: int, n_treino: int = 0) -> faiss.Index:
+    """
+    Cria um índice FAISS vazio do tipo configurado.
+
+    Args:
+        parametros: Parâmetros do índice
+        dimensao: Dimensão dos vetores
+        n_treino: Tamanho da amostra de treino (usado para escolher ``nlist``
+            automaticamente quando configurado como 0)
+
+    Returns:
+        Índice FAISS (não treinado, no caso do IVF-PQ)
+    """
+    tipo = parametros["tipo"]
+    if tipo not in TIPOS_INDICE:
+        raise ValueError(f"Tipo de índice inválido: {tipo}. Use um de {TIPOS_INDICE}.")
+
+    if tipo == "hnsw":
+        index = faiss.IndexHNSWFlat(dimensao, parametros["hnsw_m"])
+        index.hnsw.efConstruction = parametros["ef_construction"]
+    elif tipo == "ivfpq":
+        if dimensao % parametros["pq_m"] != 0:
+            raise ValueError(
+                f"RAG_PQ_M={parametros['pq_m']} precisa dividir a dimensão dos vetores ({dimensao})."
+            )
+        # Regra usual: nlist ~ 4 * sqrt(n), limitado para ter ~39 pontos por lista no treino
+        nlist = parametros["nlist"] or max(1, min(int(4 * math.sqrt(n_treino)), n_treino // 39))
+        quantizador = faiss.IndexFlatL2(dimensao)
+        index = faiss.IndexIVFPQ(quantizador, dimensao, nlist, parametros["pq_m"], parametros["pq_nbits"])
+    else:
+        index = faiss.IndexFlatL2(dimensao)
+
+    configurar_busca(index, parametros)
+    return index
+
+
+def configurar_busca(index: faiss.Index, parametros: Dict) -> None:
+    """
+    Aplica os parâmetros de busca (efSearch, nprobe) a um índice.
+
+    Args:
+        index: Índice FAISS
+        parametros: Parâmetros do índice
+    """
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = parametros["ef_search"]
+    try:
+        faiss.extract_index_ivf(index).nprobe = parametros["nprobe"]
+    except RuntimeError:
+        pass  # não é um índice IVF
+
+
+def _buscar(index: faiss.Index, consultas: np.ndarray, k: int):
+    """Busca as consultas e mede a latência média por consulta em ms."""
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        index.search(consulta.reshape(1, -1), k)
+    latencia_ms = (time.perf_counter() - inicio) * 1000 / max(1, len(consultas))
+    _, vizinhos = index.search(consultas, k)
+    return vizinhos, latencia_ms
+
+
+def comparar_indices(
+    base: np.ndarray,
+    consultas: np.ndarray,
+    k: int,
+    configuracoes: List[Dict],
+) -> List[Dict]:
+    """
+    Mede recall@k e latência de cada configuração contra a busca exata.
+
+    Args:
+        base: Vetores indexados (n x d, float32)
+        consultas: Vetores de consulta separados da base (m x d, float32)
+        k: Número de vizinhos considerados no recall
+        configuracoes: Lista de parâmetros de índice a comparar
+
+    Returns:
+        Lista de dicts com descrição, recall@k, latência média (ms) e tempo de construção
+    """
+    base = np.ascontiguousarray(base, dtype=np.float32)
+    consultas = np.ascontiguousarray(consultas, dtype=np.float32)
+    k = min(k, len(base))
+
+    exato = faiss.IndexFlatL2(base.shape[1])
+    exato.add(base)
+    verdade, latencia_exata = _buscar(exato, consultas, k)
+
+    relatorio = [{
+        "indice": "flat",
+        "recall": 1.0,
+        "latencia_ms": latencia_exata,
+        "construcao_s": 0.0,
+    }]
+
+    for parametros in configuracoes:
+        if parametros["tipo"] == "flat":
+            continue
+
+        inicio = time.perf_counter()
+        try:
+            index = criar_indice(parametros, base.shape[1], n_treino=len(base))
+            if not index.is_trained:
+                if len(base) < minimo_treino(parametros):
+                    raise ValueError(
+                        f"{len(base)} vetores são insuficientes para treinar (mínimo {minimo_treino(parametros)})"
+                    )
+                index.train(base)
+            index.add(base)
+        except (ValueError, RuntimeError) as e:
+            relatorio.append({"indice": descrever(parametros), "erro": str(e)})
+            continue
+        construcao = time.perf_counter() - inicio
+
+        vizinhos, latencia = _buscar(index, consultas, k)
+        acertos = sum(
+            len(set(vizinhos[i]) & set(verdade[i])) for i in range(len(consultas))
+        )
+        relatorio.append({
+            "indice": f"{descrever(parametros)} ef_search={parametros['ef_search']} nprobe={parametros['nprobe']}",
+            "recall": acertos / (k * len(consultas)),
+            "latencia_ms": latencia,
+            "construcao_s": construcao,
+        })
+
+    return relatorio
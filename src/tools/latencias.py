@@ -0,0 +1,120 @@
+"""
+Registro dos tempos por etapa das consultas, com percentis.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """
+    Calcula um percentil por interpolação linear.
+
+    Args:
+        valores: Amostras (não precisam estar ordenadas)
+        p: Percentil entre 0 e 100
+
+    Returns:
+        Valor do percentil (0.0 se não houver amostras)
+    """
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+class RegistroLatencias:
+    """
+    Mantém os tempos (ms) das consultas mais recentes, por etapa.
+
+    Thread-safe; apenas as últimas ``capacidade`` consultas são consideradas.
+    """
+
+    def __init__(self, capacidade: int = 1000):
+        """
+        Inicializa o registro.
+
+        Args:
+            capacidade: Número de consultas mantidas
+        """
+        self._amostras: deque = deque(maxlen=capacidade)
+        self._lock = threading.Lock()
+
+    def registrar(self, tempos: Dict[str, float]) -> None:
+        """
+        Registra os tempos de uma consulta.
+
+        Args:
+            tempos: Tempo em ms de cada etapa
+        """
+        with self._lock:
+            self._amostras.append(dict(tempos))
+
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        """
+        Resume os tempos registrados por etapa.
+
+        Returns:
+            Dict etapa -> {n, media, p50, p95} em ms
+        """
+        with self._lock:
+            amostras = list(self._amostras)
+
+        etapas: Dict[str, List[float]] = {}
+        for tempos in amostras:
+            for etapa, ms in tempos.items():
+                etapas.setdefault(etapa, []).append(ms)
+
+        return {
+            etapa: {
+                "n": len(valores),
+                "media": sum(valores) / len(valores),
+                "p50": percentil(valores, 50),
+                "p95": percentil(valores, 95),
+            }
+            for etapa, valores in etapas.items()
+        }
+
+
+class Cronometro:
+    """
+    Mede o tempo de etapas consecutivas de uma consulta.
+    """
+
+    def __init__(self):
+        self.inicio = self._marca = time.perf_counter()
+        self.tempos: Dict[str, float] = {}
+
+    def marcar(self, etapa: str) -> None:
+        """
+        Registra o tempo (ms) decorrido desde a marca anterior.
+
+        Args:
+            etapa: Nome da etapa encerrada
+        """
+        agora = time.perf_counter()
+        self.tempos[etapa] = (agora - self._marca) * 1000
+        self._marca = agora
+
+    def marcar_decorrido(self, etapa: str) -> None:
+        """
+        Registra o tempo (ms) desde o início, sem alterar a marca das etapas.
+
+        Args:
+            etapa: Nome do marco (ex.: tempo até o primeiro token)
+        """
+        self.tempos[etapa] = (time.perf_counter() - self.inicio) * 1000
+
+    def encerrar(self) -> Dict[str, float]:
+        """
+        Registra o tempo total e retorna os tempos por etapa.
+
+        Returns:
+            Dict etapa -> ms, incluindo ``total_ms``
+        """
+        self.tempos["total_ms"] = (time.perf_counter() - self.inicio) * 1000
+        return self.tempos
@@ -0,0 +1,144 @@
+"""
+Cache LRU em memória, thread-safe e com expiração opcional.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto para uso como chave de cache.
+
+    Aplica normalização Unicode, converte para minúsculas e colapsa espaços,
+    de modo que variações triviais da mesma mensagem gerem a mesma chave.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Texto normalizado
+    """
+    texto = unicodedata.normalize("NFC", texto)
+    return _ESPACOS.sub(" ", texto).strip().lower()
+
+
+class CacheLRU:
+    """
+    Cache LRU com capacidade limitada e TTL opcional.
+
+    Todas as operações são protegidas por um lock, permitindo o uso
+    compartilhado entre threads.
+    """
+
+    def __init__(self, capacidade: int, ttl: float = 0.0):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade: Número máximo de entradas
+            ttl: Tempo de vida das entradas em segundos (0 = sem expiração)
+        """
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._dados: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        """
+        Obtém um valor do cache, marcando-o como usado recentemente.
+
+        Args:
+            chave: Chave da entrada
+            padrao: Valor retornado se a chave não existir ou tiver expirado
+
+        Returns:
+            Valor armazenado ou ``padrao``
+        """
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is not None:
+                valor, expira_em = entrada
+                if expira_em is None or expira_em > time.monotonic():
+                    self._dados.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._dados[chave]
+            self.faltas += 1
+            return padrao
+
+    def definir(self, chave: Hashable, valor: Any) -> None:
+        """
+        Armazena um valor, removendo a entrada menos usada se necessário.
+
+        Args:
+            chave: Chave da entrada
+            valor: Valor a ser armazenado
+        """
+        if self.capacidade <= 0:
+            return
+        expira_em = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.capacidade:
+                self._dados.popitem(last=False)
+
+    def obter_ou_calcular(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Obtém um valor do cache ou o calcula e armazena.
+
+        O cálculo acontece fora do lock, para não bloquear outras threads.
+
+        Args:
+            chave: Chave da entrada
+            calcular: Função chamada quando a chave não está no cache
+
+        Returns:
+            Valor armazenado ou recém-calculado
+        """
+        ausente = object()
+        valor = self.obter(chave, ausente)
+        if valor is ausente:
+            valor = calcular()
+            self.definir(chave, valor)
+        return valor
+
+    def remover(self, chave: Hashable) -> None:
+        """Remove uma entrada do cache, se existir."""
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._dados)
+
+    def estatisticas(self) -> Dict:
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            Dict com acertos, faltas, taxa de acerto, tamanho e capacidade
+        """
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "tamanho": len(self._dados),
+                "capacidade": self.capacidade,
+            }
@@ -0,0 +1,237 @@
+"""
+Pipeline de geração de embeddings em lotes para construção do índice FAISS.
+
+Os chunks são embutidos em lotes de tamanho configurável e cada lote é
+adicionado ao índice assim que fica pronto, de modo que o pico de memória
+não cresce com o tamanho do corpus. Opcionalmente, os lotes são divididos
+entre processos que carregam sua própria cópia do modelo em CPU.
+"""
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from src.tools.cache_embeddings import CachedEmbeddings
+from src.tools.indices_ann import criar_indice, minimo_treino, requer_treino
+
+
+# Modelo carregado em cada processo do pool (ver _inicializar_worker)
+_modelo_worker = None
+
+
+def configurar_threads(threads: int) -> None:
+    """
+    Define o número de threads intra-op do torch.
+
+    Args:
+        threads: Número de threads (0 mantém o padrão do torch)
+    """
+    if threads > 0:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def _inicializar_worker(nome_modelo: str, threads: int) -> None:
+    """Carrega o modelo de embeddings uma única vez em cada processo do pool."""
+    global _modelo_worker
+    from sentence_transformers import SentenceTransformer
+
+    configurar_threads(threads)
+    _modelo_worker = SentenceTransformer(nome_modelo, device="cpu")
+
+
+def _embutir_lote_worker(textos: List[str]) -> List[List[float]]:
+    """Gera os embeddings de um lote no processo do pool."""
+    # Mesmo pré-processamento aplicado pelo HuggingFaceEmbeddings
+    textos = [texto.replace("\n", " ") for texto in textos]
+    return _modelo_worker.encode(textos, batch_size=len(textos)).tolist()
+
+
+def _lotes(splits: Iterable[Document], tamanho_lote: int) -> Iterator[List[Document]]:
+    """Agrupa os chunks em lotes consecutivos, consumindo o iterável sob demanda."""
+    lote = []
+    for split in splits:
+        lote.append(split)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _embutir_em_processos(
+    lotes: Iterator[List[Document]],
+    nome_modelo: str,
+    workers: int,
+    threads: int,
+    embeddings,
+) -> Iterator[Tuple[List[Document], List[List[float]]]]:
+    """
+    Distribui os lotes entre processos, devolvendo os resultados em ordem.
+
+    Apenas ``2 * workers`` lotes ficam em andamento ao mesmo tempo, para que
+    os vetores prontos não se acumulem na memória enquanto o índice consome.
+    Se ``embeddings`` tiver cache, só os textos ausentes vão para os processos.
+    """
+    # Divide as threads disponíveis entre os processos
+    threads_por_worker = max(1, threads // workers) if threads > 0 else 0
+    usa_cache = isinstance(embeddings, CachedEmbeddings)
+
+    def concluir(lote, vetores, faltantes, futuro):
+        if futuro is not None:
+            novos = futuro.result()
+            textos_faltantes = [lote[i].page_content for i in faltantes]
+            if usa_cache:
+                embeddings.armazenar(textos_faltantes, novos)
+            for i, vetor in zip(faltantes, novos):
+                vetores[i] = vetor
+        return lote, vetores
+
+    # spawn: um fork depois de o torch iniciar suas threads pode travar os workers
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_inicializar_worker,
+        initargs=(nome_modelo, threads_por_worker),
+    ) as executor:
+        pendentes = deque()
+        for lote in lotes:
+            textos = [doc.page_content for doc in lote]
+            vetores = embeddings.buscar(textos) if usa_cache else [None] * len(textos)
+            faltantes = [i for i, vetor in enumerate(vetores) if vetor is None]
+            futuro = None
+            if faltantes:
+                futuro = executor.submit(_embutir_lote_worker, [textos[i] for i in faltantes])
+            pendentes.append((lote, vetores, faltantes, futuro))
+            if len(pendentes) >= 2 * workers:
+                yield concluir(*pendentes.popleft())
+        while pendentes:
+            yield concluir(*pendentes.popleft())
+
+
+def _criar_vectorstore(embeddings, index) -> FAISS:
+    """Cria um vectorstore vazio sobre um índice FAISS já construído."""
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+
+
+def indexar_em_lotes(
+    splits: Iterable[Document],
+    embeddings,
+    tamanho_lote: int,
+    threads: int = 0,
+    workers: int = 1,
+    nome_modelo: Optional[str] = None,
+    parametros_indice: Optional[Dict] = None,
+    vectorstore: Optional[FAISS] = None,
+) -> Tuple[FAISS, Dict]:
+    """
+    Cria o índice FAISS (ou amplia um existente) adicionando os chunks lote a lote.
+
+    Args:
+        splits: Chunks a serem indexados (com ``id`` definido); pode ser um
+            gerador, consumido lote a lote
+        embeddings: Modelo de embeddings usado pelo índice
+        tamanho_lote: Número de chunks por lote
+        threads: Threads intra-op do torch (0 = padrão)
+        workers: Processos para dividir os lotes (1 = processo atual)
+        nome_modelo: Modelo sentence-transformers carregado pelos processos;
+            obrigatório quando ``workers > 1``
+        parametros_indice: Tipo e parâmetros do índice FAISS (ver
+            ``indices_ann``); None cria um índice exato (flat). Índices que
+            exigem treino acumulam uma amostra dos primeiros lotes antes de
+            receber vetores (``amostra_treino``, e nunca menos que
+            ``minimo_treino``)
+        vectorstore: Índice existente que recebe os chunks (reindexação
+            incremental); None cria um índice novo com ``parametros_indice``
+
+    Returns:
+        Tupla com o índice criado (ou ampliado) e as estatísticas da indexação
+    """
+    inicio = time.perf_counter()
+    acertos_antes = getattr(embeddings, "acertos", 0)
+    lotes = _lotes(splits, max(1, tamanho_lote))
+
+    if workers > 1 and nome_modelo:
+        resultados = _embutir_em_processos(lotes, nome_modelo, workers, threads, embeddings)
+    else:
+        configurar_threads(threads)
+        resultados = (
+            (lote, embeddings.embed_documents([doc.page_content for doc in lote]))
+            for lote in lotes
+        )
+
+    parametros_indice = parametros_indice or {"tipo": "flat"}
+    # Uma amostra configurada abaixo do mínimo treinaria centróides sem pontos
+    amostra_treino = (
+        max(parametros_indice["amostra_treino"], minimo_treino(parametros_indice))
+        if requer_treino(parametros_indice) else 0
+    )
+    # Lotes retidos até haver vetores suficientes para treinar o índice
+    amostra: List[Tuple[List[Document], List[List[float]]]] = []
+    total = 0
+
+    def adicionar(lote, vetores):
+        pares = [(doc.page_content, vetor) for doc, vetor in zip(lote, vetores)]
+        metadatas = [doc.metadata for doc in lote]
+        vectorstore.add_embeddings(pares, metadatas=metadatas, ids=[doc.id for doc in lote])
+
+    def treinar_e_descarregar(parametros):
+        nonlocal vectorstore
+        vetores_treino = np.array([v for _, vetores in amostra for v in vetores], dtype=np.float32)
+        index = criar_indice(parametros, vetores_treino.shape[1], n_treino=len(vetores_treino))
+        if not index.is_trained:
+            index.train(vetores_treino)
+        vectorstore = _criar_vectorstore(embeddings, index)
+        for lote_amostra, vetores_amostra in amostra:
+            adicionar(lote_amostra, vetores_amostra)
+        amostra.clear()
+
+    for lote, vetores in resultados:
+        total += len(lote)
+        if vectorstore is not None:
+            adicionar(lote, vetores)
+        elif requer_treino(parametros_indice):
+            amostra.append((lote, vetores))
+            if total >= amostra_treino:
+                treinar_e_descarregar(parametros_indice)
+        else:
+            vectorstore = _criar_vectorstore(embeddings, criar_indice(parametros_indice, len(vetores[0])))
+            adicionar(lote, vetores)
+
+    if vectorstore is None and amostra:
+        if total >= minimo_treino(parametros_indice):
+            treinar_e_descarregar(parametros_indice)
+        else:
+            # Corpus pequeno demais para treinar o IVF-PQ: a busca exata é barata nesse caso
+            print(
+                f"⚠️ {total} chunks são insuficientes para treinar o índice "
+                f"{parametros_indice['tipo']} (mínimo {minimo_treino(parametros_indice)}); usando índice exato"
+            )
+            treinar_e_descarregar({**parametros_indice, "tipo": "flat"})
+
+    if vectorstore is None:
+        raise ValueError("Nenhum chunk para indexar.")
+
+    duracao = time.perf_counter() - inicio
+    estatisticas = {
+        "chunks": total,
+        "segundos": duracao,
+        "chunks_por_segundo": total / duracao if duracao > 0 else 0.0,
+        "tamanho_lote": tamanho_lote,
+        "workers": workers,
+        "acertos_cache": getattr(embeddings, "acertos", 0) - acertos_antes,
+        "tipo_indice": type(vectorstore.index).__name__,
+    }
+    return vectorstore, estatisticas
@@ -4,14 +4,32 @@ Sistema RAG (Retrieval-Augmented Generation) para consulta de políticas da empr
 import os
 from pathlib import Path
 from typing import List, Dict
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.config.settings import GOOGLE_API_KEY
+from src.config.settings import (
+    GOOGLE_API_KEY,
+    RAG_CHUNK_SIZE,
+    RAG_CHUNK_OVERLAP,
+    RAG_INDEX_DIR,
+    RAG_INDEX_CACHE,
+    RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_PATH,
+)
+from src.tools.cache_embeddings import CachedEmbeddings, EmbeddingCache
+from src.tools.index_store import IndexStore
+from src.tools.indexacao import (
+    carregar_pdfs,
+    criar_manifesto,
+    dividir_documentos,
+    reindexar_incremental,
+)
+
+
+# Modelo de embeddings do Google usado para indexação e consultas
+MODELO_EMBEDDINGS = "models/embedding-001"
 
 
 class RAGSystem:
@@ -19,41 +37,48 @@ class RAGSystem:
     Sistema RAG para consulta de documentos PDF com políticas da empresa.
     """
     
-    def __init__(self, pdf_folder: str = "Pdf_Imersao_IA"):
+    def __init__(self, pdf_folder: str = "Pdf_Imersao_IA", usar_cache_indice: bool = RAG_INDEX_CACHE):
         """
         Inicializa o sistema RAG.
         
         Args:
             pdf_folder: Caminho para a pasta com os PDFs
+            usar_cache_indice: Se o índice vetorial deve ser persistido em disco
         """
         self.pdf_folder = Path(pdf_folder)
         self.docs = []
         self.vectorstore = None
+        self.manifesto: Dict[str, Dict] = {}
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-1.5-flash",
             temperature=0.3,
             google_api_key=GOOGLE_API_KEY,
         )
         self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
+            model=MODELO_EMBEDDINGS,
             google_api_key=GOOGLE_API_KEY
         )
+        if RAG_EMBEDDING_CACHE:
+            # Consulta o cache persistente antes de chamar o modelo de embeddings
+            self.embeddings = CachedEmbeddings(
+                self.embeddings, MODELO_EMBEDDINGS, EmbeddingCache(RAG_EMBEDDING_CACHE_PATH)
+            )
+        self.index_store = IndexStore(
+            RAG_INDEX_DIR, MODELO_EMBEDDINGS, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP
+        ) if usar_cache_indice else None
+        
+    def _listar_pdfs(self) -> List[Path]:
+        """Lista os PDFs da pasta em ordem determinística."""
+        if not self.pdf_folder.exists():
+            raise FileNotFoundError(f"Pasta não encontrada: {self.pdf_folder}")
+        return sorted(self.pdf_folder.glob("*.pdf"))
         
     def carregar_documentos(self) -> None:
         """Carrega todos os PDFs da pasta especificada."""
         print("📚 Carregando documentos PDF...")
         
-        if not self.pdf_folder.exists():
-            raise FileNotFoundError(f"Pasta não encontrada: {self.pdf_folder}")
-        
-        for pdf_file in self.pdf_folder.glob("*.pdf"):
-            try:
-                loader = PyMuPDFLoader(str(pdf_file))
-                docs = loader.load()
-                self.docs.extend(docs)
-                print(f"✅ Arquivo carregado: {pdf_file.name}")
-            except Exception as e:
-                print(f"❌ Erro ao carregar {pdf_file.name}: {e}")
+        # Leitura sequencial ou em pool de processos, conforme RAG_INGESTAO_WORKERS
+        self.docs.extend(carregar_pdfs(self._listar_pdfs()))
         
         print(f"📊 Total de documentos carregados: {len(self.docs)}")
     
@@ -64,20 +89,69 @@ class RAGSystem:
         
         print("🔧 Processando documentos...")
         
-        # Divide os documentos em chunks menores
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        
-        splits = text_splitter.split_documents(self.docs)
+        # Divide os documentos em chunks menores, com ids estáveis por arquivo
+        splits, ids_por_arquivo = dividir_documentos(self.docs)
         print(f"📄 Documentos divididos em {len(splits)} chunks")
         
         # Cria o índice vetorial
         print("🔍 Criando índice vetorial...")
-        self.vectorstore = FAISS.from_documents(splits, self.embeddings)
+        self.vectorstore = FAISS.from_documents(
+            splits, self.embeddings, ids=[split.id for split in splits]
+        )
         print("✅ Índice vetorial criado com sucesso!")
+        
+        pdf_files = self._listar_pdfs()
+        self.manifesto = criar_manifesto(pdf_files, ids_por_arquivo)
+        
+        if self.index_store:
+            chave = self.index_store.calcular_chave(pdf_files)
+            self.index_store.salvar(self.vectorstore, chave, {"manifesto": self.manifesto})
+            print(f"💾 Índice salvo em: {self.index_store.diretorio}")
+    
+    def carregar_indice_salvo(self) -> bool:
+        """
+        Carrega o índice vetorial salvo em disco, se ainda for válido.
+        
+        Returns:
+            True se o índice foi carregado, False se precisa ser reconstruído
+        """
+        if not self.index_store:
+            return False
+        
+        chave = self.index_store.calcular_chave(self._listar_pdfs())
+        vectorstore = self.index_store.carregar(chave, self.embeddings)
+        if vectorstore is None:
+            return False
+        
+        self.vectorstore = vectorstore
+        self.manifesto = self.index_store.ler_metadados().get("manifesto", {})
+        print(f"⚡ Índice vetorial carregado do disco: {self.index_store.diretorio}")
+        return True
+    
+    def reindexar(self) -> Dict[str, List[str]]:
+        """
+        Atualiza o índice apenas com os PDFs adicionados, alterados ou removidos.
+        
+        Returns:
+            Dict com as listas de arquivos adicionados, alterados, removidos e inalterados
+        """
+        return reindexar_incremental(self)
+    
+    def listar_fontes(self) -> List[str]:
+        """
+        Lista os arquivos de origem presentes no sistema.
+        
+        Returns:
+            Lista ordenada com o caminho de cada PDF indexado
+        """
+        if self.docs:
+            fontes = {doc.metadata.get("source", "Desconhecida") for doc in self.docs}
+        elif self.manifesto:
+            # O manifesto tem uma entrada por arquivo com chunks no índice
+            fontes = {str(self.pdf_folder / nome) for nome in self.manifesto}
+        else:
+            fontes = set()
+        return sorted(fontes)
     
     def consultar(self, pergunta: str, k: int = 3) -> Dict:
         """
@@ -132,7 +206,9 @@ class RAGSystem:
         }
     
     def inicializar(self) -> None:
-        """Inicializa o sistema RAG completo."""
+        """Inicializa o sistema RAG completo, reaproveitando o índice salvo quando possível."""
+        if self.carregar_indice_salvo():
+            return
         self.carregar_documentos()
         self.processar_documentos()
 
@@ -1,17 +1,79 @@
 """
 Sistema RAG alternativo usando embeddings locais (sem limite de quota).
 """
+import asyncio
 import os
 from pathlib import Path
-from typing import List, Dict
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.config.settings import GOOGLE_API_KEY
+from src.config.settings import (
+    RAG_CHUNK_SIZE,
+    RAG_CHUNK_OVERLAP,
+    RAG_INDEX_DIR,
+    RAG_INDEX_CACHE,
+    RAG_EMBEDDING_BATCH,
+    RAG_EMBEDDING_THREADS,
+    RAG_EMBEDDING_WORKERS,
+    RAG_QUERY_CACHE_TAMANHO,
+    RAG_QUERY_CACHE_TTL,
+    RAG_RESPOSTA_CACHE_TAMANHO,
+    RAG_RESPOSTA_CACHE_LIMIAR,
+    RAG_INDICE_COMPARTILHADO,
+    RAG_BUSCA_HIBRIDA,
+    RAG_HIBRIDO_CANDIDATOS,
+    RAG_RRF_K,
+    RAG_RERANK,
+    RAG_RERANK_MODELO,
+    RAG_RERANK_CANDIDATOS,
+    RAG_RERANK_ORCAMENTO_MS,
+)
+from src.tools.bm25 import IndiceBM25, fundir_rrf
+from src.tools.cache_embeddings import hash_texto
+from src.tools.cache_respostas import CacheSemantico
+from src.tools.index_store import IndexStore
+from src.tools.indices_ann import comparar_indices, configurar_busca, descrever, parametros_configurados
+from src.tools.indice_compartilhado import (
+    DocstoreMmap,
+    carregar_indice_compartilhado,
+    exportar_indice_compartilhado,
+)
+from src.tools.indexacao import (
+    carregar_pdfs,
+    carregar_pdfs_em_fluxo,
+    criar_catalogo,
+    criar_entrada_catalogo,
+    criar_manifesto,
+    dividir_documentos,
+    reindexar_incremental,
+)
+from src.tools.latencias import Cronometro, RegistroLatencias
+from src.tools.lru import CacheLRU, normalizar_texto
+from src.tools.pipeline_embeddings import indexar_em_lotes
+from src.tools.recursos import MODELO_EMBEDDINGS, obter_embeddings, obter_llm
+from src.tools.reranker import ReRanker
+
+
+# Prompt para o LLM, montado uma única vez
+PROMPT_RAG = ChatPromptTemplate.from_messages([
+    ("system", """Você é um assistente especializado em políticas da empresa Carraro Desenvolvimento.
+
+    Use APENAS as informações fornecidas no contexto abaixo para responder à pergunta.
+    Se a informação não estiver no contexto, diga que não tem essa informação disponível.
+
+    Seja claro, objetivo e cite a política específica quando possível.
+
+    Contexto:
+    {contexto}"""),
+    ("human", "{pergunta}")
+])
+
+
+def _id_chunk(doc: Document) -> str:
+    """Identificador estável de um chunk (id atribuído na indexação ou hash do texto)."""
+    return doc.id or hash_texto(doc.page_content)
 
 
 class RAGSystemLocal:
@@ -19,74 +81,433 @@ class RAGSystemLocal:
     Sistema RAG usando embeddings locais (HuggingFace) para evitar limites de quota.
     """
     
-    def __init__(self, pdf_folder: str = "Pdf_Imersao_IA"):
+    def __init__(
+        self,
+        pdf_folder: str = "Pdf_Imersao_IA",
+        usar_cache_indice: bool = RAG_INDEX_CACHE,
+        indice_compartilhado: str = RAG_INDICE_COMPARTILHADO,
+        usar_rerank: bool = RAG_RERANK,
+    ):
         """
         Inicializa o sistema RAG com embeddings locais.
         
         Args:
             pdf_folder: Caminho para a pasta com os PDFs
+            usar_cache_indice: Se o índice vetorial deve ser persistido em disco
+            indice_compartilhado: Diretório do índice somente leitura mapeado
+                em memória e compartilhado entre workers (vazio = desativado)
+            usar_rerank: Se os candidatos devem ser re-ordenados por um cross-encoder
         """
         self.pdf_folder = Path(pdf_folder)
         self.docs = []
         self.vectorstore = None
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            temperature=0.3,
-            google_api_key=GOOGLE_API_KEY,
-        )
-        # Usa embeddings locais do HuggingFace
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
+        self.manifesto: Dict[str, Dict] = {}
+        # Resumo por arquivo (fonte, páginas, bytes, chunks); substitui manter as páginas
+        self.catalogo: Dict[str, Dict] = {}
+        # Cliente do LLM e modelo de embeddings compartilhados pelo processo
+        self.llm = obter_llm()
+        self.embeddings = obter_embeddings()
+        self.estatisticas_indexacao: Dict = {}
+        # Perguntas recorrentes reaproveitam o embedding sem passar pelo modelo
+        self.cache_consultas = CacheLRU(RAG_QUERY_CACHE_TAMANHO, RAG_QUERY_CACHE_TTL)
+        # Perguntas quase idênticas que recuperam os mesmos chunks reaproveitam a resposta
+        self.cache_respostas = CacheSemantico(RAG_RESPOSTA_CACHE_TAMANHO, RAG_RESPOSTA_CACHE_LIMIAR)
+        # Tipo do índice FAISS (flat, hnsw ou ivfpq) e parâmetros de busca
+        self.parametros_indice = parametros_configurados()
+        self.index_store = IndexStore(
+            RAG_INDEX_DIR, MODELO_EMBEDDINGS, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP,
+            descrever(self.parametros_indice),
+        ) if usar_cache_indice else None
+        self.indice_compartilhado = indice_compartilhado
+        # Índice BM25 sobre os mesmos chunks, reconstruído sempre que o índice vetorial muda
+        self.busca_hibrida = RAG_BUSCA_HIBRIDA
+        self.bm25: Optional[IndiceBM25] = None
+        self._chave_docstore: Dict[str, str] = {}
+        # Re-ranking opcional dos candidatos com orçamento de tempo por consulta
+        self.reranker = ReRanker(RAG_RERANK_MODELO, RAG_RERANK_ORCAMENTO_MS) if usar_rerank else None
+        # Tempos por etapa das consultas recentes (para ajustar N contra o p95)
+        self.latencias = RegistroLatencias()
+        
+    def _listar_pdfs(self) -> List[Path]:
+        """Lista os PDFs da pasta em ordem determinística."""
+        if not self.pdf_folder.exists():
+            raise FileNotFoundError(f"Pasta não encontrada: {self.pdf_folder}")
+        return sorted(self.pdf_folder.glob("*.pdf"))
         
     def carregar_documentos(self) -> None:
         """Carrega todos os PDFs da pasta especificada."""
         print("📚 Carregando documentos PDF...")
         
-        if not self.pdf_folder.exists():
-            raise FileNotFoundError(f"Pasta não encontrada: {self.pdf_folder}")
-        
-        for pdf_file in self.pdf_folder.glob("*.pdf"):
-            try:
-                loader = PyMuPDFLoader(str(pdf_file))
-                docs = loader.load()
-                self.docs.extend(docs)
-                print(f"✅ Arquivo carregado: {pdf_file.name}")
-            except Exception as e:
-                print(f"❌ Erro ao carregar {pdf_file.name}: {e}")
+        # Leitura sequencial ou em pool de processos, conforme RAG_INGESTAO_WORKERS
+        self.docs.extend(carregar_pdfs(self._listar_pdfs()))
         
         print(f"📊 Total de documentos carregados: {len(self.docs)}")
     
     def processar_documentos(self) -> None:
-        """Processa os documentos e cria o índice vetorial."""
+        """
+        Processa os documentos carregados e cria o índice vetorial.
+        
+        Depois da divisão em chunks as páginas são descartadas; apenas o
+        catálogo do corpus permanece em memória.
+        """
         if not self.docs:
             raise ValueError("Nenhum documento carregado. Execute carregar_documentos() primeiro.")
         
         print("🔧 Processando documentos...")
         
-        # Divide os documentos em chunks menores
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        
-        splits = text_splitter.split_documents(self.docs)
+        # Divide os documentos em chunks menores, com ids estáveis por arquivo
+        splits, ids_por_arquivo = dividir_documentos(self.docs)
         print(f"📄 Documentos divididos em {len(splits)} chunks")
         
+        catalogo = criar_catalogo(self.docs, ids_por_arquivo)
+        self.docs = []
+        
+        self._criar_indice(splits, ids_por_arquivo, catalogo)
+    
+    def processar_em_fluxo(self) -> None:
+        """
+        Carrega, divide e indexa os PDFs arquivo a arquivo.
+        
+        Cada arquivo é dividido em chunks assim que é lido e os chunks seguem
+        direto para o pipeline de embeddings, de modo que as páginas de todo o
+        corpus nunca ficam na memória ao mesmo tempo.
+        """
+        print("📚 Carregando e indexando documentos em fluxo...")
+        
+        ids_por_arquivo: Dict[str, List[str]] = {}
+        catalogo: Dict[str, Dict] = {}
+        
+        def gerar_chunks():
+            for pdf_file, docs in carregar_pdfs_em_fluxo(self._listar_pdfs()):
+                splits, ids = dividir_documentos(docs)
+                ids_por_arquivo.update(ids)
+                catalogo[pdf_file.name] = criar_entrada_catalogo(pdf_file, len(docs), len(splits))
+                yield from splits
+        
+        self._criar_indice(gerar_chunks(), ids_por_arquivo, catalogo)
+    
+    @staticmethod
+    def _opcoes_indexacao() -> Dict:
+        """Parâmetros do pipeline em lotes, os mesmos na construção completa e na incremental."""
+        return {
+            "tamanho_lote": RAG_EMBEDDING_BATCH,
+            "threads": RAG_EMBEDDING_THREADS,
+            "workers": RAG_EMBEDDING_WORKERS,
+            "nome_modelo": MODELO_EMBEDDINGS,
+        }
+    
+    def _criar_indice(self, splits, ids_por_arquivo: Dict[str, List[str]], catalogo: Dict[str, Dict]) -> None:
+        """
+        Cria o índice vetorial a partir dos chunks e salva o resultado.
+        
+        Args:
+            splits: Chunks a serem indexados (lista ou gerador)
+            ids_por_arquivo: Preenchido com o mapeamento arquivo -> ids dos chunks
+            catalogo: Preenchido com o resumo de cada arquivo do corpus
+        """
         # Cria o índice vetorial com embeddings locais
         print("🔍 Criando índice vetorial com embeddings locais...")
-        self.vectorstore = FAISS.from_documents(splits, self.embeddings)
+        self.vectorstore, self.estatisticas_indexacao = indexar_em_lotes(
+            splits,
+            self.embeddings,
+            parametros_indice=self.parametros_indice,
+            **self._opcoes_indexacao(),
+        )
         print("✅ Índice vetorial criado com sucesso!")
+        self._indice_atualizado()
+        
+        stats = self.estatisticas_indexacao
+        print(
+            f"⚡ Throughput: {stats['chunks']} chunks em {stats['segundos']:.1f}s "
+            f"({stats['chunks_por_segundo']:.1f} chunks/s, lotes de {stats['tamanho_lote']}, "
+            f"{stats['workers']} processo(s), {stats['acertos_cache']} do cache)"
+        )
+        
+        pdf_files = self._listar_pdfs()
+        self.manifesto = criar_manifesto(pdf_files, ids_por_arquivo)
+        self.catalogo = catalogo
+        
+        if self.index_store:
+            chave = self.index_store.calcular_chave(pdf_files)
+            self.index_store.salvar(
+                self.vectorstore, chave, {"manifesto": self.manifesto, "catalogo": self.catalogo}
+            )
+            print(f"💾 Índice salvo em: {self.index_store.diretorio}")
     
-    def consultar(self, pergunta: str, k: int = 3) -> Dict:
+    def carregar_indice_salvo(self) -> bool:
+        """
+        Carrega o índice vetorial salvo em disco, se ainda for válido.
+        
+        Returns:
+            True se o índice foi carregado, False se precisa ser reconstruído
+        """
+        if not self.index_store:
+            return False
+        
+        chave = self.index_store.calcular_chave(self._listar_pdfs())
+        vectorstore = self.index_store.carregar(chave, self.embeddings)
+        if vectorstore is None:
+            return False
+        
+        self.vectorstore = vectorstore
+        metadados = self.index_store.ler_metadados()
+        self.manifesto = metadados.get("manifesto", {})
+        self.catalogo = metadados.get("catalogo", {})
+        self._indice_atualizado()
+        print(f"⚡ Índice vetorial carregado do disco: {self.index_store.diretorio}")
+        return True
+    
+    def reindexar(self) -> Dict[str, List[str]]:
+        """
+        Atualiza o índice apenas com os PDFs adicionados, alterados ou removidos.
+        
+        Returns:
+            Dict com as listas de arquivos adicionados, alterados, removidos e inalterados
+        """
+        if self.vectorstore is not None and isinstance(self.vectorstore.docstore, DocstoreMmap):
+            # O índice mapeado é somente leitura: a atualização parte do índice salvo
+            self.vectorstore = None
+        
+        if self.parametros_indice["tipo"] == "hnsw":
+            # O HNSW não permite remover vetores: reconstrói o índice inteiro,
+            # aproveitando o cache de embeddings para os chunks inalterados
+            print("🔧 Índice HNSW não suporta remoção, reconstruindo índice completo...")
+            self.processar_em_fluxo()
+            resumo = {"adicionados": sorted(self.manifesto), "alterados": [], "removidos": [], "inalterados": []}
+        else:
+            resumo = reindexar_incremental(self, **self._opcoes_indexacao())
+            self._indice_atualizado()
+        
+        if self.indice_compartilhado:
+            self.publicar_indice_compartilhado()
+        return resumo
+    
+    def listar_fontes(self) -> List[str]:
+        """
+        Lista os arquivos de origem presentes no sistema.
+        
+        Returns:
+            Lista ordenada com o caminho de cada PDF indexado
+        """
+        if self.catalogo:
+            fontes = {entrada["fonte"] for entrada in self.catalogo.values()}
+        elif self.docs:
+            fontes = {doc.metadata.get("source", "Desconhecida") for doc in self.docs}
+        elif self.vectorstore:
+            docstore = self.vectorstore.docstore
+            fontes = {
+                docstore.search(doc_id).metadata.get("source", "Desconhecida")
+                for doc_id in self.vectorstore.index_to_docstore_id.values()
+            }
+        else:
+            fontes = set()
+        return sorted(fontes)
+    
+    def _indice_atualizado(self) -> None:
+        """Atualiza as estruturas derivadas do índice vetorial após qualquer mudança."""
+        if self.vectorstore is not None:
+            # efSearch/nprobe não fazem parte da chave do índice: aplica os atuais
+            configurar_busca(self.vectorstore.index, self.parametros_indice)
+        # Respostas antigas podem citar chunks que mudaram
+        self.cache_respostas.limpar()
+        self._construir_bm25()
+    
+    def _construir_bm25(self) -> None:
+        """Constrói o índice BM25 sobre os mesmos chunks do índice vetorial."""
+        if not self.busca_hibrida or self.vectorstore is None:
+            self.bm25 = None
+            return
+        
+        bm25 = IndiceBM25()
+        chave_docstore = {}
+        docstore = self.vectorstore.docstore
+        for chave in self.vectorstore.index_to_docstore_id.values():
+            doc = docstore.search(chave)
+            chunk_id = _id_chunk(doc)
+            chave_docstore[chunk_id] = chave
+            bm25.adicionar(chunk_id, doc.page_content)
+        
+        self.bm25, self._chave_docstore = bm25, chave_docstore
+    
+    def buscar_documentos(self, pergunta: str, vetor_pergunta: List[float], k: int) -> List[Document]:
+        """
+        Recupera os chunks mais relevantes para a pergunta.
+        
+        Com a busca híbrida ativa, combina os candidatos da busca vetorial e
+        do BM25 por Reciprocal Rank Fusion; caso contrário, usa apenas a
+        busca vetorial.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            vetor_pergunta: Embedding da pergunta
+            k: Número de chunks a retornar
+            
+        Returns:
+            Lista de chunks em ordem de relevância
+        """
+        if self.bm25 is None:
+            return self.vectorstore.similarity_search_by_vector(vetor_pergunta, k=k)
+        
+        candidatos = max(k, RAG_HIBRIDO_CANDIDATOS)
+        densos = {
+            _id_chunk(doc): doc
+            for doc in self.vectorstore.similarity_search_by_vector(vetor_pergunta, k=candidatos)
+        }
+        esparsos = [chunk_id for chunk_id, _ in self.bm25.buscar(pergunta, candidatos)]
+        
+        docs = []
+        for chunk_id in fundir_rrf([list(densos), esparsos], RAG_RRF_K)[:k]:
+            doc = densos.get(chunk_id)
+            if doc is None:
+                doc = self.vectorstore.docstore.search(self._chave_docstore[chunk_id])
+            docs.append(doc)
+        return docs
+    
+    def embutir_pergunta(self, pergunta: str) -> List[float]:
+        """
+        Gera o embedding de uma pergunta, usando o cache de consultas.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            
+        Returns:
+            Vetor de embedding da pergunta
+        """
+        return self.cache_consultas.obter_ou_calcular(
+            normalizar_texto(pergunta),
+            lambda: self.embeddings.embed_query(pergunta),
+        )
+    
+    def estatisticas_cache(self) -> Dict:
+        """
+        Retorna as estatísticas dos caches usados nas consultas.
+        
+        Returns:
+            Dict com acertos, faltas e ocupação de cada cache
+        """
+        return {
+            "consultas": self.cache_consultas.estatisticas(),
+            "respostas": self.cache_respostas.estatisticas(),
+        }
+    
+    def estatisticas_latencia(self) -> Dict:
+        """
+        Retorna média, p50 e p95 (ms) de cada etapa das consultas recentes.
+        
+        Returns:
+            Dict etapa -> {n, media, p50, p95}, mais o uso do re-ranking se ativo
+        """
+        resumo = {"etapas": self.latencias.resumo()}
+        if self.reranker is not None:
+            resumo["rerank"] = self.reranker.estatisticas()
+        return resumo
+    
+    def _recuperar(self, pergunta: str, k: int, cronometro: Cronometro) -> Tuple[List[float], List[Document]]:
+        """
+        Gera o embedding da pergunta e recupera (e re-ordena, se ativo) os chunks.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            k: Número de chunks a retornar
+            cronometro: Cronômetro da consulta
+            
+        Returns:
+            Tupla (embedding da pergunta, chunks relevantes)
+        """
+        vetor_pergunta = self.embutir_pergunta(pergunta)
+        cronometro.marcar("embedding_ms")
+        if self.reranker is not None:
+            candidatos = self.buscar_documentos(pergunta, vetor_pergunta, max(k, RAG_RERANK_CANDIDATOS))
+            cronometro.marcar("busca_ms")
+            docs_relevantes, _ = self.reranker.reordenar(pergunta, candidatos, k)
+            cronometro.marcar("rerank_ms")
+        else:
+            docs_relevantes = self.buscar_documentos(pergunta, vetor_pergunta, k)
+            cronometro.marcar("busca_ms")
+        return vetor_pergunta, docs_relevantes
+    
+    def recuperar(self, pergunta: str, k: int = 3) -> Dict:
+        """
+        Executa apenas a recuperação (embedding, busca e re-ranking), sem o LLM.
+        
+        Permite adiantar a busca enquanto outra etapa (como a triagem) ainda
+        está em andamento; o resultado é repassado a ``consultar``.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            k: Número de chunks a recuperar
+            
+        Returns:
+            Dict com a pergunta, k, embedding, chunks e tempos da recuperação
+        """
+        if not self.vectorstore:
+            raise ValueError("Sistema não inicializado. Execute inicializar() primeiro.")
+        
+        cronometro = Cronometro()
+        vetor_pergunta, docs = self._recuperar(pergunta, k, cronometro)
+        return {
+            "pergunta": pergunta,
+            "k": k,
+            "vetor": vetor_pergunta,
+            "documentos": docs,
+            "tempos": dict(cronometro.tempos),
+        }
+    
+    def _usar_recuperacao(
+        self, pergunta: str, k: int, recuperacao: Optional[Dict], cronometro: Cronometro
+    ) -> Optional[Tuple[List[float], List[Document]]]:
+        """Reaproveita uma recuperação antecipada se ela corresponde à consulta."""
+        if recuperacao is None or recuperacao["pergunta"] != pergunta or recuperacao["k"] != k:
+            return None
+        cronometro.tempos.update(recuperacao["tempos"])
+        return recuperacao["vetor"], recuperacao["documentos"]
+    
+    def _resposta_em_cache(self, vetor_pergunta: List[float], docs: List[Document], cronometro: Cronometro) -> Optional[Dict]:
+        """Reaproveita a resposta de uma pergunta semelhante com o mesmo contexto."""
+        resultado = self.cache_respostas.buscar(vetor_pergunta, [_id_chunk(doc) for doc in docs])
+        if resultado is not None:
+            resultado["tempos"] = cronometro.encerrar()
+            self.latencias.registrar(resultado["tempos"])
+        return resultado
+    
+    def _resumir_documentos(self, docs: List[Document]) -> List[Dict]:
+        """Fonte e trecho inicial de cada chunk usado como contexto."""
+        return [
+            {
+                "fonte": doc.metadata.get("source", "Desconhecida"),
+                "conteudo": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
+            }
+            for doc in docs
+        ]
+    
+    def _concluir_consulta(
+        self,
+        resposta: str,
+        docs: List[Document],
+        vetor_pergunta: List[float],
+        cronometro: Cronometro,
+    ) -> Dict:
+        """Monta o resultado da consulta, registra os tempos e armazena no cache."""
+        cronometro.marcar("llm_ms")
+        tempos = cronometro.encerrar()
+        self.latencias.registrar(tempos)
+        
+        resultado = {
+            "resposta": resposta,
+            "documentos_relevantes": self._resumir_documentos(docs),
+            "tempos": tempos,
+        }
+        self.cache_respostas.armazenar(vetor_pergunta, [_id_chunk(doc) for doc in docs], resultado)
+        return resultado
+    
+    def consultar(self, pergunta: str, k: int = 3, recuperacao: Optional[Dict] = None) -> Dict:
         """
         Consulta o sistema RAG com uma pergunta.
         
         Args:
             pergunta: Pergunta do usuário
             k: Número de documentos relevantes para recuperar
+            recuperacao: Resultado de ``recuperar`` já calculado para a pergunta
             
         Returns:
             Dict com a resposta e documentos relevantes
@@ -94,48 +515,244 @@ class RAGSystemLocal:
         if not self.vectorstore:
             raise ValueError("Sistema não inicializado. Execute carregar_documentos() e processar_documentos() primeiro.")
         
-        # Busca documentos relevantes
-        docs_relevantes = self.vectorstore.similarity_search(pergunta, k=k)
+        cronometro = Cronometro()
+        recuperado = self._usar_recuperacao(pergunta, k, recuperacao, cronometro)
+        if recuperado is None:
+            recuperado = self._recuperar(pergunta, k, cronometro)
+        vetor_pergunta, docs_relevantes = recuperado
         
-        # Cria o contexto a partir dos documentos
-        contexto = "\n\n".join([doc.page_content for doc in docs_relevantes])
+        resultado_cache = self._resposta_em_cache(vetor_pergunta, docs_relevantes, cronometro)
+        if resultado_cache is not None:
+            return resultado_cache
         
-        # Prompt para o LLM
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """Você é um assistente especializado em políticas da empresa Carraro Desenvolvimento.
+        # Gera a resposta a partir do contexto dos documentos
+        chain = PROMPT_RAG | self.llm
+        resposta = chain.invoke({
+            "contexto": "\n\n".join([doc.page_content for doc in docs_relevantes]),
+            "pergunta": pergunta
+        })
+        return self._concluir_consulta(resposta.content, docs_relevantes, vetor_pergunta, cronometro)
+    
+    async def aconsultar(self, pergunta: str, k: int = 3, recuperacao: Optional[Dict] = None) -> Dict:
+        """
+        Versão assíncrona de ``consultar``.
+        
+        Embedding, busca e re-ranking rodam em CPU e são executados em uma
+        thread; a chamada ao LLM usa ``ainvoke`` e não bloqueia o event loop.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            k: Número de documentos relevantes para recuperar
+            recuperacao: Resultado de ``recuperar`` já calculado para a pergunta
             
-            Use APENAS as informações fornecidas no contexto abaixo para responder à pergunta.
-            Se a informação não estiver no contexto, diga que não tem essa informação disponível.
+        Returns:
+            Dict com a resposta e documentos relevantes
+        """
+        if not self.vectorstore:
+            raise ValueError("Sistema não inicializado. Execute carregar_documentos() e processar_documentos() primeiro.")
+        
+        cronometro = Cronometro()
+        recuperado = self._usar_recuperacao(pergunta, k, recuperacao, cronometro)
+        if recuperado is None:
+            recuperado = await asyncio.to_thread(self._recuperar, pergunta, k, cronometro)
+        vetor_pergunta, docs_relevantes = recuperado
+        
+        resultado_cache = self._resposta_em_cache(vetor_pergunta, docs_relevantes, cronometro)
+        if resultado_cache is not None:
+            return resultado_cache
+        
+        chain = PROMPT_RAG | self.llm
+        resposta = await chain.ainvoke({
+            "contexto": "\n\n".join([doc.page_content for doc in docs_relevantes]),
+            "pergunta": pergunta
+        })
+        return self._concluir_consulta(resposta.content, docs_relevantes, vetor_pergunta, cronometro)
+    
+    def consultar_stream(self, pergunta: str, k: int = 3, recuperacao: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Consulta o sistema RAG emitindo a resposta conforme é gerada.
+        
+        Eventos emitidos, em ordem:
+        
+        - ``{"tipo": "documentos", "documentos": [...]}``: chunks usados como contexto
+        - ``{"tipo": "token", "conteudo": "..."}``: trechos da resposta
+        - ``{"tipo": "fim", "resultado": {...}}``: mesmo resultado de ``consultar``
+        
+        Args:
+            pergunta: Pergunta do usuário
+            k: Número de documentos relevantes para recuperar
+            recuperacao: Resultado de ``recuperar`` já calculado para a pergunta
             
-            Seja claro, objetivo e cite a política específica quando possível.
+        Yields:
+            Eventos da consulta
+        """
+        if not self.vectorstore:
+            raise ValueError("Sistema não inicializado. Execute carregar_documentos() e processar_documentos() primeiro.")
+        
+        cronometro = Cronometro()
+        recuperado = self._usar_recuperacao(pergunta, k, recuperacao, cronometro)
+        if recuperado is None:
+            recuperado = self._recuperar(pergunta, k, cronometro)
+        vetor_pergunta, docs_relevantes = recuperado
+        yield {"tipo": "documentos", "documentos": self._resumir_documentos(docs_relevantes)}
+        
+        resultado_cache = self._resposta_em_cache(vetor_pergunta, docs_relevantes, cronometro)
+        if resultado_cache is not None:
+            yield {"tipo": "token", "conteudo": resultado_cache["resposta"]}
+            yield {"tipo": "fim", "resultado": resultado_cache}
+            return
+        
+        partes = []
+        chain = PROMPT_RAG | self.llm
+        for parte in chain.stream({
+            "contexto": "\n\n".join([doc.page_content for doc in docs_relevantes]),
+            "pergunta": pergunta
+        }):
+            if not partes:
+                cronometro.marcar_decorrido("primeiro_token_ms")
+            partes.append(parte.content)
+            yield {"tipo": "token", "conteudo": parte.content}
+        
+        resultado = self._concluir_consulta("".join(partes), docs_relevantes, vetor_pergunta, cronometro)
+        yield {"tipo": "fim", "resultado": resultado}
+    
+    async def aconsultar_stream(
+        self, pergunta: str, k: int = 3, recuperacao: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Versão assíncrona de ``consultar_stream``, com os mesmos eventos.
+        
+        Args:
+            pergunta: Pergunta do usuário
+            k: Número de documentos relevantes para recuperar
+            recuperacao: Resultado de ``recuperar`` já calculado para a pergunta
             
-            Contexto:
-            {contexto}"""),
-            ("human", "{pergunta}")
-        ])
+        Yields:
+            Eventos da consulta
+        """
+        if not self.vectorstore:
+            raise ValueError("Sistema não inicializado. Execute carregar_documentos() e processar_documentos() primeiro.")
         
-        # Gera a resposta
-        chain = prompt | self.llm
-        resposta = chain.invoke({
-            "contexto": contexto,
+        cronometro = Cronometro()
+        recuperado = self._usar_recuperacao(pergunta, k, recuperacao, cronometro)
+        if recuperado is None:
+            recuperado = await asyncio.to_thread(self._recuperar, pergunta, k, cronometro)
+        vetor_pergunta, docs_relevantes = recuperado
+        yield {"tipo": "documentos", "documentos": self._resumir_documentos(docs_relevantes)}
+        
+        resultado_cache = self._resposta_em_cache(vetor_pergunta, docs_relevantes, cronometro)
+        if resultado_cache is not None:
+            yield {"tipo": "token", "conteudo": resultado_cache["resposta"]}
+            yield {"tipo": "fim", "resultado": resultado_cache}
+            return
+        
+        partes = []
+        chain = PROMPT_RAG | self.llm
+        async for parte in chain.astream({
+            "contexto": "\n\n".join([doc.page_content for doc in docs_relevantes]),
             "pergunta": pergunta
-        })
+        }):
+            if not partes:
+                cronometro.marcar_decorrido("primeiro_token_ms")
+            partes.append(parte.content)
+            yield {"tipo": "token", "conteudo": parte.content}
         
-        return {
-            "resposta": resposta.content,
-            "documentos_relevantes": [
-                {
-                    "fonte": doc.metadata.get("source", "Desconhecida"),
-                    "conteudo": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
-                }
-                for doc in docs_relevantes
-            ]
-        }
+        resultado = self._concluir_consulta("".join(partes), docs_relevantes, vetor_pergunta, cronometro)
+        yield {"tipo": "fim", "resultado": resultado}
+    
+    def relatorio_indices(
+        self,
+        configuracoes: List[Dict],
+        k: int = 10,
+        fracao_consultas: float = 0.1,
+        perguntas: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        Compara recall e latência de tipos de índice com a busca exata.
+        
+        Uma fração dos chunks indexados é separada como conjunto de consultas
+        e removida da base; perguntas adicionais podem ser incluídas.
+        
+        Args:
+            configuracoes: Parâmetros de índice a comparar (ver indices_ann)
+            k: Número de vizinhos considerados no recall
+            fracao_consultas: Fração dos chunks usada como consultas
+            perguntas: Perguntas de usuários adicionadas às consultas
+            
+        Returns:
+            Lista com recall@k e latência média de cada configuração
+        """
+        import numpy as np
+        
+        if not self.vectorstore:
+            raise ValueError("Sistema não inicializado. Execute inicializar() primeiro.")
+        
+        docstore = self.vectorstore.docstore
+        textos = [
+            docstore.search(chave).page_content
+            for chave in self.vectorstore.index_to_docstore_id.values()
+        ]
+        vetores = np.array(self.embeddings.embed_documents(textos), dtype=np.float32)
+        
+        passo = max(2, round(1 / fracao_consultas))
+        separados = np.arange(len(vetores)) % passo == 0
+        base, consultas = vetores[~separados], vetores[separados]
+        if perguntas:
+            extras = np.array([self.embeddings.embed_query(p) for p in perguntas], dtype=np.float32)
+            consultas = np.vstack([consultas, extras])
+        
+        return comparar_indices(base, consultas, k, configuracoes)
+    
+    def _chave_corpus(self) -> str:
+        """Calcula a chave que identifica o corpus e os parâmetros do índice."""
+        index_store = self.index_store or IndexStore(
+            RAG_INDEX_DIR, MODELO_EMBEDDINGS, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP,
+            descrever(self.parametros_indice),
+        )
+        return index_store.calcular_chave(self._listar_pdfs())
+    
+    def mapear_indice_compartilhado(self) -> bool:
+        """
+        Mapeia em memória o índice compartilhado, se já exportado para o corpus atual.
+        
+        Returns:
+            True se o índice foi mapeado, False se precisa ser construído
+        """
+        vectorstore = carregar_indice_compartilhado(
+            self.indice_compartilhado, self._chave_corpus(), self.embeddings
+        )
+        if vectorstore is None:
+            return False
+        
+        self.vectorstore = vectorstore
+        self._indice_atualizado()
+        print(f"🗺️ Índice compartilhado mapeado em memória: {self.indice_compartilhado}")
+        return True
+    
+    def publicar_indice_compartilhado(self) -> None:
+        """
+        Exporta o índice atual para o diretório compartilhado e passa a usá-lo.
+        
+        Depois da exportação, este processo também troca sua cópia privada do
+        índice e das páginas pela versão mapeada em memória.
+        """
+        destino = exportar_indice_compartilhado(
+            self.vectorstore, self.indice_compartilhado, self._chave_corpus()
+        )
+        print(f"📤 Índice compartilhado exportado em: {destino}")
+        if self.mapear_indice_compartilhado():
+            self.docs = []
     
     def inicializar(self) -> None:
-        """Inicializa o sistema RAG completo."""
-        self.carregar_documentos()
-        self.processar_documentos()
+        """Inicializa o sistema RAG completo, reaproveitando o índice salvo quando possível."""
+        if self.indice_compartilhado and self.mapear_indice_compartilhado():
+            return
+        
+        if not self.carregar_indice_salvo():
+            self.processar_em_fluxo()
+        
+        if self.indice_compartilhado:
+            self.publicar_indice_compartilhado()
 
 
 # Função de conveniência para uso rápido
@@ -0,0 +1,305 @@
+"""
+Registro de recursos compartilhados pelo processo.
+
+Clientes do LLM, o modelo de embeddings, o sistema RAG (com o índice
+vetorial) e os classificadores de triagem são caros de construir. Em vez de
+cada CLI, agente ou grafo criar os seus, todos pedem ao registro, que constrói
+cada recurso uma única vez, na primeira vez em que é pedido, e devolve a
+mesma instância às chamadas seguintes, inclusive entre threads.
+
+Recursos também podem ser aquecidos em segundo plano (``aquecer``): quem
+pedir o recurso antes de a construção terminar espera pelo mesmo futuro, em
+vez de iniciar uma segunda construção.
+"""
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.config.settings import (
+    GOOGLE_API_KEY,
+    GRAFO_MAX_WORKERS,
+    RAG_EMBEDDING_BATCH,
+    RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_PATH,
+    TRIAGEM_BACKEND,
+)
+
+
+# Modelo de embeddings local usado para indexação, consultas e triagem local
+MODELO_EMBEDDINGS = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class RegistroRecursos:
+    """
+    Instâncias únicas por chave, construídas sob demanda e thread-safe.
+
+    Cada chave tem seu próprio futuro: construir o índice do RAG não bloqueia
+    quem só precisa do cliente do LLM, e quem chega durante uma construção
+    espera o resultado dela.
+    """
+
+    def __init__(self):
+        self._futuros: Dict[Hashable, Future] = {}
+        self._erros: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def _reservar(self, chave: Hashable) -> Tuple[Future, bool]:
+        """Futuro da chave e se esta chamada é a responsável por construí-lo."""
+        with self._lock:
+            futuro = self._futuros.get(chave)
+            if futuro is not None:
+                return futuro, False
+            futuro = self._futuros[chave] = Future()
+            return futuro, True
+
+    def _construir(self, chave: Hashable, futuro: Future, fabrica: Callable[[], Any]) -> None:
+        """Executa a fábrica e publica o resultado (ou a exceção) no futuro."""
+        futuro.set_running_or_notify_cancel()
+        try:
+            instancia = fabrica()
+        except BaseException as e:
+            # Libera a chave para que uma próxima chamada tente de novo
+            with self._lock:
+                if self._futuros.get(chave) is futuro:
+                    del self._futuros[chave]
+                self._erros[chave] = str(e)
+            futuro.set_exception(e)
+        else:
+            with self._lock:
+                self._erros.pop(chave, None)
+            futuro.set_result(instancia)
+
+    def obter(self, chave: Hashable, fabrica: Callable[[], Any]) -> Any:
+        """
+        Retorna a instância da chave, construindo-a na primeira chamada.
+
+        Args:
+            chave: Identificador do recurso
+            fabrica: Função que constrói o recurso (se falhar, a exceção chega
+                a todos que esperavam e a próxima chamada tenta de novo)
+
+        Returns:
+            Instância compartilhada do recurso
+        """
+        futuro, responsavel = self._reservar(chave)
+        if responsavel:
+            self._construir(chave, futuro, fabrica)
+        return futuro.result()
+
+    def aquecer(self, chave: Hashable, fabrica: Callable[[], Any]) -> Future:
+        """
+        Inicia a construção do recurso em uma thread de fundo, se necessário.
+
+        Args:
+            chave: Identificador do recurso
+            fabrica: Função que constrói o recurso
+
+        Returns:
+            Futuro compartilhado com quem chamar ``obter`` para a mesma chave
+        """
+        futuro, responsavel = self._reservar(chave)
+        if responsavel:
+            threading.Thread(
+                target=self._construir,
+                args=(chave, futuro, fabrica),
+                name=f"aquecimento-{chave}",
+                daemon=True,
+            ).start()
+        return futuro
+
+    def estado(self, chave: Hashable) -> str:
+        """
+        Situação da construção do recurso.
+
+        Args:
+            chave: Identificador do recurso
+
+        Returns:
+            "pendente" (não pedido), "carregando", "pronto" ou "erro" (a
+            última construção falhou)
+        """
+        with self._lock:
+            futuro = self._futuros.get(chave)
+            if futuro is None:
+                return "erro" if chave in self._erros else "pendente"
+        return "pronto" if futuro.done() else "carregando"
+
+    def disponivel(self, chave: Hashable) -> bool:
+        """
+        Indica se o recurso já foi construído.
+
+        Args:
+            chave: Identificador do recurso
+
+        Returns:
+            True se a instância já existe
+        """
+        return self.estado(chave) == "pronto"
+
+    def descartar(self, chave: Hashable) -> Optional[Any]:
+        """
+        Remove a instância da chave do registro (a próxima chamada reconstrói).
+
+        Args:
+            chave: Identificador do recurso
+
+        Returns:
+            Instância removida ou None se não havia uma construída
+        """
+        with self._lock:
+            futuro = self._futuros.pop(chave, None)
+            self._erros.pop(chave, None)
+        if futuro is None or not futuro.done() or futuro.exception() is not None:
+            return None
+        return futuro.result()
+
+    def limpar(self) -> None:
+        """Descarta todas as instâncias (a próxima chamada reconstrói)."""
+        with self._lock:
+            self._futuros.clear()
+            self._erros.clear()
+
+
+# Registro único do processo
+registro = RegistroRecursos()
+
+
+def obter_llm(modelo: str = "gemini-1.5-flash", temperatura: float = 0.3):
+    """
+    Cliente compartilhado do Gemini para o modelo e a temperatura informados.
+
+    Args:
+        modelo: Nome do modelo Gemini
+        temperatura: Temperatura de geração
+
+    Returns:
+        ChatGoogleGenerativeAI
+    """
+    def criar():
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=modelo, temperature=temperatura, google_api_key=GOOGLE_API_KEY)
+
+    return registro.obter(("llm", modelo, temperatura), criar)
+
+
+def obter_embeddings():
+    """
+    Modelo de embeddings local compartilhado (MiniLM em CPU).
+
+    Returns:
+        HuggingFaceEmbeddings, envolto pelo cache persistente se ativo
+    """
+    def criar():
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(
+            model_name=MODELO_EMBEDDINGS,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'batch_size': RAG_EMBEDDING_BATCH}
+        )
+        if RAG_EMBEDDING_CACHE:
+            # Consulta o cache persistente antes de chamar o modelo de embeddings
+            from src.tools.cache_embeddings import CachedEmbeddings, EmbeddingCache
+            embeddings = CachedEmbeddings(
+                embeddings, MODELO_EMBEDDINGS, EmbeddingCache(RAG_EMBEDDING_CACHE_PATH)
+            )
+        return embeddings
+
+    return registro.obter("embeddings", criar)
+
+
+def _criar_rag():
+    """Constrói o sistema RAG local e carrega (ou cria) o índice vetorial."""
+    from src.tools.rag_local import RAGSystemLocal
+    rag_system = RAGSystemLocal()
+    rag_system.inicializar()
+    return rag_system
+
+
+def obter_rag():
+    """
+    Sistema RAG local compartilhado, já com o índice vetorial carregado.
+
+    Se o aquecimento estiver em andamento, espera por ele.
+
+    Returns:
+        RAGSystemLocal inicializado
+    """
+    return registro.obter("rag", _criar_rag)
+
+
+def _criar_triagem(backend: str):
+    """Constrói o classificador de triagem do backend."""
+    from src.chains.triagem_local import criar_triagem
+    return criar_triagem(backend)
+
+
+def obter_triagem(backend: str = TRIAGEM_BACKEND):
+    """
+    Classificador de triagem compartilhado para o backend informado.
+
+    Args:
+        backend: "llm" (Gemini) ou "local" (kNN sobre embeddings)
+
+    Returns:
+        TriagemChain ou TriagemLocal
+    """
+    return registro.obter(("triagem", backend), functools.partial(_criar_triagem, backend))
+
+
+def obter_executor_especulativo() -> ThreadPoolExecutor:
+    """
+    Pool de threads compartilhado pelas recuperações especulativas do grafo.
+
+    Dimensionado por GRAFO_MAX_WORKERS, o mesmo limite das mensagens
+    processadas ao mesmo tempo: cada mensagem tem no máximo uma busca
+    especulativa em andamento.
+
+    Returns:
+        ThreadPoolExecutor compartilhado
+    """
+    return registro.obter(
+        "executor_especulativo",
+        lambda: ThreadPoolExecutor(max_workers=GRAFO_MAX_WORKERS, thread_name_prefix="especulativo"),
+    )
+
+
+def encerrar() -> None:
+    """Encerra o pool especulativo, cancelando as buscas que ainda não começaram."""
+    executor = registro.descartar("executor_especulativo")
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def aquecer(backend: str = TRIAGEM_BACKEND) -> Dict[str, Future]:
+    """
+    Começa a carregar o RAG (índice e embeddings) e a triagem em segundo plano.
+
+    Args:
+        backend: Backend de triagem a aquecer
+
+    Returns:
+        Dict recurso -> futuro da construção
+    """
+    print("🔥 Aquecendo RAG e triagem em segundo plano...")
+    return {
+        "rag": registro.aquecer("rag", _criar_rag),
+        "triagem": registro.aquecer(("triagem", backend), functools.partial(_criar_triagem, backend)),
+    }
+
+
+def prontidao(backend: str = TRIAGEM_BACKEND) -> Dict:
+    """
+    Relatório de prontidão dos recursos usados nas requisições.
+
+    Args:
+        backend: Backend de triagem em uso
+
+    Returns:
+        Dict com ``pronto`` (todos construídos) e a situação de cada recurso
+    """
+    recursos = {
+        "rag": registro.estado("rag"),
+        "triagem": registro.estado(("triagem", backend)),
+    }
+    return {"pronto": all(estado == "pronto" for estado in recursos.values()), "recursos": recursos}
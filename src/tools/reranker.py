@@ -0,0 +1,121 @@
+"""
+Re-ranking dos chunks recuperados com um cross-encoder local.
+
+O bi-encoder (MiniLM) compara embeddings calculados separadamente para a
+pergunta e para o chunk; o cross-encoder lê os dois juntos e pontua melhor
+a relevância, mas é mais caro. Por isso ele só re-ordena os N melhores
+candidatos da busca, em um único lote, e com um orçamento de tempo: se o
+lote não terminar a tempo, a consulta segue com a ordem original.
+
+Há no máximo um lote em execução: consultas simultâneas esperam o modelo
+ficar livre, mas só dentro do próprio orçamento (que inclui essa espera);
+se ele não liberar a tempo, seguem com a ordem da busca, sem enfileirar
+lotes atrás de um lote atrasado.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+
+class ReRanker:
+    """
+    Cross-encoder executado em CPU com orçamento de tempo por consulta.
+    """
+
+    def __init__(self, nome_modelo: str, orcamento_ms: float, max_comprimento: int = 512):
+        """
+        Carrega o modelo do cross-encoder.
+
+        Args:
+            nome_modelo: Nome do modelo no HuggingFace
+            orcamento_ms: Tempo máximo de re-ranking por consulta, em ms
+            max_comprimento: Número máximo de tokens por par (pergunta, chunk)
+        """
+        from sentence_transformers import CrossEncoder
+
+        self.nome_modelo = nome_modelo
+        self.orcamento_ms = orcamento_ms
+        self.modelo = CrossEncoder(nome_modelo, device="cpu", max_length=max_comprimento)
+        # Um único worker e no máximo um lote por vez: lotes atrasados não se
+        # acumulam na fila do executor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._livre = threading.BoundedSemaphore(1)
+        self._lock = threading.Lock()
+        self.aplicados = 0
+        self.estouros = 0
+        self.ocupados = 0
+
+    def _pontuar(self, pergunta: str, docs: List[Document]) -> List[float]:
+        """Pontua todos os pares (pergunta, chunk) em um único lote."""
+        pares = [(pergunta, doc.page_content) for doc in docs]
+        return self.modelo.predict(pares, batch_size=len(pares), show_progress_bar=False).tolist()
+
+    def reordenar(self, pergunta: str, docs: List[Document], k: int) -> Tuple[List[Document], bool]:
+        """
+        Re-ordena os candidatos pela pontuação do cross-encoder.
+
+        Args:
+            pergunta: Pergunta do usuário
+            docs: Candidatos em ordem de relevância da busca
+            k: Número de chunks a retornar
+
+        Returns:
+            Tupla (k melhores chunks, se o re-ranking foi aplicado). Se o
+            orçamento estourar (esperando o modelo ou pontuando) ou o modelo
+            falhar, retorna os k primeiros candidatos na ordem original.
+        """
+        if len(docs) <= 1:
+            return docs[:k], False
+
+        orcamento = self.orcamento_ms / 1000
+        inicio = time.perf_counter()
+        if not self._livre.acquire(timeout=orcamento):
+            # O modelo ficou ocupado por todo o orçamento com outras consultas
+            with self._lock:
+                self.ocupados += 1
+            return docs[:k], False
+
+        try:
+            futuro = self._executor.submit(self._pontuar, pergunta, docs)
+        except Exception:
+            self._livre.release()
+            raise
+        # Libera o modelo quando o lote terminar, falhar ou for cancelado
+        futuro.add_done_callback(lambda _: self._livre.release())
+        try:
+            restante = max(0.0, orcamento - (time.perf_counter() - inicio))
+            pontuacoes = futuro.result(timeout=restante)
+        except FuturesTimeoutError:
+            # Um lote em execução não pode ser interrompido: termina em segundo
+            # plano e o resultado é descartado
+            futuro.cancel()
+            with self._lock:
+                self.estouros += 1
+            return docs[:k], False
+        except Exception as e:
+            print(f"⚠️ Erro no re-ranking, mantendo a ordem original: {e}")
+            return docs[:k], False
+
+        with self._lock:
+            self.aplicados += 1
+        ordem = sorted(range(len(docs)), key=lambda i: -pontuacoes[i])
+        return [docs[i] for i in ordem[:k]], True
+
+    def estatisticas(self) -> Dict:
+        """
+        Retorna quantas consultas foram re-ordenadas, quantas estouraram o
+        orçamento pontuando e quantas o gastaram esperando o modelo ocupado.
+
+        Returns:
+            Dict com aplicados, estouros, ocupados e orçamento em ms
+        """
+        with self._lock:
+            return {
+                "aplicados": self.aplicados,
+                "estouros": self.estouros,
+                "ocupados": self.ocupados,
+                "orcamento_ms": self.orcamento_ms,
+            }
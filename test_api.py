@@ -0,0 +1,262 @@
+"""
+Script de teste do serviço HTTP (ASGI) com um agente simulado.
+
+Chama a aplicação ASGI diretamente, sem servidor nem LLM. O agente é o
+ServiceDeskAgent real sobre um grafo que devolve um ``ServiceDeskState``
+real, de modo que a serialização das respostas é a mesma do serviço. Confere
+as respostas de controle de carga (429 com a fila cheia, 504 no tempo
+limite, 503 na prontidão antes do aquecimento, 413 para corpos grandes
+demais) e que erros internos não expõem detalhes ao cliente.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Dict
+
+from src.agents import ServiceDeskAgent
+from src.api.app import ServicoServiceDesk
+from src.config.settings import API_CORPO_MAXIMO
+from src.graph import ServiceDeskGraph
+from src.graph.state import ServiceDeskState
+from src.models import TriagemOut
+
+
+class TriagemSimulada:
+    """Triagem fixa no formato de ``TriagemOut``, como a do LLM."""
+
+    def processar(self, mensagem: str) -> Dict:
+        return TriagemOut(decisão="AUTO_RESOLVER", urgencia="BAIXA").model_dump()
+
+
+class RAGSimulado:
+    """RAG com o mesmo formato de resultado de ``RAGSystemLocal.consultar``."""
+
+    def consultar(self, pergunta: str) -> Dict:
+        if pergunta == "falha":
+            raise RuntimeError("detalhe interno: /srv/indice corrompido")
+        return {
+            "resposta": "O home office é permitido até 3 dias por semana.",
+            "documentos_relevantes": [{"fonte": "Politica_Home_Office.pdf", "conteudo": "Home office..."}],
+            "tempos": {"embedding_ms": 1.0, "busca_ms": 1.0, "llm_ms": 1.0},
+        }
+
+
+class NosSimulados:
+    """Nós do grafo sem LLM nem índice."""
+
+    def __init__(self):
+        self.triagem_chain = TriagemSimulada()
+        self.rag_system = RAGSimulado()
+
+    def _inicializar_rag(self) -> None:
+        pass
+
+
+class GrafoSimulado(ServiceDeskGraph):
+    """
+    Grafo que devolve o estado final de uma execução AUTO_RESOLVER.
+
+    O estado é um ``ServiceDeskState`` real convertido em dict, como o
+    retornado pelo ``invoke`` do LangGraph, e só é produzido quando
+    ``liberar`` é sinalizado.
+    """
+
+    def __init__(self, liberar: threading.Event):
+        self.nodes = NosSimulados()
+        self.liberar = liberar
+
+    def processar(self, mensagem: str, emitir_evento=None) -> Dict:
+        self.liberar.wait(5)
+        agora = time.time()
+        rastro = [
+            {"no": no, "inicio": agora, "fim": agora, "duracao_ms": 1.0, "resultado": "ok"}
+            for no in ("triagem", "rag", "recomendacao", "finalizar")
+        ]
+        rag = self.nodes.rag_system.consultar(mensagem)
+        estado = ServiceDeskState(
+            mensagem_original=mensagem,
+            triagem=self.nodes.triagem_chain.processar(mensagem),
+            decisao="AUTO_RESOLVER",
+            urgencia="BAIXA",
+            resposta_rag=rag["resposta"],
+            documentos_relevantes=rag["documentos_relevantes"],
+            recomendacao=rag["resposta"],
+            acao_sugerida="Resposta automática enviada",
+            rastro=rastro,
+            finalizado=True,
+        )
+        return estado.model_dump()
+
+
+class AgenteSimulado(ServiceDeskAgent):
+    """Agente real sobre o grafo simulado; o aquecimento é controlado pelo teste."""
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.graph = GrafoSimulado(self.liberar)
+        self.initialized = False
+        self.estado_recursos = "carregando"
+        self.aquecimentos = 0
+
+    def aquecer(self) -> None:
+        self.aquecimentos += 1
+        if self.estado_recursos == "erro":
+            self.estado_recursos = "carregando"
+
+    def prontidao(self) -> Dict:
+        recursos = {"rag": self.estado_recursos, "triagem": "pronto"}
+        return {"pronto": all(e == "pronto" for e in recursos.values()), "recursos": recursos}
+
+    def encerrar(self) -> None:
+        self.liberar.set()
+        super().encerrar()
+
+
+async def chamar(app, metodo: str, caminho: str, corpo: bytes = b""):
+    """
+    Envia uma requisição à aplicação ASGI.
+
+    Returns:
+        Tupla (status, corpo JSON, cabeçalhos)
+    """
+    entrada = [{"type": "http.request", "body": corpo, "more_body": False}]
+    enviados = []
+
+    async def receive():
+        return entrada.pop(0) if entrada else {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        enviados.append(mensagem)
+
+    await app({"type": "http", "method": metodo, "path": caminho, "headers": []}, receive, send)
+    cabecalhos = {nome.decode(): valor.decode() for nome, valor in enviados[0]["headers"]}
+    return enviados[0]["status"], json.loads(enviados[1]["body"]), cabecalhos
+
+
+def json_mensagem(texto: str) -> bytes:
+    """Corpo JSON com o campo ``mensagem``."""
+    return json.dumps({"mensagem": texto}).encode("utf-8")
+
+
+async def testar_antes_do_startup():
+    """/saude responde antes do startup; as demais rotas respondem 503."""
+    app = ServicoServiceDesk(agente=AgenteSimulado())
+    status, corpo, _ = await chamar(app, "GET", "/saude")
+    assert status == 200 and corpo["status"] == "ok", (status, corpo)
+    status, _, _ = await chamar(app, "GET", "/prontidao")
+    assert status == 503, status
+    print("✅ /saude responde antes do startup")
+
+
+async def testar_prontidao():
+    """/prontidao responde 503 até o aquecimento terminar e refaz um aquecimento que falhou."""
+    agente = AgenteSimulado()
+    app = ServicoServiceDesk(agente=agente)
+    await app.iniciar()
+    try:
+        assert agente.aquecimentos == 1, "O serviço deve aquecer no startup"
+        status, _, _ = await chamar(app, "GET", "/prontidao")
+        assert status == 503, status
+
+        agente.estado_recursos = "erro"
+        status, corpo, _ = await chamar(app, "GET", "/prontidao")
+        assert status == 503 and corpo["recursos"]["rag"] == "erro", (status, corpo)
+        assert agente.aquecimentos == 2 and agente.estado_recursos == "carregando"
+
+        agente.estado_recursos = "pronto"
+        status, _, _ = await chamar(app, "GET", "/prontidao")
+        assert status == 200, status
+    finally:
+        await app.encerrar()
+    print("✅ /prontidao: 503 antes do aquecimento, novo aquecimento após erro, 200 depois")
+
+
+async def testar_corpo_grande():
+    """Corpos acima de API_CORPO_MAXIMO recebem 413."""
+    app = ServicoServiceDesk(agente=AgenteSimulado())
+    await app.iniciar()
+    try:
+        status, _, _ = await chamar(app, "POST", "/triagem", json_mensagem("x" * (API_CORPO_MAXIMO + 1)))
+        assert status == 413, status
+        status, corpo, _ = await chamar(app, "POST", "/triagem", json_mensagem("Preciso de ajuda"))
+        assert status == 200 and corpo == TriagemOut(**corpo).model_dump(), (status, corpo)
+    finally:
+        await app.encerrar()
+    print(f"✅ Corpo acima de {API_CORPO_MAXIMO} bytes: 413")
+
+
+async def testar_fila_cheia():
+    """Além de concorrência + fila, as requisições recebem 429 com Retry-After."""
+    agente = AgenteSimulado()
+    app = ServicoServiceDesk(concorrencia=2, fila_maxima=2, tempo_limite=5, agente=agente)
+    await app.iniciar()
+    try:
+        aceitas = [
+            asyncio.create_task(chamar(app, "POST", "/solicitacoes", json_mensagem(f"m{i}")))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.1)
+        status, _, cabecalhos = await chamar(app, "POST", "/solicitacoes", json_mensagem("excedente"))
+        assert status == 429 and cabecalhos.get("retry-after") == "1", (status, cabecalhos)
+
+        agente.liberar.set()
+        resultados = await asyncio.gather(*aceitas)
+        assert [status for status, _, _ in resultados] == [200] * 4, resultados
+        assert app.estatisticas()["rejeitadas"] == 1
+
+        # Mesmo formato de processar_solicitacao, serializado em JSON
+        _, corpo, _ = resultados[0]
+        assert corpo["mensagem_original"] == "m0", corpo
+        assert corpo["triagem"]["decisão"] == "AUTO_RESOLVER", corpo
+        assert corpo["estatisticas"]["fluxo_executado"][0] == "triagem", corpo
+        assert corpo["documentos_relevantes"][0]["fonte"], corpo
+    finally:
+        await app.encerrar()
+    print("✅ Fila cheia: 429 com Retry-After, aceitas concluídas com 200")
+
+
+async def testar_tempo_limite():
+    """Respostas que passam do tempo limite recebem 504."""
+    agente = AgenteSimulado()
+    app = ServicoServiceDesk(concorrencia=1, fila_maxima=1, tempo_limite=0.2, agente=agente)
+    await app.iniciar()
+    try:
+        status, _, _ = await chamar(app, "POST", "/solicitacoes", json_mensagem("demorada"))
+        assert status == 504, status
+    finally:
+        await app.encerrar()
+    print("✅ Tempo limite excedido: 504")
+
+
+async def testar_erro_interno():
+    """Exceções viram 500 com mensagem genérica, sem o texto da exceção."""
+    app = ServicoServiceDesk(agente=AgenteSimulado())
+    await app.iniciar()
+    try:
+        corpo_pergunta = json.dumps({"pergunta": "falha"}).encode("utf-8")
+        status, corpo, _ = await chamar(app, "POST", "/politicas", corpo_pergunta)
+        assert status == 500 and "corrompido" not in corpo["erro"], (status, corpo)
+    finally:
+        await app.encerrar()
+    print("✅ Erro interno: 500 sem detalhes da exceção")
+
+
+async def executar():
+    await testar_antes_do_startup()
+    await testar_prontidao()
+    await testar_corpo_grande()
+    await testar_fila_cheia()
+    await testar_tempo_limite()
+    await testar_erro_interno()
+
+
+def main():
+    """Executa os testes do serviço HTTP."""
+    print("🚀 Testando serviço HTTP com agente simulado...")
+    asyncio.run(executar())
+    print("🎉 Serviço HTTP ok!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Script de teste de vazão do grafo com execução concorrente.
+
+Processa as mensagens de teste em sequência e depois com
+``processar_concorrente``, compara as mensagens por segundo e confere se
+cada resultado corresponde à sua mensagem e executou o próprio fluxo.
+"""
+import time
+
+from src.agents import ServiceDeskAgent
+from src.config.settings import GOOGLE_API_KEY, GRAFO_MAX_WORKERS
+from src.test_data import CASOS_TESTE_TRIAGEM
+
+
+def medir(descricao: str, processar, mensagens):
+    """
+    Mede a vazão de uma forma de processamento.
+
+    Args:
+        descricao: Nome exibido no relatório
+        processar: Função que recebe a lista de mensagens
+        mensagens: Mensagens a processar
+
+    Returns:
+        Resultados e mensagens por segundo
+    """
+    inicio = time.perf_counter()
+    resultados = processar(mensagens)
+    decorrido = time.perf_counter() - inicio
+    vazao = len(mensagens) / decorrido
+    print(f"⏱️ {descricao}: {decorrido:.1f}s ({vazao:.2f} mensagens/s)")
+    return resultados, vazao
+
+
+def limpar_caches(agent: ServiceDeskAgent) -> None:
+    """Esvazia os caches de triagem e do RAG para que as medições sejam comparáveis."""
+    nodes = agent.graph.nodes
+    if getattr(nodes.triagem_chain, "cache", None) is not None:
+        nodes.triagem_chain.cache.limpar()
+    nodes.rag_system.cache_consultas.limpar()
+    nodes.rag_system.cache_respostas.limpar()
+
+
+def verificar(mensagens, resultados) -> int:
+    """Conta os resultados trocados, com erro ou sem rastro próprio."""
+    problemas = 0
+    for mensagem, resultado in zip(mensagens, resultados):
+        fluxo = resultado['estatisticas']['fluxo_executado']
+        if resultado['mensagem_original'] != mensagem or resultado['erro'] or fluxo[:1] != ["triagem"]:
+            problemas += 1
+            print(f"   ⚠️ {mensagem[:50]}: {resultado['erro'] or fluxo}")
+    return problemas
+
+
+def main():
+    """Compara a vazão sequencial e concorrente do grafo."""
+    print("🚀 Testando execução concorrente do grafo...")
+
+    if not GOOGLE_API_KEY:
+        print("❌ Erro: GOOGLE_API_KEY não configurada no .env")
+        return
+
+    try:
+        agent = ServiceDeskAgent()
+        agent.inicializar()
+        mensagens = list(CASOS_TESTE_TRIAGEM)
+
+        # Aquece o RAG e a triagem para não medir o carregamento
+        agent.processar_solicitacao(mensagens[0])
+
+        limpar_caches(agent)
+        _, sequencial = medir(
+            "Sequencial",
+            lambda lote: [agent.processar_solicitacao(m) for m in lote],
+            mensagens,
+        )
+        limpar_caches(agent)
+        resultados, concorrente = medir(
+            f"Concorrente ({GRAFO_MAX_WORKERS} threads)",
+            agent.processar_concorrente,
+            mensagens,
+        )
+
+        print("\n" + "=" * 60)
+        print(f"📈 Ganho de vazão: {concorrente / sequencial:.1f}x")
+        problemas = verificar(mensagens, resultados)
+        if problemas:
+            print(f"❌ {problemas} resultado(s) inconsistente(s)")
+        else:
+            print(f"✅ {len(resultados)} resultados consistentes com suas mensagens")
+
+    except Exception as e:
+        print(f"❌ Erro durante o teste: {e}")
+
+
+if __name__ == "__main__":
+    main()
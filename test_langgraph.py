@@ -94,6 +94,8 @@ def testar_langgraph():
         stats = agent.obter_estatisticas("Qual é a política de home office?")
         print(f"   Fluxo executado: {stats['fluxo_executado']}")
         print(f"   Documentos consultados: {stats['documentos_consultados']}")
+        for no, ms in stats['latencia_por_no_ms'].items():
+            print(f"   ⏱️ {no}: {ms:.0f} ms")
         
         # Teste de consulta direta
         print("\n📚 Teste de consulta direta RAG:")
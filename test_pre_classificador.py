@@ -0,0 +1,71 @@
+"""
+Script de teste do pré-classificador de triagem por regras.
+
+Não chama o LLM: verifica que perguntas e pedidos negados não dispensam o
+LLM, que pedidos explícitos continuam dispensando e mede a concordância das
+regras com ``CASOS_VALIDACAO`` no limiar configurado.
+"""
+from src.chains.triagem import pre_classificar
+from src.config.settings import TRIAGEM_LIMIAR_CONFIANCA
+from src.test_data import CASOS_VALIDACAO
+
+
+# Mensagens que devem seguir para o LLM (confiança abaixo do limiar)
+CASOS_LLM = [
+    "Não quero abrir um chamado, só quero saber a política de férias",
+    "Quero saber se preciso de aprovação do gestor para viajar",
+    "Como peço aprovação de viagem?",
+    "O que é a liberação de anexos?",
+    "Nunca solicitei exceção, como funciona?",
+    "Preciso de aprovação?",
+]
+
+# Mensagens que as regras resolvem sozinhas: (mensagem, decisão esperada)
+CASOS_ATALHO = [
+    ("Por favor, abra um chamado para o RH sobre meu salário", "ABRIR_CHAMADO"),
+    ("Solicito exceção para trabalhar 5 dias remoto", "ABRIR_CHAMADO"),
+    ("Preciso de liberação para acessar anexos externos", "ABRIR_CHAMADO"),
+    ("Qual é a política de home office da empresa?", "AUTO_RESOLVER"),
+    ("Preciso de ajuda com uma política", "PEDIR_INFO"),
+]
+
+
+def confianca(mensagem: str) -> float:
+    """Confiança das regras para a mensagem (0 se nenhuma se aplica)."""
+    resultado = pre_classificar(mensagem)
+    return resultado[1] if resultado else 0.0
+
+
+def main():
+    """Executa as verificações do pré-classificador."""
+    print(f"🚀 Testando pré-classificador (limiar {TRIAGEM_LIMIAR_CONFIANCA})...")
+
+    for mensagem in CASOS_LLM:
+        obtida = confianca(mensagem)
+        assert obtida < TRIAGEM_LIMIAR_CONFIANCA, f"Dispensaria o LLM ({obtida:.2f}): {mensagem}"
+        print(f"✅ Vai para o LLM ({obtida:.2f}): {mensagem}")
+
+    for mensagem, esperada in CASOS_ATALHO:
+        resultado = pre_classificar(mensagem)
+        assert resultado is not None, f"Nenhuma regra se aplica: {mensagem}"
+        saida, obtida = resultado
+        assert obtida >= TRIAGEM_LIMIAR_CONFIANCA, f"Não dispensa o LLM ({obtida:.2f}): {mensagem}"
+        assert saida.decisão == esperada, f"{saida.decisão} != {esperada}: {mensagem}"
+        print(f"✅ Atalho {saida.decisão} ({obtida:.2f}): {mensagem}")
+
+    # Concordância com os casos de validação (mensagens sem atalho vão ao LLM)
+    atalhos = acertos = 0
+    for caso in CASOS_VALIDACAO:
+        resultado = pre_classificar(caso["mensagem"])
+        if resultado is None or resultado[1] < TRIAGEM_LIMIAR_CONFIANCA:
+            continue
+        atalhos += 1
+        acertos += resultado[0].decisão == caso["decisao_esperada"]
+    print(f"\n📊 CASOS_VALIDACAO: {atalhos}/{len(CASOS_VALIDACAO)} com atalho, {acertos} corretos")
+    assert acertos == atalhos, "Atalho com decisão diferente da esperada em CASOS_VALIDACAO"
+
+    print("🎉 Pré-classificador ok!")
+
+
+if __name__ == "__main__":
+    main()